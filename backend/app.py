@@ -3,7 +3,16 @@ from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
-from config import JWT_SECRET
+from config import JWT_SECRET, JOBS_WORKERS
+from json_provider import FastJSONProvider
+from compression import init_compression
+from metrics import init_metrics
+from nplusone import init_nplusone
+from slow_queries import init_slow_query_log
+from listing import ListingError, listing_error
+from orm_build import upgrade_schema, describe_engine, init_request_session, get_session
+from rollup import ensure_backfilled
+from progress import ensure_counted
 
 # Blueprints
 from calendark import bp_calendar
@@ -12,6 +21,11 @@ from user_management import bp_user_management
 from task_template_management import bp_task_management
 from request_template_management import bp_request_management
 from workflow_template_management import bp_workflow_management
+from task_runtime import bp_task_runtime
+from request_runtime import bp_request_runtime
+from template_search import bp_search, ensure_search_index
+from events import bp_events
+from jobs import bp_jobs, start_workers
 
 def create_app():
     app = Flask(__name__)
@@ -22,13 +36,41 @@ def create_app():
     CORS(
         app,
         resources={r"/api/*": {"origins": "*"}},
-        supports_credentials=True # Credential을 허용하는 경우 True로 설정
+        supports_credentials=True, # Credential을 허용하는 경우 True로 설정
+        expose_headers=["ETag", "X-Next-Cursor", "Location"],  # 목록 API 재검증/다음 페이지 커서, 202 작업 상태 URL
     )
 
+    # 기존 DB 파일에 누락된 컬럼 보강
+    added_columns = upgrade_schema()
+    with get_session() as s:
+        if ensure_backfilled(s):
+            print("🛠  daily_status_counts 롤업 백필 완료")
+    if ensure_counted(added_columns):
+        print("🛠  Workflow/Request 상태 카운터 백필 완료")
+    # 템플릿 검색용 FTS5 인덱스/트리거 (없으면 생성 후 채움)
+    ensure_search_index()
+    print("DB engine: " + ", ".join(f"{k}={v}" for k, v in describe_engine().items()))
+
+    # 엔드포인트별 지연/SQL 수/풀 대기 → /metrics — 커밋·압축까지 재도록 가장 먼저 등록
+    init_metrics(app)
+    # N+1 감지 (NPLUSONE_MODE=warn|raise, 개발/테스트용)
+    init_nplusone(app)
+
+    # JSON 직렬화 (orjson 사용 가능 시) + 응답 압축 — 압축 훅이 커밋 훅 뒤에 실행되도록 먼저 등록
+    app.json = FastJSONProvider(app)
+    print(f"JSON provider: {app.json.backend}")
+    init_compression(app)
+
+    # 요청 단위 DB 세션 (after_request 커밋 / teardown 정리)
+    init_request_session(app)
+
     # JWT 설정
     app.config["JWT_SECRET_KEY"] = JWT_SECRET
     JWTManager(app)
 
+    # 목록 API의 잘못된 limit/cursor → 400
+    app.register_error_handler(ListingError, listing_error)
+
     # 블루프린트 등록
     app.register_blueprint(bp_auth)
     app.register_blueprint(bp_calendar)
@@ -36,6 +78,18 @@ def create_app():
     app.register_blueprint(bp_user_management)
     app.register_blueprint(bp_task_management)
     app.register_blueprint(bp_request_management)
+    app.register_blueprint(bp_task_runtime)
+    app.register_blueprint(bp_request_runtime)
+    app.register_blueprint(bp_search)
+    app.register_blueprint(bp_events)
+    app.register_blueprint(bp_jobs)
+
+    # 느린 SQL 로그 (회전 파일 + /api/admin/slow-queries)
+    init_slow_query_log(app)
+
+    # 백그라운드 작업 워커 (JOBS_WORKERS=0이면 `python jobs.py run`을 따로 실행)
+    if start_workers():
+        print(f"Job workers: {JOBS_WORKERS}")
 
     return app
 
@@ -1,18 +1,45 @@
 # backend/auth.py
 # -*- coding: utf-8 -*-
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from datetime import timedelta, timezone
-from sqlalchemy.orm import joinedload # JOIN을 위해 추가
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import timezone
+from sqlalchemy import update
+from sqlalchemy.orm import joinedload, selectinload # JOIN을 위해 추가
 
-from config import JWT_ACCESS_TOKEN_HOURS
+from config import PASSWORD_REHASH_ON_LOGIN
 # 🔽 ORM 모델과 세션 가져오기
-from orm_build import get_session, User, Team
+from orm_build import request_session, get_session, User, Team
+from authz import issue_access_token
+from password_hasher import hasher, HasherBusy
+from user_management import require_db_admin
+from team_revision import bump_team_revisions
 
 # ────────────────────────────────────────────────────────────────
 bp_auth = Blueprint("auth", __name__, url_prefix="/api/auth")
 
+@bp_auth.errorhandler(HasherBusy)
+def _hasher_busy(_):
+    # 해싱 대기열 초과: 로그인 경로만 지연/거절
+    return jsonify({"message": "요청이 많습니다. 잠시 후 다시 시도하세요"}), 503, {"Retry-After": "2"}
+
+def _rehash_in_background(user_id: int, old_hash: str, password: str):
+    """해싱 풀에서 새 해시를 만든 뒤 별도 세션으로 저장 (그 사이 비밀번호가 바뀌었으면 덮어쓰지 않음)"""
+    try:
+        future = hasher.hash_async(password)
+    except HasherBusy:
+        return  # 풀이 바쁘면 다음 로그인에서 다시 시도
+
+    def save(done):
+        if done.exception() is not None:
+            return
+        with get_session() as s:
+            s.execute(
+                update(User)
+                .where(User.user_id == user_id, User.hashed_password == old_hash)
+                .values(hashed_password=done.result())
+            )
+    future.add_done_callback(save)
+
 # ── 회원가입 ─────────────────────────────────────────────────────
 @bp_auth.route("/signup", methods=["POST"])
 def signup():
@@ -21,42 +48,43 @@ def signup():
     if not required.issubset(data):
         return jsonify({"message": "필수 항목 누락"}), 400
 
+    # 해싱은 워커 풀에서 (DB 세션을 잡기 전에 수행)
+    hashed_password = hasher.hash(data["password"])
+
     # ## ORM 사용으로 변경
-    with get_session() as s:
-        # 이메일 중복 확인
-        if s.query(User).filter_by(email=data["email"]).first():
-            return jsonify({"message": "이미 가입된 이메일입니다"}), 409
-
-        # 팀 존재 여부 확인
-        team = s.get(Team, data["team_id"])
-        if not team:
-            return jsonify({"message": "존재하지 않는 팀입니다"}), 400
-
-        # 새 User 객체 생성
-        new_user = User(
-            user_name=data["name"],
-            email=data["email"],
-            hashed_password=generate_password_hash(data["password"]),
-            position=data["position"]
-        )
-        # User와 Team 관계 설정 (User.team_id에 자동 반영됨)
-        new_user.team = team
+    s = request_session()
+    # 이메일 중복 확인
+    if s.query(User).filter_by(email=data["email"]).first():
+        return jsonify({"message": "이미 가입된 이메일입니다"}), 409
 
-        s.add(new_user)
-        s.flush() # user_id를 JWT에 담기 위해 DB에 미리 반영
+    # 팀 존재 여부 확인
+    team = s.get(Team, data["team_id"])
+    if not team:
+        return jsonify({"message": "존재하지 않는 팀입니다"}), 400
 
-        # JWT 발급
-        token = create_access_token(
-            identity=str(new_user.user_id),
-            expires_delta=timedelta(hours=JWT_ACCESS_TOKEN_HOURS)
-        )
+    # 새 User 객체 생성
+    new_user = User(
+        user_name=data["name"],
+        email=data["email"],
+        hashed_password=hashed_password,
+        position=data["position"]
+    )
+    # User와 Team 관계 설정 (User.team_id에 자동 반영됨)
+    new_user.team = team
 
-        return jsonify({
-            "token": token,
-            "name": new_user.user_name,
-            "position": new_user.position,
-            "team": team.team_name
-        }), 201
+    s.add(new_user)
+    s.flush() # user_id를 JWT에 담기 위해 DB에 미리 반영
+    bump_team_revisions(s, [team.team_id])  # 팀원 목록 ETag 갱신
+
+    # JWT 발급 (직위/팀/책임 클레임 포함)
+    token = issue_access_token(new_user)
+
+    return jsonify({
+        "token": token,
+        "name": new_user.user_name,
+        "position": new_user.position,
+        "team": team.team_name
+    }), 201
 
 # ── 로그인 ──────────────────────────────────────────────────────
 @bp_auth.route("/login", methods=["POST"])
@@ -66,36 +94,45 @@ def login():
         return jsonify({"message": "이메일/비밀번호 필요"}), 400
 
     # ## ORM 사용으로 변경
-    with get_session() as s:
-        # 이메일로 사용자 조회
-        user = (
-            s.query(User)
-            .options(joinedload(User.team)) # N+1 쿼리 방지를 위해 team 정보 함께 로드
-            .filter_by(email=data["email"])
-            .first()
+    s = request_session()
+    # 이메일로 사용자 조회
+    user = (
+        s.query(User)
+        .options(
+            joinedload(User.team), # N+1 쿼리 방지를 위해 team 정보 함께 로드
+            selectinload(User.responsibilities) # 토큰 권한 클레임용
         )
+        .filter_by(email=data["email"])
+        .first()
+    )
 
-        if not user or not check_password_hash(user.hashed_password, data["password"]):
-            return jsonify({"message": "자격 증명이 올바르지 않습니다"}), 401
-        
+    if not user or not hasher.verify(user.hashed_password, data["password"]):
+        return jsonify({"message": "자격 증명이 올바르지 않습니다"}), 401
 
-        token = create_access_token(
-            identity=str(user.user_id),
-            expires_delta=timedelta(hours=JWT_ACCESS_TOKEN_HOURS)
-        )
+    # 예전 알고리즘/비용으로 저장된 해시는 로그인 성공 시 현재 설정으로 재해싱 (응답은 기다리지 않음)
+    if PASSWORD_REHASH_ON_LOGIN and hasher.needs_rehash(user.hashed_password):
+        _rehash_in_background(user.user_id, user.hashed_password, data["password"])
 
-        return jsonify({
-            "token": token,
-            "name": user.user_name,
-            "email": user.email,
-            "position": user.position,
-            "team": user.team.team_name if user.team else "팀 없음"
-        }), 200
+    token = issue_access_token(user)
+
+    return jsonify({
+        "token": token,
+        "name": user.user_name,
+        "email": user.email,
+        "position": user.position,
+        "team": user.team.team_name if user.team else "팀 없음"
+    }), 200
 
 # ── 팀 목록 조회 (회원가입용) ──────────────────────────────────
 @bp_auth.get("/teams")
 def get_teams():
     """회원가입 폼에서 사용할 팀 목록을 반환"""
-    with get_session() as s:
-        teams = s.query(Team).order_by(Team.team_name).all()
-        return jsonify([{"id": t.team_id, "name": t.team_name} for t in teams])
+    s = request_session()
+    teams = s.query(Team).order_by(Team.team_name).all()
+    return jsonify([{"id": t.team_id, "name": t.team_name} for t in teams])
+
+# ── 해싱 워커 풀 상태 (대기열 깊이 등) ──────────────────────────
+@bp_auth.get("/hash-stats")
+@require_db_admin
+def get_hash_stats():
+    return jsonify(hasher.stats()), 200
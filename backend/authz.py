@@ -0,0 +1,165 @@
+# backend/authz.py
+# -*- coding: utf-8 -*-
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from datetime import timedelta
+
+from flask import g
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity
+from sqlalchemy import select, update
+from sqlalchemy.orm import selectinload
+
+from config import PERM_VERSION_CACHE_SECONDS, JWT_ACCESS_TOKEN_HOURS
+from orm_build import request_session, on_commit, User
+
+# ─────────────────────────────────────────────────────────────
+# 권한 주체(Principal): JWT에 서명된 직위/팀/책임 클레임
+@dataclass(frozen=True)
+class Principal:
+    user_id: int
+    position: str
+    team_id: Optional[int]
+    responsibilities: frozenset
+
+def build_claims(user: User) -> dict:
+    """access token의 additional_claims (user.responsibilities가 로드되어 있어야 함)"""
+    return {
+        "pos": user.position,
+        "team_id": user.team_id,
+        "resps": sorted(r.responsibility_name for r in user.responsibilities),
+        "pv": user.perm_version or 0,
+    }
+
+def issue_access_token(user: User) -> str:
+    """현재 권한 클레임으로 access token 발급 (user.perm_version/responsibilities가 최신이어야 함)"""
+    return create_access_token(
+        identity=str(user.user_id),
+        additional_claims=build_claims(user),
+        expires_delta=timedelta(hours=JWT_ACCESS_TOKEN_HOURS),
+    )
+
+# ─────────────────────────────────────────────────────────────
+# 사용자별 perm_version 캐시: {user_id: (version, 조회 시각)}
+# - 같은 프로세스: bump가 커밋되면 즉시 제거 (커밋 전에 다시 읽은 값이 남지 않도록 제거 시각 이후 조회만 캐시)
+# - 다른 프로세스: 제거가 전달되지 않음 → 회수된 권한은 최대 PERM_VERSION_CACHE_SECONDS 동안 유효할 수 있음
+#   (멀티 워커 운영에서 더 짧게 하려면 환경변수로 줄이면 됨, 0이면 매 요청 조회)
+_pv_cache: dict = {}
+_pv_evicted: dict = {}  # {user_id: 마지막 제거 시각}
+_pv_lock = threading.Lock()
+
+# 낡은 토큰(클레임 pv ≠ 현재 버전)용 권한 주체 캐시: {user_id: (version, Principal)}  LRU
+# - DB에서 다시 읽은 주체를 그 시점 버전과 함께 보관 → 버전이 같으면 재조회 없이 사용
+# - bump 커밋 시 _evict로 함께 제거 (다른 프로세스는 버전 캐시와 같은 지연)
+_PRINCIPAL_CACHE_MAX = 10000
+_principals: OrderedDict = OrderedDict()
+
+def _cached_version(uid: int) -> Optional[int]:
+    now = time.monotonic()
+    with _pv_lock:
+        hit = _pv_cache.get(uid)
+    if hit and now - hit[1] < PERM_VERSION_CACHE_SECONDS:
+        return hit[0]
+
+    version = request_session().execute(
+        select(User.perm_version).where(User.user_id == uid)
+    ).scalar_one_or_none()
+    _remember(uid, version, now)
+    return version
+
+def _remember(uid: int, version, read_at: float, principal=None):
+    if version is None:
+        return
+    with _pv_lock:
+        # 조회 도중 bump가 커밋됐으면 읽은 값이 낡았을 수 있음 → 캐시하지 않음
+        if _pv_evicted.get(uid, float("-inf")) < read_at:
+            _pv_cache[uid] = (version, read_at)
+            if principal is not None:
+                _principals[uid] = (version, principal)
+                _principals.move_to_end(uid)
+                while len(_principals) > _PRINCIPAL_CACHE_MAX:
+                    _principals.popitem(last=False)
+
+def _cached_principal(uid: int, version) -> Optional[Principal]:
+    with _pv_lock:
+        hit = _principals.get(uid)
+        if hit and hit[0] == version:
+            _principals.move_to_end(uid)
+            return hit[1]
+    return None
+
+def _evict(ids):
+    now = time.monotonic()
+    with _pv_lock:
+        for uid in ids:
+            _pv_cache.pop(uid, None)
+            _principals.pop(uid, None)
+            _pv_evicted[uid] = now
+        # 오래된 제거 기록 정리 (캐시 수명보다 오래된 것은 의미 없음)
+        if len(_pv_evicted) > 10000:
+            for uid, at in list(_pv_evicted.items()):
+                if now - at > PERM_VERSION_CACHE_SECONDS:
+                    del _pv_evicted[uid]
+
+def bump_permission_version(session, user_ids):
+    """직위/팀/책임이 바뀐 사용자의 perm_version +1 → 기존 토큰의 권한 클레임 무효화"""
+    ids = list({int(u) for u in user_ids})
+    if not ids:
+        return
+    session.execute(
+        update(User)
+        .where(User.user_id.in_(ids))
+        .values(perm_version=User.perm_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    # 커밋 전에 비우면 동시 요청이 옛 버전을 다시 캐시할 수 있음 → 커밋 후 제거
+    on_commit(session, lambda: _evict(ids))
+
+# ─────────────────────────────────────────────────────────────
+def _load_principal(uid: int) -> Optional[Principal]:
+    """클레임이 없거나 낡은 토큰: DB에서 현재 권한을 다시 읽음"""
+    read_at = time.monotonic()
+    s = request_session()
+    user = (
+        s.query(User)
+        .options(selectinload(User.responsibilities))
+        .filter(User.user_id == uid)
+        .first()
+    )
+    if not user:
+        return None
+    principal = Principal(
+        user_id=user.user_id,
+        position=(user.position or "").strip(),
+        team_id=user.team_id,
+        responsibilities=frozenset((r.responsibility_name or "").strip() for r in user.responsibilities),
+    )
+    _remember(uid, user.perm_version or 0, read_at, principal)
+    return principal
+
+def current_principal() -> Optional[Principal]:
+    """현재 요청의 권한 주체. 토큰 클레임이 최신(perm_version 일치)이면 DB 조회 없이 반환"""
+    if "principal" in g:
+        return g.principal
+
+    uid = int(get_jwt_identity())
+    claims = get_jwt()
+    version = _cached_version(uid)
+    if "pv" in claims and claims["pv"] == version:
+        principal = Principal(
+            user_id=uid,
+            position=(claims.get("pos") or "").strip(),
+            team_id=claims.get("team_id"),
+            responsibilities=frozenset((r or "").strip() for r in claims.get("resps", [])),
+        )
+    else:
+        # 낡은 토큰: 현재 버전으로 이미 읽어 둔 주체가 있으면 재사용 (없으면 DB 2회 조회)
+        principal = _cached_principal(uid, version) if version is not None else None
+        if principal is None:
+            principal = _load_principal(uid)
+
+    g.principal = principal
+    return principal
@@ -0,0 +1,106 @@
+# backend/bench_json.py
+# -*- coding: utf-8 -*-
+"""
+엔드포인트 응답 형태별 직렬화/압축 비용 측정 (DB 불필요, 합성 데이터)
+
+  python bench_json.py [--templates 300] [--defs 12] [--members 40] [--repeat 50]
+
+각 행: 응답 크기, 표준 json / FastJSONProvider 직렬화 시간(ms), gzip/brotli 압축 후 크기·시간
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from json_provider import FastJSONProvider, _default
+from compression import brotli
+from config import COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY
+
+# ─────────────────────────────────────────────────────────────
+# 엔드포인트별 응답 모양 (핸들러가 만드는 dict와 같은 구조)
+def workflow_templates(n, defs):
+    return [{
+        "workflow_template_id": i,
+        "template_name": f"워크플로우 템플릿 {i:04d}",
+        "description": "원료 입고부터 출하 판정까지의 표준 절차" if i % 3 else None,
+        "definitions": [{
+            "definition_id": i * 100 + j,
+            "task_template_id": 1000 + j,
+            "task_template_name": f"HACCP 점검 업무 {j:02d}",
+            "depends_on_task_template_id": 1000 + j - 1 if j else None,
+            "depends_on_task_template_name": f"HACCP 점검 업무 {j - 1:02d}" if j else None,
+        } for j in range(defs)],
+    } for i in range(n)]
+
+def task_templates(n):
+    return {"task_templates": [{
+        "task_template_id": i,
+        "template_name": f"업무 템플릿 {i:04d}",
+        "category": "HACCP" if i % 2 else "품질",
+        "description": "온도 기록 확인 및 이탈 시 조치 내용 작성",
+    } for i in range(n)]}
+
+def team_members(n):
+    return [{
+        "user_id": i,
+        "name": f"사용자{i}",
+        "position": "주임",
+        "email": f"user{i}@example.com",
+        "is_dt_expert": i % 5 == 0,
+        "responsibilities": [{"id": r, "name": f"책임 {r}"} for r in range(i % 4)],
+    } for i in range(n)]
+
+def ready_tasks(n):
+    base = datetime(2025, 1, 1, 9, 0, 0)
+    return [{
+        "task_id": i, "workflow_id": i // 8, "task_template_id": 1000 + i % 8,
+        "template_name": f"HACCP 점검 업무 {i % 8:02d}",
+        "created_at": base + timedelta(minutes=i),
+    } for i in range(n)]
+
+# ─────────────────────────────────────────────────────────────
+def _timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 직렬화/압축 벤치마크")
+    parser.add_argument("--templates", type=int, default=300)
+    parser.add_argument("--defs", type=int, default=12)
+    parser.add_argument("--members", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    provider = FastJSONProvider(app)
+    payloads = {
+        "workflow_management.list_workflow_templates": workflow_templates(args.templates, args.defs),
+        "task_management.get_task_templates": task_templates(args.templates),
+        "user_management.get_team_members": team_members(args.members),
+        "task_runtime.ready_tasks": ready_tasks(args.templates),
+    }
+
+    print(f"provider backend: {provider.backend}, brotli: {'yes' if brotli else 'no'}, repeat={args.repeat}")
+    header = f"{'endpoint':45} {'bytes':>9} {'json ms':>8} {'fast ms':>8} {'gzip':>9} {'gz ms':>7}"
+    if brotli:
+        header += f" {'br':>9} {'br ms':>7}"
+    print(header)
+    for name, obj in payloads.items():
+        # Flask 기본 jsonify와 같은 설정 (ensure_ascii, sort_keys, compact)
+        _, std_ms = _timed(lambda: json.dumps(obj, default=_default, sort_keys=True, separators=(",", ":")).encode(), args.repeat)
+        with app.app_context():
+            body, fast_ms = _timed(lambda: provider.response(obj).get_data(), args.repeat)
+        gz, gz_ms = _timed(lambda: gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0), args.repeat)
+        line = f"{name:45} {len(body):>9} {std_ms:>8.2f} {fast_ms:>8.2f} {len(gz):>9} {gz_ms:>7.2f}"
+        if brotli:
+            br, br_ms = _timed(lambda: brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY), args.repeat)
+            line += f" {len(br):>9} {br_ms:>7.2f}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,16 @@
+import threading
+import time
+from calendar import monthrange
+from collections import OrderedDict
+from datetime import datetime, date, timezone
+
 from flask import Blueprint, jsonify, request
-from datetime import datetime
+from flask_jwt_extended import jwt_required
+
+from config import CALENDAR_CACHE_SECONDS, CALENDAR_CACHE_MAX
+from orm_build import request_session, on_commit
+from rollup import counts_between
+from authz import current_principal
 
 bp_calendar = Blueprint("calendar", __name__, url_prefix="/api/calendar")
 
@@ -12,7 +23,6 @@ def get_calendar_dates():
         return jsonify({"error": "year and month are required"}), 400
 
     # 현재 월의 일수 계산
-    from calendar import monthrange
     days_in_month = monthrange(year, month)[1]
 
     # YYYY-MM-DD 형식 날짜 리스트 생성
@@ -22,3 +32,93 @@ def get_calendar_dates():
     ]
 
     return jsonify({"dates": date_list})
+
+# ─────────────────────────────────────────────────────────────
+# 월별 상태 집계 캐시: (team_id, year, month) → (저장 시각, 응답 payload)  LRU + TTL
+# 날짜 기준: 완료된 행은 completed_at, 그 외는 created_at (UTC) — rollup.bucket_day
+# - 같은 프로세스의 쓰기는 커밋 후 invalidate_month로 즉시 반영
+# - 다른 프로세스(워커/작업 큐)의 쓰기는 전달되지 않음 → 최대 CALENDAR_CACHE_SECONDS 뒤 다시 집계
+_month_cache: OrderedDict = OrderedDict()
+_generation: dict = {}  # 무효화 횟수: 집계 도중 무효화된 결과는 캐시에 넣지 않음
+_cache_lock = threading.Lock()
+
+def invalidate_month(team_id, year: int, month: int):
+    key = (team_id, year, month)
+    with _cache_lock:
+        _month_cache.pop(key, None)
+        _generation[key] = _generation.get(key, 0) + 1
+
+def invalidate_calendar(session, team_id, when=None):
+    """team_id의 when(기본: 지금) 월 버킷을 커밋 후 무효화"""
+    if team_id is None:
+        return
+    when = when or datetime.now(timezone.utc)
+    on_commit(session, lambda: invalidate_month(team_id, when.year, when.month))
+
+def _month_status(session, team_id: int, year: int, month: int) -> dict:
+    """롤업(daily_status_counts)에서 팀의 한 달치 행만 읽음 (PK 범위 조회)"""
+    start = date(year, month, 1).isoformat()
+    end = date(year, month, monthrange(year, month)[1]).isoformat()
+
+    days = {}
+    for day, kind, status, n in counts_between(session, team_id, start, end):
+        bucket = days.setdefault(day, {"tasks": {}, "requests": {}})
+        bucket[kind][status] = n
+    return {"year": year, "month": month, "days": days}
+
+def _cached_month(team_id: int, year: int, month: int) -> dict:
+    key = (team_id, year, month)
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _month_cache.get(key)
+        generation = _generation.get(key, 0)
+        if hit and now - hit[0] < CALENDAR_CACHE_SECONDS:
+            _month_cache.move_to_end(key)
+            return hit[1]
+    payload = _month_status(request_session(), *key)
+    with _cache_lock:
+        if _generation.get(key, 0) == generation:
+            _month_cache[key] = (now, payload)
+            _month_cache.move_to_end(key)
+            while len(_month_cache) > CALENDAR_CACHE_MAX:
+                _month_cache.popitem(last=False)
+    return payload
+
+def _year_month():
+    year = request.args.get("year", type=int)
+    month = request.args.get("month", type=int)
+    if not year or not month or not 1 <= month <= 12:
+        return None
+    return year, month
+
+@bp_calendar.get("/status")
+@jwt_required()
+def get_calendar_status():
+    """팀의 일자별 Task / 요청(fulfillment) 상태별 건수 (월 단위, 캐시)"""
+    ym = _year_month()
+    if not ym:
+        return jsonify({"error": "year and month are required"}), 400
+    year, month = ym
+
+    principal = current_principal()
+    if not principal or not principal.team_id:
+        return jsonify({"year": year, "month": month, "days": {}})
+    return jsonify(_cached_month(principal.team_id, year, month))
+
+@bp_calendar.get("/stats")
+@jwt_required()
+def get_calendar_stats():
+    """팀의 월간 Task / 요청 상태별 합계 (월 집계 캐시를 재사용)"""
+    ym = _year_month()
+    if not ym:
+        return jsonify({"error": "year and month are required"}), 400
+    year, month = ym
+
+    totals = {"tasks": {}, "requests": {}}
+    principal = current_principal()
+    if principal and principal.team_id:
+        for bucket in _cached_month(principal.team_id, year, month)["days"].values():
+            for kind, by_status in bucket.items():
+                for status, n in by_status.items():
+                    totals[kind][status] = totals[kind].get(status, 0) + n
+    return jsonify({"year": year, "month": month, "totals": totals})
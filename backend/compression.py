@@ -0,0 +1,74 @@
+# backend/compression.py
+# -*- coding: utf-8 -*-
+import gzip
+from typing import Optional
+
+from flask import request
+
+from config import COMPRESS_MIN_BYTES, COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY
+
+try:  # 선택 의존성: 없으면 gzip만 협상
+    import brotli
+except ImportError:
+    brotli = None
+
+# ─────────────────────────────────────────────────────────────
+# 응답 압축 (Accept-Encoding 협상: br > gzip)
+# - COMPRESS_MIN_BYTES 미만, 스트리밍/파일 전달, 304/204, 이미 인코딩된 응답은 그대로
+# - 압축하면 강한 ETag를 약한 ETag로 (바이트가 달라지므로, If-None-Match는 약한 비교)
+COMPRESSIBLE = {
+    "application/json", "application/javascript", "text/html", "text/css",
+    "text/plain", "text/csv", "image/svg+xml",
+}
+
+def _choose_encoding() -> Optional[str]:
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"] > 0:
+        return "br"
+    if accepted["gzip"] > 0:
+        return "gzip"
+    return None
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+def _weaken_etag(response):
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+def compress_response(response):
+    response.vary.add("Accept-Encoding")
+    if response.status_code == 304:
+        # 같은 클라이언트가 받았던 압축 응답과 같은 (약한) ETag를 돌려줌
+        if _choose_encoding() is not None:
+            _weaken_etag(response)
+        return response
+    if (
+        response.status_code < 200 or response.status_code in (204, 206)
+        or response.direct_passthrough or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE
+        or request.method == "HEAD"
+    ):
+        return response
+    length = response.content_length
+    if length is not None and length < COMPRESS_MIN_BYTES:
+        return response
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+    response.set_data(_compress(data, encoding))  # Content-Length도 갱신됨
+    response.headers["Content-Encoding"] = encoding
+    _weaken_etag(response)
+    return response
+
+def init_compression(app):
+    """create_app에서 호출. after_request는 역순 실행 → 세션 커밋 훅보다 먼저 등록해 마지막에 압축"""
+    app.after_request(compress_response)
@@ -7,6 +7,10 @@ from dotenv import load_dotenv
 # 루트 경로 (SQLAlchemy DB 파일 경로 설정 포함)
 BACKEND_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = BACKEND_DIR.parent
+
+# .env 로드 (아래 DATABASE_URL / DB_* 포함 모든 설정보다 먼저, 이미 있는 환경변수는 덮어쓰지 않음)
+load_dotenv(PROJECT_ROOT / ".env")
+
 DB_DIR = os.path.join(BACKEND_DIR, "db")
 os.makedirs(DB_DIR, exist_ok=True)
 DEFAULT_SQLITE = f"sqlite:///{os.path.join(DB_DIR, 'db.sqlite3')}"
@@ -15,13 +19,25 @@ DATABASE_URL = os.getenv("DATABASE_URL", DEFAULT_SQLITE)
 # SQLAlchemy 설정
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# DB 엔진 프로필: default | production (orm_build.ENGINE_PROFILES)
+DB_PROFILE = os.getenv("DB_PROFILE", "default")
 
-print(f"Backend_dir: {BACKEND_DIR}")
-print(f"DB_DIR: {DB_DIR}")
+def _env_int(name):
+    v = os.getenv(name)
+    return int(v) if v not in (None, "") else None
 
+# 프로필 값 개별 덮어쓰기 (미설정 시 프로필 기본값)
+DB_BUSY_TIMEOUT_MS = _env_int("DB_BUSY_TIMEOUT_MS")
+DB_MMAP_SIZE = _env_int("DB_MMAP_SIZE")
+DB_CACHE_SIZE = _env_int("DB_CACHE_SIZE")        # 음수면 KiB 단위 (SQLite 규칙)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE")
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW")
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE")    # 초
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT")    # 초
 
-# .env 로드
-load_dotenv(PROJECT_ROOT / ".env")
+
+print(f"Backend_dir: {BACKEND_DIR}")
+print(f"DB_DIR: {DB_DIR}")
 
 # ────────────── 시크릿 설정 ──────────────
 SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret")
@@ -31,5 +47,66 @@ ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin")
 JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret")
 JWT_ACCESS_TOKEN_HOURS = int(os.getenv("JWT_ACCESS_TOKEN_HOURS", "12"))
 JWT_REFRESH_TOKEN_DAYS = int(os.getenv("JWT_REFRESH_TOKEN_DAYS", "3"))
+# 토큰 권한 클레임 검증 시 사용자별 perm_version을 캐시하는 시간(초)
+PERM_VERSION_CACHE_SECONDS = int(os.getenv("PERM_VERSION_CACHE_SECONDS", "30"))
+
+# ────────────── 비밀번호 해싱 설정 ──────────────
+# werkzeug 해시 method 전체 표기 (예: "pbkdf2:sha256:600000", "scrypt:32768:8:1")
+# 기본값은 werkzeug 기본(scrypt) — 기존 DB의 해시와 같은 방식
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+# 로그인 성공 시 PASSWORD_HASH_METHOD와 다른 해시를 현재 방식으로 다시 저장 (해싱 풀에서 비동기, 끄려면 0)
+PASSWORD_REHASH_ON_LOGIN = os.getenv("PASSWORD_REHASH_ON_LOGIN", "1").lower() in ("1", "true", "yes")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_MAX = int(os.getenv("PASSWORD_HASH_QUEUE_MAX", "32"))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+
+
+
+# ────────────── 응답 압축 설정 ──────────────
+# 이 크기(바이트) 이상인 응답만 gzip/brotli 압축 (Accept-Encoding 협상)
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+# ────────────── 달력 집계 캐시 설정 ──────────────
+# 월별 상태 집계를 프로세스 안에 보관하는 시간(초). 무효화는 같은 프로세스에만 전달 → 다른 프로세스의 지연 상한
+CALENDAR_CACHE_SECONDS = float(os.getenv("CALENDAR_CACHE_SECONDS", "30"))
+CALENDAR_CACHE_MAX = int(os.getenv("CALENDAR_CACHE_MAX", "1024"))
+
+# ────────────── 요청 제출 설정 ──────────────
+# POST /api/requests 한 번에 받을 수 있는 최대 건수
+REQUEST_BATCH_MAX = int(os.getenv("REQUEST_BATCH_MAX", "5000"))
+
+# ────────────── 실시간 이벤트(SSE) 설정 ──────────────
+EVENTS_BUFFER = int(os.getenv("EVENTS_BUFFER", "256"))                # 구독자별 대기 이벤트 최대 수 (넘치면 resync)
+EVENTS_REPLAY = int(os.getenv("EVENTS_REPLAY", "1024"))              # 재접속(Last-Event-ID) 재전송용 최근 이벤트 수
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", "200"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_COALESCE = int(os.getenv("EVENTS_COALESCE", "100"))           # 한 트랜잭션에서 대상별 이 수를 넘으면 bulk 1건으로
+
+# ────────────── 백그라운드 작업 큐 설정 ──────────────
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "2"))                     # 0이면 이 프로세스에서 작업을 실행하지 않음
+JOBS_POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", "2"))          # 대기 작업 확인 주기 (enqueue 시에는 즉시 깨움)
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+JOBS_RETRY_BASE_SECONDS = float(os.getenv("JOBS_RETRY_BASE_SECONDS", "5"))  # 재시도 간격: base * 2^(시도-1)
+JOBS_LEASE_SECONDS = int(os.getenv("JOBS_LEASE_SECONDS", "600"))        # RUNNING이 이보다 오래되면 죽은 워커로 보고 회수
+JOBS_RETENTION_DAYS = int(os.getenv("JOBS_RETENTION_DAYS", "7"))        # 끝난 작업 보관 기간 (jobs.py purge)
+
+# ────────────── 모니터링(/metrics) 설정 ──────────────
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN") or None                      # 있으면 /metrics에 Bearer 토큰 필요 (없으면 로컬 접속만)
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "0").lower() in ("1", "true", "yes")  # 1이면 토큰/로컬 제한 없이 공개 (명시적으로만)
+METRICS_LATENCY_BUCKETS = tuple(                                       # 응답 지연 히스토그램 경계 (초)
+    float(b) for b in os.getenv("METRICS_LATENCY_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10").split(",")
+)
 
+# ────────────── 느린 SQL 로그 설정 ──────────────
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))                 # 이 시간(ms) 이상 걸린 SQL 기록 (0이면 끔)
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", os.path.join(BACKEND_DIR, "logs", "slow_queries.log"))
+SLOW_QUERY_LOG_BYTES = int(os.getenv("SLOW_QUERY_LOG_BYTES", str(5 * 1024 * 1024)))  # 이 크기를 넘으면 회전
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "3"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "1").lower() not in ("0", "false", "no")  # EXPLAIN QUERY PLAN 첨부
 
+# ────────────── N+1 쿼리 감지 (개발/테스트) ──────────────
+NPLUSONE_MODE = os.getenv("NPLUSONE_MODE", "off").lower()                 # off | warn | raise
+NPLUSONE_THRESHOLD = int(os.getenv("NPLUSONE_THRESHOLD", "5"))            # 한 요청에서 같은 SQL이 이 횟수를 넘으면 감지
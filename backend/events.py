@@ -0,0 +1,219 @@
+# backend/events.py
+# -*- coding: utf-8 -*-
+import itertools
+import json
+import threading
+import time
+from collections import deque
+
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import jwt_required
+from sqlalchemy import event
+
+from config import (
+    EVENTS_BUFFER, EVENTS_REPLAY, EVENTS_MAX_SUBSCRIBERS, EVENTS_HEARTBEAT_SECONDS, EVENTS_COALESCE,
+)
+from orm_build import SessionLocal, on_commit
+from json_provider import orjson, _default
+from authz import current_principal
+
+bp_events = Blueprint("events", __name__, url_prefix="/api/events")
+
+# ─────────────────────────────────────────────────────────────
+# 변경 이벤트 fan-out 허브 (프로세스 내)
+# - 이벤트: {"entity": "task"|"fulfillment"|"request"|"team", "id", "status"|"revision", ...}
+# - 대상: ("team", team_id) / ("user", user_id) → 구독자는 자기 팀 + 자기 자신 이벤트만 받음
+# - 발행은 커밋 후 (on_commit), 한 트랜잭션의 이벤트는 한 번에; 대상별로 너무 많으면 bulk 1건으로 합침
+# - 구독자별 버퍼는 EVENTS_BUFFER로 제한: 넘치면 쌓인 이벤트를 버리고 resync 1건 (발행자는 절대 대기하지 않음)
+# - 최근 EVENTS_REPLAY건은 보관 → Last-Event-ID로 재접속하면 놓친 이벤트를 이어서 받음
+RESYNC = object()
+
+def _dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default).decode()
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":"))
+
+class HubFull(Exception):
+    pass
+
+class Subscriber:
+    def __init__(self, team_id, user_id, maxsize: int):
+        self.keys = {("user", user_id)} | ({("team", team_id)} if team_id else set())
+        self.maxsize = maxsize
+        self.queue = deque()
+        self.overflowed = False
+        self.cond = threading.Condition()
+
+    def offer(self, message: str) -> bool:
+        """False = 버퍼가 넘쳐 버림 (다음 next()에서 resync)"""
+        with self.cond:
+            if self.overflowed:
+                return False
+            if len(self.queue) >= self.maxsize:
+                self.queue.clear()
+                self.overflowed = True
+                self.cond.notify()
+                return False
+            self.queue.append(message)
+            self.cond.notify()
+            return True
+
+    def next(self, timeout: float):
+        """다음 메시지 / RESYNC / None(timeout: heartbeat)"""
+        with self.cond:
+            if not self.queue and not self.overflowed:
+                self.cond.wait(timeout)
+            if self.overflowed:
+                self.overflowed = False
+                return RESYNC
+            return self.queue.popleft() if self.queue else None
+
+class EventHub:
+    def __init__(self, buffer: int, replay: int, max_subscribers: int):
+        self.buffer = buffer
+        self.max_subscribers = max_subscribers
+        self.epoch = format(int(time.time()), "x")  # 재기동 후의 Last-Event-ID는 이어 받을 수 없음
+        self._seq = itertools.count(1)
+        self._recent = deque(maxlen=replay)  # (seq, targets, message)
+        self._by_key: dict = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+        self.resyncs = 0
+
+    def subscribe(self, team_id, user_id, last_event_id=None) -> Subscriber:
+        sub = Subscriber(team_id, user_id, self.buffer)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise HubFull()
+            self._count += 1
+            for key in sub.keys:
+                self._by_key.setdefault(key, set()).add(sub)
+            if last_event_id:
+                self._replay(sub, last_event_id)
+        return sub
+
+    def _replay(self, sub, last_event_id):
+        epoch, _, seq = last_event_id.partition("-")
+        try:
+            seq = int(seq)
+        except ValueError:
+            seq = -1
+        oldest = self._recent[0][0] if self._recent else None
+        if epoch != self.epoch or seq < 0 or (oldest is not None and seq < oldest - 1):
+            sub.overflowed = True  # 놓친 이벤트를 알 수 없음 → 목록을 다시 받도록
+            self.resyncs += 1
+            return
+        for s, targets, message in self._recent:
+            if s > seq and sub.keys & targets:
+                sub.offer(message)
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._count -= 1
+            for key in sub.keys:
+                subs = self._by_key.get(key)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._by_key[key]
+
+    def publish(self, events):
+        """events: [(targets frozenset, payload dict), ...]"""
+        with self._lock:
+            for targets, payload in events:
+                seq = next(self._seq)
+                message = f"id: {self.epoch}-{seq}\ndata: {_dumps(payload)}\n\n"
+                self._recent.append((seq, targets, message))
+                subs = set().union(*(self._by_key.get(k, ()) for k in targets))
+                for sub in subs:
+                    if not sub.offer(message):
+                        self.dropped += 1
+                self.published += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": self._count,
+                "published": self.published,
+                "dropped": self.dropped,
+                "resyncs": self.resyncs,
+                "buffer": self.buffer,
+                "replay": self._recent.maxlen,
+            }
+
+hub = EventHub(EVENTS_BUFFER, EVENTS_REPLAY, EVENTS_MAX_SUBSCRIBERS)
+
+# ─────────────────────────────────────────────────────────────
+# 발행: 상태를 바꾼 쪽이 같은 트랜잭션에서 호출 → 커밋되면 허브로
+def _flush(pending):
+    # 대상·종류별로 EVENTS_COALESCE건을 넘으면 {"entity", "bulk": n} 1건 (클라이언트는 목록을 다시 받음)
+    groups = {}
+    for targets, payload in pending:
+        groups.setdefault((targets, payload["entity"]), []).append(payload)
+    events = []
+    for (targets, entity), payloads in groups.items():
+        if len(payloads) > EVENTS_COALESCE:
+            events.append((targets, {"entity": entity, "bulk": len(payloads)}))
+        else:
+            events.extend((targets, p) for p in payloads)
+    hub.publish(events)
+
+def publish(session, entity: str, entity_id, *, teams=(), users=(), **fields):
+    targets = frozenset(
+        [("team", t) for t in teams if t is not None] + [("user", u) for u in users if u is not None]
+    )
+    if not targets:
+        return
+    pending = session.info.get("pending_events")
+    if pending is None:
+        pending = session.info["pending_events"] = []
+        on_commit(session, lambda: _flush(session.info.pop("pending_events", [])))
+    pending.append((targets, {"entity": entity, "id": entity_id, **fields}))
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_pending(session):
+    session.info.pop("pending_events", None)
+
+# ─────────────────────────────────────────────────────────────
+# SSE 스트림: EventSource는 헤더를 못 붙이므로 ?jwt=<토큰>도 허용 (이 엔드포인트만)
+@bp_events.get("/stream")
+@jwt_required(locations=["headers", "query_string"])
+def stream():
+    principal = current_principal()
+    if not principal:
+        return jsonify({"message": "유저를 찾을 수 없습니다"}), 404
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        sub = hub.subscribe(principal.team_id, principal.user_id, last_event_id)
+    except HubFull:
+        resp = jsonify({"message": "실시간 연결이 너무 많습니다. 잠시 후 다시 시도하세요"})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = "30"
+        return resp
+
+    def generate():
+        # DB 세션/요청 컨텍스트를 쓰지 않음 (응답 반환 시 이미 정리됨)
+        try:
+            yield "retry: 3000\n: connected\n\n"
+            while True:
+                message = sub.next(EVENTS_HEARTBEAT_SECONDS)
+                if message is None:
+                    yield ": ping\n\n"
+                elif message is RESYNC:
+                    yield 'data: {"entity":"resync"}\n\n'
+                else:
+                    yield message
+        finally:
+            hub.unsubscribe(sub)
+
+    resp = Response(generate(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # 프록시 버퍼링 끔
+    return resp
+
+@bp_events.get("/stats")
+@jwt_required()
+def stats():
+    return jsonify(hub.stats())
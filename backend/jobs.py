@@ -0,0 +1,319 @@
+# backend/jobs.py
+# -*- coding: utf-8 -*-
+"""
+SQLite jobs 테이블 기반 백그라운드 작업 큐 (외부 브로커 없음)
+
+  python jobs.py run [--workers 2]   웹 서버 없이 작업만 처리하는 워커 프로세스
+  python jobs.py purge [--days 7]    끝난 작업 중 오래된 것 삭제
+"""
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+
+from flask import Blueprint, jsonify, request, url_for
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select, update, delete, or_, and_
+from sqlalchemy.exc import IntegrityError
+
+from config import (
+    JOBS_WORKERS, JOBS_POLL_SECONDS, JOBS_MAX_ATTEMPTS, JOBS_RETRY_BASE_SECONDS,
+    JOBS_LEASE_SECONDS, JOBS_RETENTION_DAYS,
+)
+from orm_build import Job, get_session, request_session, on_commit
+from authz import current_principal
+from events import publish
+
+bp_jobs = Blueprint("jobs", __name__, url_prefix="/api/jobs")
+
+# ─────────────────────────────────────────────────────────────
+# 작업 종류 등록: @job_handler("kind") def fn(session, payload, ctx) -> dict(result)
+# - fn은 워커의 트랜잭션 안에서 실행, 정상 반환 시 결과와 함께 커밋 (예외면 전부 롤백)
+# - JobFailed: 재시도해도 소용없는 실패 (검증 오류 등) → 바로 FAILED
+# - 그 외 예외: attempts < max_attempts 이면 지수 백오프 후 다시 QUEUED (IntegrityError 제외)
+# - JOBS_LEASE_SECONDS보다 오래 걸려 다른 워커가 회수한 실행은 커밋 직전 리스 확인에서 걸려 전부 롤백
+# - 진행률은 프로세스 메모리에 (작업 트랜잭션이 쓰기 락을 쥐고 있어 행을 갱신할 수 없음), 끝나면 행에 기록
+_handlers: dict = {}
+FINISHED = ("SUCCEEDED", "FAILED", "CANCELLED")
+
+class JobFailed(Exception):
+    pass
+
+class _LeaseLost(Exception):
+    """실행 중 리스가 지나 다른 워커가 회수함 → 이 실행의 변경은 롤백"""
+
+def job_handler(kind: str):
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class JobContext:
+    def __init__(self, job_id: int, attempt: int):
+        self.job_id = job_id
+        self.attempt = attempt
+
+    def progress(self, done: int, total: int, message: str = None):
+        percent = min(100, round(100 * done / total)) if total else 0
+        with _live_lock:
+            _live[self.job_id] = {"progress": percent, "message": message}
+
+_live: dict = {}  # 실행 중인 작업의 진행률 {job_id: {"progress", "message"}}
+_live_lock = threading.Lock()
+_wakeup = threading.Event()
+
+# ─────────────────────────────────────────────────────────────
+# 등록: 호출자의 트랜잭션에 행을 넣고, 커밋되면 워커를 깨움
+def enqueue(session, kind: str, payload: dict, *, requested_by=None, team_id=None,
+            max_attempts: int = JOBS_MAX_ATTEMPTS) -> Job:
+    if kind not in _handlers:
+        raise ValueError(f"등록되지 않은 작업 종류: {kind}")
+    job = Job(kind=kind, payload=payload, requested_by=requested_by, team_id=team_id,
+              max_attempts=max_attempts, run_after=_utcnow())
+    session.add(job)
+    session.flush()
+    on_commit(session, _wakeup.set)
+    return job
+
+def job_accepted(job: Job):
+    """202 Accepted + Location (상태 조회 URL)"""
+    status_url = url_for("jobs.get_job", job_id=job.job_id)
+    resp = jsonify({"job_id": job.job_id, "status": job.status, "status_url": status_url})
+    resp.status_code = 202
+    resp.headers["Location"] = status_url
+    return resp
+
+def wants_async() -> bool:
+    """Prefer: respond-async 헤더 또는 ?async=1 이면 작업으로 돌림"""
+    prefer = request.headers.get("Prefer", "")
+    return "respond-async" in prefer.lower() or request.args.get("async") in ("1", "true")
+
+# ─────────────────────────────────────────────────────────────
+# 워커
+def _claim(worker_id: str):
+    """실행할 작업 1건을 RUNNING으로 (UPDATE … RETURNING 한 문장 → 워커끼리 중복 실행 없음)"""
+    now = _utcnow()
+    runnable = or_(
+        and_(Job.status == "QUEUED", Job.run_after <= now),
+        # 리스가 지난 RUNNING = 처리 중 죽은 워커 → 회수
+        and_(Job.status == "RUNNING", Job.locked_at < now - timedelta(seconds=JOBS_LEASE_SECONDS)),
+    )
+    next_id = select(Job.job_id).where(runnable).order_by(Job.run_after, Job.job_id).limit(1).scalar_subquery()
+    with get_session() as s:
+        row = s.execute(
+            update(Job)
+            .where(Job.job_id == next_id, runnable)
+            .values(status="RUNNING", locked_by=worker_id, locked_at=now,
+                    attempts=Job.attempts + 1, started_at=now, error=None)
+            .returning(Job.job_id, Job.kind, Job.payload, Job.attempts, Job.max_attempts, Job.requested_by)
+            .execution_options(synchronize_session=False)
+        ).first()
+    return row
+
+def _finish(job_id, worker_id, requested_by, **values):
+    """결과 기록 (다른 워커가 리스를 가져갔으면 무시)"""
+    with get_session() as s:
+        done = s.execute(
+            update(Job)
+            .where(Job.job_id == job_id, Job.status == "RUNNING", Job.locked_by == worker_id)
+            .values(locked_by=None, locked_at=None, **values)
+            .returning(Job.status)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        if done is not None:
+            publish(s, "job", job_id, users=[requested_by], status=done, progress=values.get("progress"))
+
+def run_one(worker_id: str) -> bool:
+    """작업 1건 처리. 처리할 작업이 없으면 False"""
+    row = _claim(worker_id)
+    if row is None:
+        return False
+    job_id, kind, payload, attempts, max_attempts, requested_by = row
+    ctx = JobContext(job_id, attempts)
+    try:
+        handler = _handlers.get(kind)
+        if handler is None:
+            raise JobFailed(f"등록되지 않은 작업 종류: {kind}")
+        with get_session() as s:
+            result = handler(s, payload or {}, ctx)
+            # 결과는 작업과 같은 트랜잭션에서 기록 → 데이터 변경과 SUCCEEDED가 함께 커밋
+            # 리스 확인도 같은 트랜잭션에서: 이미 다른 워커가 회수했으면 0행 → 전부 롤백 (중복 실행이 커밋되지 않음)
+            # (이 트랜잭션이 쓰기 락을 쥔 동안에는 회수 UPDATE가 커밋까지 기다림)
+            owned = s.execute(
+                update(Job)
+                .where(Job.job_id == job_id, Job.status == "RUNNING", Job.locked_by == worker_id)
+                .values(status="SUCCEEDED", result=result, progress=100, finished_at=_utcnow(),
+                        locked_by=None, locked_at=None)
+                .returning(Job.job_id)
+                .execution_options(synchronize_session=False)
+            ).scalar_one_or_none()
+            if owned is None:
+                raise _LeaseLost()
+            publish(s, "job", job_id, users=[requested_by], status="SUCCEEDED", progress=100)
+    except _LeaseLost:
+        print(f"⚠️ 작업 {job_id}({kind}) 리스 상실: 다른 워커가 회수 → 이 실행의 변경은 롤백")
+    except JobFailed as e:
+        _finish(job_id, worker_id, requested_by, status="FAILED", error=str(e), finished_at=_utcnow())
+    except Exception as e:
+        error = traceback.format_exception_only(type(e), e)[0].strip().splitlines()[0]  # SQL/파라미터 줄 제외
+        # 제약 위반(이름 중복 등)은 다시 해도 같음 → 재시도하지 않음
+        if attempts < max_attempts and not isinstance(e, IntegrityError):
+            delay = JOBS_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+            _finish(job_id, worker_id, requested_by, status="QUEUED", error=error,
+                    run_after=_utcnow() + timedelta(seconds=delay))
+        else:
+            print(f"⚠️ 작업 {job_id}({kind}) 최종 실패: {error}")
+            _finish(job_id, worker_id, requested_by, status="FAILED", error=error, finished_at=_utcnow())
+    finally:
+        with _live_lock:
+            _live.pop(job_id, None)
+    return True
+
+class JobWorkers:
+    def __init__(self, workers: int, poll: float):
+        self.workers = workers
+        self.poll = poll
+        self._stop = threading.Event()
+        self._threads = []
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def _loop(self, worker_id: str):
+        while not self._stop.is_set():
+            try:
+                if run_one(worker_id):
+                    continue
+            except Exception as e:  # DB 잠금 등: 잠시 후 다시
+                print(f"⚠️ 작업 워커 {worker_id} 오류: {e!r}")
+            _wakeup.wait(self.poll)
+            _wakeup.clear()
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, args=(f"{self._prefix}:{i}",),
+                                 name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        _wakeup.set()
+        for t in self._threads:
+            t.join(timeout)
+
+_workers = None
+
+def start_workers(workers: int = JOBS_WORKERS):
+    """create_app에서 호출 (프로세스당 한 번). workers=0이면 등록만 하고 실행은 다른 프로세스에 맡김"""
+    global _workers
+    if _workers is None and workers > 0:
+        _workers = JobWorkers(workers, JOBS_POLL_SECONDS)
+        _workers.start()
+    return _workers
+
+def purge(days: int = JOBS_RETENTION_DAYS) -> int:
+    with get_session() as s:
+        return s.execute(
+            delete(Job).where(Job.status.in_(FINISHED), Job.finished_at < _utcnow() - timedelta(days=days))
+        ).rowcount
+
+# ─────────────────────────────────────────────────────────────
+# 상태 조회 API (요청한 본인 것만)
+def _serialize(job: Job) -> dict:
+    data = {
+        "job_id": job.job_id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "message": None,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+    if job.status == "RUNNING":
+        with _live_lock:
+            data.update(_live.get(job.job_id, {}))
+    return data
+
+@bp_jobs.get("/<int:job_id>")
+@jwt_required()
+def get_job(job_id: int):
+    principal = current_principal()
+    job = request_session().get(Job, job_id)
+    if job is None or not principal or job.requested_by != principal.user_id:
+        return jsonify({"message": "작업을 찾을 수 없습니다"}), 404
+    return jsonify(_serialize(job)), 200
+
+@bp_jobs.get("")
+@jwt_required()
+def list_jobs():
+    """내 작업 최근순 (?status=QUEUED,RUNNING&limit=50)"""
+    principal = current_principal()
+    if not principal:
+        return jsonify({"message": "유저를 찾을 수 없습니다"}), 404
+    limit = min(max(request.args.get("limit", 50, type=int) or 50, 1), 200)
+    stmt = select(Job).where(Job.requested_by == principal.user_id)
+    statuses = [x.strip().upper() for x in (request.args.get("status") or "").split(",") if x.strip()]
+    if statuses:
+        stmt = stmt.where(Job.status.in_(statuses))
+    jobs = request_session().execute(stmt.order_by(Job.job_id.desc()).limit(limit)).scalars().all()
+    return jsonify([_serialize(j) for j in jobs]), 200
+
+@bp_jobs.delete("/<int:job_id>")
+@jwt_required()
+def cancel_job(job_id: int):
+    """대기 중(QUEUED)인 작업만 취소 가능"""
+    principal = current_principal()
+    s = request_session()
+    job = s.get(Job, job_id)
+    if job is None or not principal or job.requested_by != principal.user_id:
+        return jsonify({"message": "작업을 찾을 수 없습니다"}), 404
+    cancelled = s.execute(
+        update(Job)
+        .where(Job.job_id == job_id, Job.status == "QUEUED")
+        .values(status="CANCELLED", finished_at=_utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not cancelled:
+        return jsonify({"message": f"{job.status} 상태의 작업은 취소할 수 없습니다"}), 409
+    return jsonify({"job_id": job_id, "status": "CANCELLED"}), 200
+
+
+if __name__ == "__main__":
+    import argparse
+    import signal
+
+    parser = argparse.ArgumentParser(description="백그라운드 작업 큐")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_run = sub.add_parser("run", help="작업 처리 워커 실행")
+    p_run.add_argument("--workers", type=int, default=max(JOBS_WORKERS, 1))
+    p_purge = sub.add_parser("purge", help="끝난 작업 정리")
+    p_purge.add_argument("--days", type=int, default=JOBS_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    # 스크립트로 실행하면 이 파일은 __main__ → 핸들러가 등록되는 jobs 모듈 쪽을 사용
+    import jobs
+    import workflow_template_management  # noqa: F401  작업 종류 등록
+
+    if args.cmd == "purge":
+        print(f"✅ 작업 {jobs.purge(args.days)}건 삭제")
+    else:
+        workers = jobs.JobWorkers(args.workers, JOBS_POLL_SECONDS)
+        workers.start()
+        print(f"🛠  작업 워커 {args.workers}개 실행 중 (Ctrl+C로 종료)")
+        stopped = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+        try:
+            while not stopped.wait(1):
+                pass
+        except KeyboardInterrupt:
+            pass
+        workers.stop()
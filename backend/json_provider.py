@@ -0,0 +1,77 @@
+# backend/json_provider.py
+# -*- coding: utf-8 -*-
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:  # 선택 의존성: 없으면 표준 json으로 동작 (출력 형식은 동일)
+    import orjson
+except ImportError:
+    orjson = None
+
+# ─────────────────────────────────────────────────────────────
+# app.json 교체용 JSON provider (create_app에서 설정)
+# - orjson이 있으면 dict → bytes 직렬화를 C 확장으로 (jsonify 포함 전 블루프린트 적용)
+# - 날짜/시각은 두 경로 모두 ISO 8601 (Flask 기본값인 HTTP-date 형식 대신)
+# - 한글은 \uXXXX 이스케이프 없이 UTF-8 그대로
+
+def _default(o):
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"JSON으로 직렬화할 수 없는 타입: {type(o).__name__}")
+
+class FastJSONProvider(DefaultJSONProvider):
+    ensure_ascii = False
+    default = staticmethod(_default)
+
+    @property
+    def backend(self) -> str:
+        return "orjson" if orjson is not None else "json"
+
+    def _orjson_option(self, pretty: bool = False) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _stdlib_dumps(self, obj, **kwargs) -> str:
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def dumps(self, obj, **kwargs) -> str:
+        # indent 등 추가 옵션이 오면 표준 json으로 (orjson은 옵션 집합이 다름)
+        if orjson is None or kwargs:
+            return self._stdlib_dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._orjson_option()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        if orjson is None:
+            body = self._stdlib_dumps(obj, indent=2 if pretty else None,
+                                      separators=None if pretty else (",", ":"))
+            return self._app.response_class(f"{body}\n", mimetype=self.mimetype)
+        # bytes를 그대로 응답 본문으로 (str 디코딩/재인코딩 생략)
+        body = orjson.dumps(obj, default=_default, option=self._orjson_option(pretty))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
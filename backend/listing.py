@@ -0,0 +1,102 @@
+# backend/listing.py
+# -*- coding: utf-8 -*-
+import base64
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from flask import request, jsonify
+from sqlalchemy import or_, and_
+
+# ─────────────────────────────────────────────────────────────
+# 목록 API 공통: keyset 페이지네이션 (name, id) + 이름 접두어/분류 필터 + fields=
+#   ?limit=50&cursor=<X-Next-Cursor 값>&q=<이름 접두어>&category=<분류>&fields=a,b
+# - limit가 없으면 기존처럼 전체 반환 (응답 본문 모양은 그대로)
+# - 다음 페이지가 있으면 응답 헤더 X-Next-Cursor에 불투명 커서를 실어 보냄
+MAX_LIMIT = 500
+
+class ListingError(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class ListParams:
+    limit: Optional[int]
+    after: Optional[tuple]       # (name, id): 이 키 다음부터
+    prefix: Optional[str]
+    category: Optional[str]
+    fields: Optional[frozenset]  # None = 전체 필드
+
+    def wants(self, field: str) -> bool:
+        return self.fields is None or field in self.fields
+
+def encode_cursor(name, row_id) -> str:
+    raw = json.dumps([name, row_id], ensure_ascii=False, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, row_id = json.loads(raw)
+        return name, int(row_id)
+    except (ValueError, TypeError):
+        raise ListingError("cursor 형식이 올바르지 않습니다")
+
+def list_params() -> ListParams:
+    args = request.args
+    limit = args.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ListingError("limit는 정수여야 합니다")
+        if limit < 1:
+            raise ListingError("limit는 1 이상이어야 합니다")
+        limit = min(limit, MAX_LIMIT)
+    cursor = args.get("cursor")
+    fields = args.get("fields")
+    return ListParams(
+        limit=limit,
+        after=decode_cursor(cursor) if cursor else None,
+        prefix=(args.get("q") or "").strip() or None,
+        category=(args.get("category") or "").strip() or None,
+        fields=frozenset(f.strip() for f in fields.split(",") if f.strip()) if fields else None,
+    )
+
+def apply_listing(stmt, params: ListParams, name_col, id_col, category_col=None):
+    """필터 + (name, id) 정렬 + keyset 조건 + limit(+1: 다음 페이지 유무 확인용)"""
+    if params.prefix:
+        # LIKE 대신 범위 조건 → 이름 인덱스 범위 탐색 가능 (대소문자 구분)
+        stmt = stmt.where(name_col >= params.prefix, name_col < params.prefix + "\U0010ffff")
+    if params.category and category_col is not None:
+        stmt = stmt.where(category_col == params.category)
+    if params.after:
+        name, row_id = params.after
+        stmt = stmt.where(or_(name_col > name, and_(name_col == name, id_col > row_id)))
+    stmt = stmt.order_by(name_col.asc(), id_col.asc())
+    if params.limit:
+        stmt = stmt.limit(params.limit + 1)
+    return stmt
+
+def paginate(rows: list, params: ListParams, key) -> tuple:
+    """(이번 페이지 rows, 다음 커서 또는 None). key(row) → (name, id)"""
+    if params.limit and len(rows) > params.limit:
+        rows = rows[:params.limit]
+        return rows, encode_cursor(*key(rows[-1]))
+    return rows, None
+
+def sparse(item: dict, params: ListParams, keep=()) -> dict:
+    """fields=가 있으면 요청한 필드 (+ keep: id 등 항상 포함할 필드)만 남김"""
+    if params.fields is None:
+        return item
+    return {k: v for k, v in item.items() if k in params.fields or k in keep}
+
+def listing_response(payload, next_cursor: Optional[str], status: int = 200):
+    resp = jsonify(payload)
+    resp.status_code = status
+    if next_cursor:
+        resp.headers["X-Next-Cursor"] = next_cursor
+    return resp
+
+def listing_error(e: ListingError):
+    """create_app에서 등록하는 에러 핸들러"""
+    return jsonify({"message": str(e)}), 400
@@ -0,0 +1,262 @@
+# backend/metrics.py
+# -*- coding: utf-8 -*-
+import hmac
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import Response, g, request
+from sqlalchemy import event, select, func
+
+from config import METRICS_ENABLED, METRICS_TOKEN, METRICS_PUBLIC, METRICS_LATENCY_BUCKETS
+from orm_build import engine, MeteredQueuePool, Job, get_session
+
+# ─────────────────────────────────────────────────────────────
+# 엔드포인트별 지연/SQL 수/DB 시간 + 커넥션 풀 대기 → GET /metrics (Prometheus text format 0.0.4)
+# - 엔드포인트 라벨은 Flask endpoint 이름 ("블루프린트.함수", 매칭 실패는 "unmatched") → 라벨 수가 라우트 수로 제한됨
+# - SQL은 engine의 before/after_cursor_execute로 측정, 요청 밖(작업 워커 등)에서 실행된 SQL은 "background"
+# - 지연은 압축·커밋까지 포함 (after_request 훅 중 가장 마지막에 실행되도록 가장 먼저 등록)
+# - 외부 의존성 없음 (prometheus_client 미사용)
+SQL_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+DB_SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+BACKGROUND = "background"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict = {}
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=()):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._values.items())
+        lines = self.header()
+        names = self.labelnames + ("le",)
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(names, labels + (_number(bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+def _gauges(name, help_text, samples, labelnames=()) -> list:
+    """스크레이프 시점에 읽는 값 (samples: [(라벨 값 tuple, 값), ...])"""
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"] + [
+        f"{name}{_labels(labelnames, k)} {_number(v)}" for k, v in samples
+    ]
+
+# ─────────────────────────────────────────────────────────────
+REQUESTS = Counter("app_http_requests_total", "HTTP requests", ("endpoint", "method", "status"))
+LATENCY = Histogram("app_http_request_duration_seconds", "HTTP request latency (seconds)",
+                    ("endpoint",), METRICS_LATENCY_BUCKETS)
+SQL_PER_REQUEST = Histogram("app_http_request_sql_statements", "SQL statements executed per request",
+                            ("endpoint",), SQL_COUNT_BUCKETS)
+DB_PER_REQUEST = Histogram("app_http_request_db_seconds", "Time spent in SQL per request (seconds)",
+                           ("endpoint",), DB_SECONDS_BUCKETS)
+SQL_TOTAL = Counter("app_db_statements_total", "SQL statements executed", ("endpoint",))
+DB_TIME = Counter("app_db_seconds_total", "Time spent in SQL (seconds)", ("endpoint",))
+POOL_WAIT = Histogram("app_db_pool_checkout_wait_seconds", "Connection pool checkout wait (seconds)",
+                      (), POOL_WAIT_BUCKETS)
+POOL_TIMEOUTS = Counter("app_db_pool_checkout_timeouts_total", "Connection pool checkout timeouts")
+REGISTRY = (REQUESTS, LATENCY, SQL_PER_REQUEST, DB_PER_REQUEST, SQL_TOTAL, DB_TIME, POOL_WAIT, POOL_TIMEOUTS)
+
+class _Tally:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+_tally: ContextVar = ContextVar("metrics_sql_tally", default=None)
+
+# ─────────────────────────────────────────────────────────────
+# SQL 측정 (커넥션별 시작 시각 스택: 커서 실행이 중첩되지 않아도 예외 시 정리되도록)
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("metrics_started")
+    if not started:
+        return
+    _record_sql(time.perf_counter() - started.pop())
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    started = conn.info.get("metrics_started") if conn is not None else None
+    if started:
+        _record_sql(time.perf_counter() - started.pop())
+
+def _record_sql(elapsed: float):
+    tally = _tally.get()
+    if tally is None:
+        SQL_TOTAL.inc(BACKGROUND)
+        DB_TIME.inc(BACKGROUND, amount=elapsed)
+        return
+    tally.statements += 1
+    tally.seconds += elapsed
+
+def _observe_pool_wait(seconds: float, timed_out: bool):
+    POOL_WAIT.observe(seconds)
+    if timed_out:
+        POOL_TIMEOUTS.inc()
+
+# ─────────────────────────────────────────────────────────────
+# 요청 훅
+def _endpoint() -> str:
+    return request.endpoint or "unmatched"
+
+def _start():
+    g.metrics_started = time.perf_counter()
+    g.metrics_token = _tally.set(_Tally())
+
+def _finish(response):
+    started = g.pop("metrics_started", None)
+    token = g.pop("metrics_token", None)
+    if started is None:
+        return response
+    tally = _tally.get()
+    if token is not None:
+        _tally.reset(token)
+    endpoint = _endpoint()
+    LATENCY.observe(time.perf_counter() - started, endpoint)
+    REQUESTS.inc(endpoint, request.method, response.status_code)
+    if tally is not None:
+        SQL_PER_REQUEST.observe(tally.statements, endpoint)
+        DB_PER_REQUEST.observe(tally.seconds, endpoint)
+        SQL_TOTAL.inc(endpoint, amount=tally.statements)
+        DB_TIME.inc(endpoint, amount=tally.seconds)
+    return response
+
+# ─────────────────────────────────────────────────────────────
+# 다른 모듈의 상태 (스크레이프 시점)
+def _runtime_gauges() -> list:
+    from events import hub
+    from password_hasher import hasher
+
+    lines = []
+    pool = engine.pool
+    if isinstance(pool, MeteredQueuePool):
+        lines += _gauges("app_db_pool_size", "Connection pool size", [((), pool.size())])
+        lines += _gauges("app_db_pool_checked_out", "Connections currently checked out", [((), pool.checkedout())])
+        lines += _gauges("app_db_pool_overflow", "Overflow connections in use", [((), max(pool.overflow(), 0))])
+
+    events = hub.stats()
+    lines += _gauges("app_events_subscribers", "Connected SSE subscribers", [((), events["subscribers"])])
+    for key in ("published", "dropped", "resyncs"):
+        lines += [f"# HELP app_events_{key}_total SSE events {key}", f"# TYPE app_events_{key}_total counter",
+                  f"app_events_{key}_total {events[key]}"]
+
+    pw = hasher.stats()
+    lines += _gauges("app_password_hasher_queue", "Password hashing jobs by state",
+                     [(("queued",), pw["queued"]), (("in_flight",), pw["in_flight"])], ("state",))
+    lines += ["# HELP app_password_hasher_rejected_total Password hashing requests rejected (busy)",
+              "# TYPE app_password_hasher_rejected_total counter",
+              f"app_password_hasher_rejected_total {pw['rejected']}"]
+
+    with get_session(readonly=True) as s:
+        jobs = s.execute(
+            select(Job.status, func.count()).where(Job.status.in_(("QUEUED", "RUNNING"))).group_by(Job.status)
+        ).all()
+    counts = dict(jobs)
+    lines += _gauges("app_jobs", "Background jobs waiting or running",
+                     [((status,), counts.get(status, 0)) for status in ("QUEUED", "RUNNING")], ("status",))
+    return lines
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    lines += _runtime_gauges()
+    return "\n".join(lines) + "\n"
+
+LOOPBACK = ("127.0.0.1", "::1")
+
+def _is_local_request() -> bool:
+    # 같은 호스트의 리버스 프록시를 거친 요청도 remote_addr가 루프백 → 전달 헤더가 있으면 로컬로 보지 않음
+    if request.headers.get("X-Forwarded-For") or request.headers.get("Forwarded"):
+        return False
+    return request.remote_addr in LOOPBACK
+
+def metrics_endpoint():
+    # 접근 제한 (공개는 METRICS_PUBLIC=1로 명시적으로만)
+    # - METRICS_TOKEN 있음: Authorization: Bearer <토큰> 필요 (JWT와 별개, 스크레이퍼용)
+    # - 없음: 같은 호스트에서 직접 온 요청만
+    if METRICS_TOKEN:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied.encode(), METRICS_TOKEN.encode()):
+            return Response("unauthorized\n", status=401, mimetype="text/plain")
+    elif not METRICS_PUBLIC and not _is_local_request():
+        return Response("forbidden (set METRICS_TOKEN or METRICS_PUBLIC=1)\n", status=403, mimetype="text/plain")
+    return Response(render(), content_type="text/plain; version=0.0.4; charset=utf-8",
+                    headers={"Cache-Control": "no-store"})
+
+_installed = False
+
+def init_metrics(app):
+    """create_app에서 다른 after_request 훅보다 먼저 호출 (Flask는 등록 역순으로 실행)"""
+    global _installed
+    if not METRICS_ENABLED:
+        return
+    if not _installed:  # 엔진/풀 리스너는 프로세스당 한 번
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+        MeteredQueuePool.wait_observers.append(_observe_pool_wait)
+        _installed = True
+    app.before_request(_start)
+    app.after_request(_finish)
+    app.add_url_rule("/metrics", "metrics", metrics_endpoint, methods=["GET"])
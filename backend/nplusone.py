@@ -0,0 +1,145 @@
+# backend/nplusone.py
+# -*- coding: utf-8 -*-
+"""
+N+1 쿼리 감지 (개발/테스트용, 운영에서는 끔)
+
+  NPLUSONE_MODE=warn   요청이 끝날 때 같은 SQL이 NPLUSONE_THRESHOLD번을 넘게 반복됐으면 "nplusone" 로거에 WARNING
+  NPLUSONE_MODE=raise  넘는 순간 NPlusOneError (테스트에서 바로 실패하도록)
+
+pytest의 query_budget 픽스처는 tests/conftest.py (track_queries 위에 구현)
+  def test_members(client, query_budget):
+      with query_budget(3, endpoint="user_management.get_team_members"):
+          client.get("/api/user-management/team-members", headers=...)
+"""
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from config import NPLUSONE_MODE, NPLUSONE_THRESHOLD
+from orm_build import engine, SessionLocal, ReadSessionLocal
+
+# ─────────────────────────────────────────────────────────────
+# 같은 SQL 문자열(파라미터 제외) = 같은 모양. lazy load가 만든 SQL에는 관계 이름(예: User.team)을 붙여 보고
+# - 관계 이름은 do_orm_execute의 loader_strategy_path에서 (SQL을 실제로 내보낸 lazy load만; identity map 적중은 제외)
+# - selectinload/joinedload는 부모 묶음당 1회라 보통 임계치에 걸리지 않음
+# - 추적기는 중첩 가능 (요청 추적기 + 테스트의 query_budget이 같은 SQL을 함께 셈)
+
+class NPlusOneError(AssertionError):
+    pass
+
+class QueryTracker:
+    def __init__(self, endpoint: str = None, threshold: int = None, raise_on_repeat: bool = False):
+        self.endpoint = endpoint            # 이 endpoint를 처리하는 동안의 SQL만 셈 (None이면 전부)
+        self.threshold = threshold          # None이면 반복 검사 안 함
+        self.raise_on_repeat = raise_on_repeat
+        self.total = 0
+        self.statements = Counter()         # SQL → 횟수
+        self.relationships = {}             # SQL → "Class.relationship" (lazy load로 나간 SQL)
+
+    def record(self, statement: str, relationship: str = None):
+        if self.endpoint is not None and _current_endpoint() != self.endpoint:
+            return
+        self.total += 1
+        self.statements[statement] += 1
+        if relationship:
+            self.relationships[statement] = relationship
+        if self.raise_on_repeat and self.threshold is not None and self.statements[statement] == self.threshold + 1:
+            raise NPlusOneError(self._describe(statement, self.statements[statement]))
+
+    def repeated(self) -> list:
+        """[(SQL, 횟수, 관계 이름|None), ...] 임계치를 넘은 것만, 많은 순"""
+        if self.threshold is None:
+            return []
+        return [(sql, n, self.relationships.get(sql))
+                for sql, n in self.statements.most_common() if n > self.threshold]
+
+    def _describe(self, statement: str, count: int) -> str:
+        where = f" [{_current_endpoint() or '요청 밖'}]"
+        relationship = self.relationships.get(statement)
+        head = f"lazy load {relationship}" if relationship else "같은 SQL"
+        return f"N+1 의심{where}: {head} {count}회 (임계치 {self.threshold}) — {' '.join(statement.split())[:200]}"
+
+    def report(self) -> list:
+        return [self._describe(sql, n) for sql, n, _ in self.repeated()]
+
+_logger = logging.getLogger("nplusone")
+_trackers: ContextVar = ContextVar("nplusone_trackers", default=())
+_lazy_relationship: ContextVar = ContextVar("nplusone_lazy_relationship", default=None)
+
+def _current_endpoint():
+    return (request.endpoint or "unmatched") if has_request_context() else None
+
+# ─────────────────────────────────────────────────────────────
+def _do_orm_execute(orm_execute_state):
+    # lazy load 직전: 다음에 나갈 SQL에 관계 이름을 붙이도록 표시
+    if not _trackers.get() or not orm_execute_state.is_relationship_load \
+            or orm_execute_state.lazy_loaded_from is None:
+        return
+    path = orm_execute_state.loader_strategy_path
+    prop = path.path[-1] if path is not None and len(path) else None
+    if prop is not None and hasattr(prop, "key"):
+        _lazy_relationship.set(f"{prop.parent.class_.__name__}.{prop.key}")
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trackers = _trackers.get()
+    if not trackers:
+        return
+    relationship = _lazy_relationship.get()
+    if relationship is not None:
+        _lazy_relationship.set(None)
+    for tracker in trackers:
+        tracker.record(statement, relationship)
+
+_install_lock = threading.Lock()
+_installed = False
+
+def _install():
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        for factory in (SessionLocal, ReadSessionLocal):
+            event.listen(factory, "do_orm_execute", _do_orm_execute)
+        _installed = True
+
+@contextmanager
+def track_queries(endpoint: str = None, threshold: int = None, raise_on_repeat: bool = False):
+    """블록 안에서 실행된 SQL을 셈 (같은 스레드/컨텍스트만)"""
+    _install()
+    tracker = QueryTracker(endpoint, threshold, raise_on_repeat)
+    token = _trackers.set(_trackers.get() + (tracker,))
+    try:
+        yield tracker
+    finally:
+        _trackers.reset(token)
+
+# ─────────────────────────────────────────────────────────────
+# 요청 단위 감지 (create_app에서 init_nplusone 호출, NPLUSONE_MODE=off면 아무것도 안 함)
+def _start():
+    tracker = QueryTracker(threshold=NPLUSONE_THRESHOLD, raise_on_repeat=NPLUSONE_MODE == "raise")
+    g.nplusone = (tracker, _trackers.set(_trackers.get() + (tracker,)))
+
+def _finish(response):
+    state = g.pop("nplusone", None)
+    if state is None:
+        return response
+    tracker, token = state
+    _trackers.reset(token)
+    response.headers["X-Query-Count"] = str(tracker.total)
+    for line in tracker.report():
+        _logger.warning(line)
+    return response
+
+def init_nplusone(app):
+    if NPLUSONE_MODE not in ("warn", "raise"):
+        return
+    _install()
+    app.before_request(_start)
+    app.after_request(_finish)
+    print(f"N+1 detector: {NPLUSONE_MODE} (threshold {NPLUSONE_THRESHOLD})")
@@ -5,44 +5,171 @@ from contextlib import contextmanager
 from typing import Optional
 
 from sqlalchemy import (
-    create_engine, ForeignKey, UniqueConstraint, JSON,
+    create_engine, ForeignKey, UniqueConstraint, Index, JSON,
     String, Integer, Text, TIMESTAMP
 )
 from sqlalchemy.orm import (
     DeclarativeBase, Mapped, mapped_column, relationship, sessionmaker
 )
 
-from config import DB_DIR, DATABASE_URL, DEFAULT_SQLITE
+from config import (
+    DB_DIR, DATABASE_URL, DEFAULT_SQLITE, DB_PROFILE,
+    DB_BUSY_TIMEOUT_MS, DB_MMAP_SIZE, DB_CACHE_SIZE,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_TIMEOUT
+)
 
+import sqlite3
+import time
 from datetime import datetime
 
-from sqlalchemy.engine import Engine
-from sqlalchemy import event, func
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy import event, func, inspect, exc as sa_exc
 
-# SQLite FK 강제
+# ─────────────────────────────────────────────────────────────
+# 엔진 프로필 (DB_PROFILE 환경변수로 선택)
+ENGINE_PROFILES = {
+    "default": {
+        "pragmas": {"foreign_keys": "ON"},
+        "pool": {},
+    },
+    # 여러 워커가 한 파일을 공유하는 운영 환경
+    "production": {
+        "pragmas": {
+            "foreign_keys": "ON",
+            "journal_mode": "WAL",       # 읽기/쓰기 동시 진행
+            "synchronous": "NORMAL",     # WAL에서는 NORMAL로도 커밋 내구성 충분
+            "busy_timeout": 5000,        # ms, "database is locked" 대신 대기
+            "mmap_size": 268435456,      # 256MiB
+            "cache_size": -65536,        # 64MiB
+            "temp_store": "MEMORY",
+        },
+        "pool": {"pool_size": 10, "max_overflow": 20, "pool_recycle": 3600, "pool_timeout": 30},
+    },
+}
+
+def _resolve_profile(name: str) -> dict:
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"알 수 없는 DB_PROFILE: {name} (가능: {', '.join(ENGINE_PROFILES)})")
+    base = ENGINE_PROFILES[name]
+    pragmas = dict(base["pragmas"])
+    pool = dict(base["pool"])
+    for key, value in (("busy_timeout", DB_BUSY_TIMEOUT_MS), ("mmap_size", DB_MMAP_SIZE), ("cache_size", DB_CACHE_SIZE)):
+        if value is not None:
+            pragmas[key] = value
+    for key, value in (("pool_size", DB_POOL_SIZE), ("max_overflow", DB_MAX_OVERFLOW),
+                       ("pool_recycle", DB_POOL_RECYCLE), ("pool_timeout", DB_POOL_TIMEOUT)):
+        if value is not None:
+            pool[key] = value
+    return {"name": name, "pragmas": pragmas, "pool": pool}
+
+ENGINE_PROFILE = _resolve_profile(DB_PROFILE)
+
+# SQLite PRAGMA 적용 (FK 강제 포함)
 @event.listens_for(Engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
     try:
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
+        for key, value in ENGINE_PROFILE["pragmas"].items():
+            cursor.execute(f"PRAGMA {key}={value}")
         cursor.close()
     except Exception:
         pass
 
 # ─────────────────────────────────────────────────────────────
+# 커넥션 체크아웃 대기 측정 (풀이 비어 기다린 시간 → metrics.py)
+class MeteredQueuePool(QueuePool):
+    wait_observers: list = []  # fn(seconds, timed_out) — recreate()된 풀에도 유지되도록 클래스 속성
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            for observe in self.wait_observers:
+                observe(waited, timed_out)
+
+def _engine_kwargs(url) -> dict:
+    url = make_url(url)
+    # 메모리 DB는 SQLAlchemy 기본 풀(SingletonThreadPool/StaticPool)을 그대로 사용
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    # 파일 DB의 기본 풀도 QueuePool (SQLAlchemy 2.x 기본값과 같음) → 대기 측정용 서브클래스로
+    return {"poolclass": MeteredQueuePool, **ENGINE_PROFILE["pool"]}
 
 engine = create_engine(
     DATABASE_URL,
     echo=False,
-    future=True
+    future=True,
+    **_engine_kwargs(DATABASE_URL)
 )
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+# 조회 전용: commit 없음, 세션 종료 후에도 로드된 속성 유지
+ReadSessionLocal = sessionmaker(
+    bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True
+)
+
+@event.listens_for(ReadSessionLocal, "before_flush")
+def _reject_readonly_flush(session, flush_context, instances):
+    raise RuntimeError("읽기 전용 세션에서는 변경 사항을 저장할 수 없습니다")
+
+def describe_engine() -> dict:
+    """실제 적용된 엔진 설정 (PRAGMA는 커넥션에서 다시 읽은 값)"""
+    info = {"profile": ENGINE_PROFILE["name"], "pool": type(engine.pool).__name__}
+    if isinstance(engine.pool, QueuePool):
+        info.update(
+            pool_size=engine.pool.size(),
+            max_overflow=engine.pool._max_overflow,
+            pool_recycle=engine.pool._recycle,
+            pool_timeout=engine.pool.timeout(),
+        )
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            for key in ENGINE_PROFILE["pragmas"]:
+                info[key] = conn.exec_driver_sql(f"PRAGMA {key}").scalar()
+    return info
 
 class Base(DeclarativeBase):
     pass
 
+# 커밋 후 콜백: 캐시 무효화 등은 트랜잭션이 실제로 커밋된 뒤에만 실행
+def on_commit(session, fn):
+    """현재 트랜잭션 커밋 직후 fn() 실행 (롤백되면 폐기)"""
+    session.info.setdefault("on_commit", []).append(fn)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _run_on_commit(session):
+    for fn in session.info.pop("on_commit", []):
+        try:
+            fn()
+        except Exception as e:
+            print(f"⚠️ on_commit 콜백 실패: {e!r}")
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_on_commit(session):
+    session.info.pop("on_commit", None)
+
 @contextmanager
-def get_session():
+def get_session(readonly: bool = False):
+    """
+    readonly=True: GET 핸들러용. flush/commit 없이 닫기만 함.
+    pysqlite는 SELECT에 BEGIN을 걸지 않으므로 쓰기 락을 잡지 않음.
+    """
+    if readonly:
+        session = ReadSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+        return
+
     session = SessionLocal()
     try:
         yield session
@@ -53,6 +180,39 @@ def get_session():
     finally:
         session.close()
 
+# ─────────────────────────────────────────────────────────────
+# 요청 단위 세션: 데코레이터와 핸들러가 같은 세션/identity map을 공유
+def request_session():
+    """현재 Flask 요청의 세션 (첫 사용 시 생성). GET/HEAD는 읽기 전용 세션"""
+    from flask import g, request
+    if "db_session" not in g:
+        g.db_session_readonly = request.method in ("GET", "HEAD", "OPTIONS")
+        g.db_session = (ReadSessionLocal if g.db_session_readonly else SessionLocal)()
+    return g.db_session
+
+def init_request_session(app):
+    """요청 종료 시 커밋/롤백 훅 등록 (create_app에서 호출)"""
+    from flask import g
+
+    @app.after_request
+    def _commit_request_session(response):
+        # 응답 전에 커밋해야 커밋 실패가 500으로 드러남. 4xx/5xx 응답은 변경 취소
+        session = g.get("db_session")
+        if session is not None and not g.db_session_readonly:
+            if response.status_code < 400:
+                session.commit()
+            else:
+                session.rollback()
+        return response
+
+    @app.teardown_request
+    def _close_request_session(exc):
+        session = g.pop("db_session", None)
+        if session is not None:
+            if exc is not None:
+                session.rollback()
+            session.close()
+
 # ─────────────────────────────────────────────────────────────
 # 모델 정의
 
@@ -60,6 +220,8 @@ class Team(Base):
     __tablename__ = "teams"
     team_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     team_name: Mapped[str] = mapped_column(String, nullable=False, unique=False)
+    # 팀에 보이는 템플릿/팀원 목록이 바뀔 때마다 +1 → 목록 GET의 ETag (team_revision)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     users: Mapped[list["User"]] = relationship(back_populates="team")
     responsibilities: Mapped[list["Responsibility"]] = relationship(
@@ -86,6 +248,7 @@ class Responsibility(Base):
 
     __table_args__ = (
         UniqueConstraint("responsibility_name", "team_id", name="uq_resp_name_team"),
+        Index("ix_responsibilities_team", "team_id", "responsibility_name"),
     )
 
     team: Mapped["Team"] = relationship(back_populates="responsibilities")
@@ -105,6 +268,12 @@ class User(Base):
         TIMESTAMP, nullable=False, server_default=func.now()
     )
     team_id: Mapped[Optional[int]] = mapped_column(ForeignKey("teams.team_id"))
+    # 권한(직위/팀/책임) 변경 시 +1 → 이전 버전으로 발급된 JWT 권한 클레임 무효화
+    perm_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_users_team_name", "team_id", "user_name"),  # 팀원 목록 (이름순)
+    )
 
     requests: Mapped[list["Request"]] = relationship(
         back_populates="requester", foreign_keys="Request.requester_user_id"
@@ -131,6 +300,11 @@ class TaskTemplate(Base):
     category: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    __table_args__ = (
+        Index("ix_task_templates_name", "template_name"),
+        Index("ix_task_templates_category_name", "category", "template_name"),  # 분류 필터 + 이름순
+    )
+
     teams: Mapped[list["Team"]] = relationship(
         back_populates="task_templates", secondary="task_template_team_mappings"
     )
@@ -151,6 +325,11 @@ class TaskTemplateTeamMapping(Base):
     task_template_id: Mapped[int] = mapped_column(ForeignKey("task_templates.task_template_id", ondelete="CASCADE"), primary_key=True)
     team_id: Mapped[int] = mapped_column(ForeignKey("teams.team_id", ondelete="CASCADE"), primary_key=True)
 
+    # PK는 (template, team) 순서 → 팀 기준 조회용 역방향 인덱스
+    __table_args__ = (
+        Index("ix_tt_team_mappings_team", "team_id", "task_template_id"),
+    )
+
 
 # ✅ 1. RequestTemplateTeamMapping 신설
 class RequestTemplateTeamMapping(Base):
@@ -158,12 +337,20 @@ class RequestTemplateTeamMapping(Base):
     request_template_id: Mapped[int] = mapped_column(ForeignKey("request_templates.request_template_id", ondelete="CASCADE"), primary_key=True)
     team_id: Mapped[int] = mapped_column(ForeignKey("teams.team_id", ondelete="CASCADE"), primary_key=True)
 
+    __table_args__ = (
+        Index("ix_rt_team_mappings_team", "team_id", "request_template_id"),
+    )
+
 class RequestTemplate(Base):
     __tablename__ = "request_templates"
     request_template_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     template_name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    __table_args__ = (
+        Index("ix_request_templates_name", "template_name"),
+    )
+
     # ✅ 2. WorkflowTemplate과의 직접적인 Foreign Key 관계 제거
     # workflow_template_id: Mapped[Optional[int]] = mapped_column(ForeignKey("workflow_templates.workflow_template_id"))
     # workflow_template: Mapped[Optional["WorkflowTemplate"]] = relationship(back_populates="request_templates")
@@ -188,6 +375,18 @@ class Request(Base):
     created_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True, server_default=func.now())
     completed_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
     parameters: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # 자식(RequestFulfillment) 상태 카운터 → status/진행률을 자식 조회 없이 계산 (progress.py)
+    fulfillment_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    fulfillment_active: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    fulfillment_done: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # 클라이언트 멱등 키: 같은 요청자의 같은 키 재전송은 기존 Request를 돌려줌
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_requests_status", "status"),
+        Index("ix_requests_requester", "requester_user_id"),
+        Index("ux_requests_requester_idempotency", "requester_user_id", "idempotency_key", unique=True),
+    )
 
     request_template: Mapped[Optional["RequestTemplate"]] = relationship(back_populates="requests")
     requester: Mapped[Optional["User"]] = relationship(back_populates="requests")
@@ -217,6 +416,12 @@ class RequestFulfillment(Base):
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
     completed_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
 
+    __table_args__ = (
+        Index("ix_fulfillments_team_status", "assigned_team_id", "status"),
+        Index("ix_fulfillments_request", "request_id"),
+        Index("ix_fulfillments_workflow", "workflow_id"),
+    )
+
     # 관계 설정
     request: Mapped["Request"] = relationship(back_populates="fulfillments")
     assigned_team: Mapped["Team"] = relationship(back_populates="fulfillments")
@@ -228,6 +433,8 @@ class WorkflowTemplate(Base):
     workflow_template_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     template_name: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # 정의(노드/엣지)가 바뀔 때마다 +1 → 컴파일된 그래프 캐시 키 (workflow_graph)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     
     definitions: Mapped[list["WorkflowTemplateDefinition"]] = relationship(back_populates="workflow_template")
     workflows: Mapped[list["Workflow"]] = relationship(back_populates="workflow_template")
@@ -243,6 +450,10 @@ class WorkflowTemplateDefinition(Base):
     task_template_id: Mapped[int] = mapped_column(ForeignKey("task_templates.task_template_id"))
     depends_on_task_template_id: Mapped[Optional[int]] = mapped_column(ForeignKey("task_templates.task_template_id"))
 
+    __table_args__ = (
+        Index("ix_wt_definitions_template", "workflow_template_id", "task_template_id"),
+    )
+
     workflow_template: Mapped["WorkflowTemplate"] = relationship(back_populates="definitions")
     task_template: Mapped["TaskTemplate"] = relationship(
         back_populates="workflow_definitions",
@@ -262,6 +473,15 @@ class Workflow(Base):
     created_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True, server_default=func.now())
     completed_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
     parameters: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # 자식(Task) 상태 카운터 → status/진행률을 자식 조회 없이 계산 (progress.py)
+    task_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    task_active: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    task_done: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_workflows_template", "workflow_template_id"),
+        Index("ix_workflows_status", "status"),
+    )
 
     workflow_template: Mapped[Optional["WorkflowTemplate"]] = relationship(back_populates="workflows")
     # assigned_team: Mapped[Optional["Team"]] = relationship(back_populates="workflows")
@@ -276,11 +496,21 @@ class Task(Base):
     task_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     task_template_id: Mapped[Optional[int]] = mapped_column(ForeignKey("task_templates.task_template_id"))
     workflow_id: Mapped[Optional[int]] = mapped_column(ForeignKey("workflows.workflow_id"))
-    status: Mapped[Optional[str]] = mapped_column(String, default="PENDING")
+    # 담당 팀 (RequestFulfillment.assigned_team_id 비정규화 → 팀별 READY 조회용)
+    team_id: Mapped[Optional[int]] = mapped_column(ForeignKey("teams.team_id"), nullable=True)
+    status: Mapped[Optional[str]] = mapped_column(String, default="PENDING") # PENDING → READY → COMPLETED
+    # 아직 완료되지 않은 선행 Task 수 (0이 되면 READY)
+    remaining_upstream: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True, server_default=func.now())
     completed_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
     parameters: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
 
+    __table_args__ = (
+        Index("ix_tasks_workflow_status", "workflow_id", "status"),
+        Index("ix_tasks_status", "status"),
+        Index("ix_tasks_team_status", "team_id", "status"),
+    )
+
     task_template: Mapped[Optional["TaskTemplate"]] = relationship(back_populates="tasks")
     workflow: Mapped[Optional["Workflow"]] = relationship(back_populates="tasks")
     assigned_users: Mapped[list["User"]] = relationship(
@@ -304,22 +534,105 @@ class TaskAssignment(Base):
     task_id: Mapped[int] = mapped_column(ForeignKey("tasks.task_id", ondelete="CASCADE"), primary_key=True)
     assigned_user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
 
+    __table_args__ = (
+        Index("ix_task_assignments_user", "assigned_user_id"),
+    )
+
 class TaskDependency(Base):
     __tablename__ = "task_dependencies"
     upstream_task_id: Mapped[int] = mapped_column(ForeignKey("tasks.task_id", ondelete="CASCADE"), primary_key=True)
     downstream_task_id: Mapped[int] = mapped_column(ForeignKey("tasks.task_id", ondelete="CASCADE"), primary_key=True)
 
+    __table_args__ = (
+        Index("ix_task_dependencies_downstream", "downstream_task_id"),
+    )
+
 class WorkflowtemplateTeamMapping(Base):
     __tablename__ = "workflow_template_team_mappings"
     workflow_template_id: Mapped[int] = mapped_column(ForeignKey("workflow_templates.workflow_template_id", ondelete="CASCADE"), primary_key=True)
     team_id: Mapped[int] = mapped_column(ForeignKey("teams.team_id", ondelete="CASCADE"), primary_key=True)
 
+    __table_args__ = (
+        Index("ix_wt_team_mappings_team", "team_id", "workflow_template_id"),
+    )
+
+# 팀/일자/상태별 건수 롤업 (상태 전이와 같은 트랜잭션에서 증감 → rollup.py)
+# kind: "tasks" | "requests"(팀별 fulfillment), day: 'YYYY-MM-DD' (완료 건은 completed_at, 그 외 created_at)
+class DailyStatusCount(Base):
+    __tablename__ = "daily_status_counts"
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.team_id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[str] = mapped_column(String(10), primary_key=True)
+    kind: Mapped[str] = mapped_column(String, primary_key=True)
+    status: Mapped[str] = mapped_column(String, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+# 백그라운드 작업 큐 (jobs.py): QUEUED → RUNNING → SUCCEEDED | FAILED | CANCELLED
+# 실패 시 attempts < max_attempts 이면 run_after를 미뤄 다시 QUEUED
+class Job(Base):
+    __tablename__ = "jobs"
+    job_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="QUEUED", server_default="QUEUED")
+    payload: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    result: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3, server_default="3")
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    requested_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True)
+    team_id: Mapped[Optional[int]] = mapped_column(ForeignKey("teams.team_id", ondelete="SET NULL"), nullable=True)
+    run_after: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
+    locked_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True, server_default=func.now())
+    started_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("ix_jobs_requested_by", "requested_by", "job_id"),
+    )
+
 
 # ─────────────────────────────────────────────────────────────
 def build_schema(reset: bool = False):
     if reset:
         Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+
+def upgrade_schema():
+    """
+    기존 DB 파일에 모델 대비 누락된 컬럼/인덱스를 추가 (create_all은 기존 테이블을 변경하지 않음)
+    반환: 추가한 컬럼 {"table.column", ...} (새 컬럼 백필이 필요한지 판단용)
+    """
+    Base.metadata.create_all(bind=engine)
+    added = set()
+    with engine.begin() as conn:
+        insp = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col.type.compile(conn.dialect)}"
+                if col.server_default is not None and isinstance(col.server_default.arg, str):
+                    ddl += f" DEFAULT '{col.server_default.arg}'"
+                if not col.nullable:
+                    ddl += " NOT NULL"
+                conn.exec_driver_sql(ddl)
+                added.add(f"{table.name}.{col.name}")
+                print(f"🛠  컬럼 추가: {table.name}.{col.name}")
+
+            existing_ix = {ix["name"] for ix in insp.get_indexes(table.name)}
+            for ix in table.indexes:
+                if ix.name not in existing_ix:
+                    ix.create(conn)
+                    print(f"🛠  인덱스 추가: {ix.name}")
+        # 새 인덱스에 대한 통계 갱신 (플래너가 인덱스를 선택하도록)
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA optimize")
+    return added
 
 if __name__ == "__main__":
     import argparse
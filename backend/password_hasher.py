@@ -0,0 +1,117 @@
+# backend/password_hasher.py
+# -*- coding: utf-8 -*-
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+from config import (
+    PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_QUEUE_MAX, PASSWORD_HASH_TIMEOUT
+)
+
+# ─────────────────────────────────────────────────────────────
+# 비밀번호 해싱 전용 워커 풀
+# - hashlib(pbkdf2/scrypt)은 GIL을 풀고 계산하므로 스레드 풀로도 병렬 처리됨
+# - 대기열이 가득 차면 즉시 HasherBusy → 로그인 폭주가 다른 API 워커를 잡아먹지 않음
+
+class HasherBusy(Exception):
+    """해싱 대기열 초과"""
+
+
+def method_prefix(method: str) -> str:
+    """werkzeug가 해시 앞에 붙이는 정규화된 method 표기 (generate_password_hash와 같은 기본값 규칙)"""
+    name, *args = method.split(":")
+    if name == "scrypt":
+        n, r, p = map(int, args) if args else (2**15, 8, 1)
+        return f"scrypt:{n}:{r}:{p}"
+    if name == "pbkdf2":
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"Invalid hash method '{method}'.")
+
+
+class PasswordHasher:
+    def __init__(self, method: str, workers: int, queue_max: int, timeout: float):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self._slots = threading.BoundedSemaphore(workers + queue_max)
+        self._prefix = method_prefix(method)  # 예: "scrypt:32768:8:1" (잘못된 method는 시작 시 ValueError)
+
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HasherBusy()
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def job():
+            waited = time.perf_counter() - submitted
+            with self._lock:
+                self._queued -= 1
+                self._in_flight += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                    self._completed += 1
+                self._slots.release()
+
+        return self._pool.submit(job)
+
+    def _run(self, fn, *args):
+        try:
+            return self._submit(fn, *args).result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HasherBusy()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def hash_async(self, password: str) -> Future:
+        """결과를 기다리지 않는 해싱 (로그인 후 재해싱 등) — 대기열이 가득 차면 HasherBusy"""
+        return self._submit(generate_password_hash, password, self.method)
+
+    def verify(self, hashed: str, password: str) -> bool:
+        return self._run(check_password_hash, hashed, password)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """저장된 해시의 알고리즘/비용이 현재 설정과 다르면 True"""
+        return hashed.split("$", 1)[0] != self._prefix
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "method": self.method,
+                "workers": self.workers,
+                "queued": self._queued,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_total / self._completed * 1000, 2) if self._completed else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+            }
+
+
+hasher = PasswordHasher(
+    PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_QUEUE_MAX, PASSWORD_HASH_TIMEOUT
+)
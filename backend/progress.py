@@ -0,0 +1,237 @@
+# backend/progress.py
+# -*- coding: utf-8 -*-
+"""
+부모 행의 자식 상태 카운터 (Task → Workflow → RequestFulfillment → Request) 유지·복구
+
+  python progress.py repair [--batch 500]   자식 테이블에서 카운터/상태를 다시 계산 (배치 단위 커밋)
+"""
+from datetime import date
+
+from sqlalchemy import select, update, func, case, bindparam
+
+from orm_build import Workflow, Task, Request, RequestFulfillment
+from calendark import invalidate_calendar
+from rollup import record_transitions, day_of
+from events import publish
+
+# ─────────────────────────────────────────────────────────────
+# 부모: (부모 테이블, 자식 테이블, 자식의 부모 FK 컬럼명, (total, active, done) 카운터 컬럼명, 상태 이벤트 (entity, 받을 사용자 컬럼))
+# - active = IN_PROGRESS, done = COMPLETED/REJECTED (반려도 처리 끝난 것으로 봄)
+# - 부모 status: 전부 done → COMPLETED, active나 done이 하나라도 → IN_PROGRESS, 그 외 PENDING
+# - 자식 전이는 카운터 증감 executemany 1회 + 상태 재계산 UPDATE 1회 (바뀐 부모만 RETURNING)
+# - RequestFulfillment.status는 연결된 Workflow.status를 따름 (REJECTED는 유지)
+LEVELS = {
+    "workflows": (Workflow.__table__, Task.__table__, "workflow_id", ("task_total", "task_active", "task_done"), None),
+    "requests": (Request.__table__, RequestFulfillment.__table__, "request_id",
+                 ("fulfillment_total", "fulfillment_active", "fulfillment_done"), ("request", "requester_user_id")),
+}
+ACTIVE = ("IN_PROGRESS",)
+DONE = ("COMPLETED", "REJECTED")
+
+def _bucket(status):
+    if status in ACTIVE:
+        return 1
+    if status in DONE:
+        return 2
+    return None
+
+def status_of(total: int, active: int, done: int) -> str:
+    if total and done >= total:
+        return "COMPLETED"
+    if active or done:
+        return "IN_PROGRESS"
+    return "PENDING"
+
+def progress_percent(total: int, done: int) -> int:
+    return round(100 * done / total) if total else 0
+
+def _status_expr(total, active, done):
+    """status_of의 SQL 식"""
+    return case(
+        ((total > 0) & (done >= total), "COMPLETED"),
+        ((active > 0) | (done > 0), "IN_PROGRESS"),
+        else_="PENDING",
+    )
+
+def _derive(session, level: str, parent_ids) -> dict:
+    """카운터로 status/completed_at 재계산 → {parent_id: 새 status} (바뀐 부모만)"""
+    parent, _, fk, (total, active, done), audience = LEVELS[level]
+    if not parent_ids:
+        return {}
+    pk = parent.c[fk]
+    new_status = _status_expr(parent.c[total], parent.c[active], parent.c[done])
+    rows = session.execute(
+        update(parent)
+        .where(pk.in_(list(parent_ids)), parent.c.status.is_distinct_from(new_status))
+        .values(
+            status=new_status,
+            completed_at=case(
+                (new_status == "COMPLETED", func.coalesce(parent.c.completed_at, func.current_timestamp())),
+                else_=None,
+            ),
+        )
+        .returning(pk, parent.c.status, parent.c[audience[1]] if audience else pk)
+    ).all()
+    if audience:
+        for parent_id, status, user_id in rows:
+            publish(session, audience[0], parent_id, users=[user_id], status=status)
+    return {parent_id: status for parent_id, status, _ in rows}
+
+def _apply(session, level: str, transitions) -> dict:
+    """transitions: [(parent_id, 이전 status|None=새 자식, 새 status), ...] → 카운터 증감 후 _derive"""
+    deltas = {}
+    for parent_id, old, new in transitions:
+        if parent_id is None:
+            continue
+        d = deltas.setdefault(parent_id, [0, 0, 0])
+        if old is None:
+            d[0] += 1
+        elif _bucket(old):
+            d[_bucket(old)] -= 1
+        if _bucket(new):
+            d[_bucket(new)] += 1
+    deltas = {k: d for k, d in deltas.items() if any(d)}
+    if not deltas:
+        return {}
+    parent, _, fk, (total, active, done), _ = LEVELS[level]
+    session.connection().execute(
+        update(parent)
+        .where(parent.c[fk] == bindparam("pid"))
+        .values({
+            total: parent.c[total] + bindparam("d_total"),
+            active: parent.c[active] + bindparam("d_active"),
+            done: parent.c[done] + bindparam("d_done"),
+        }),
+        [{"pid": k, "d_total": t, "d_active": a, "d_done": dn} for k, (t, a, dn) in deltas.items()],
+    )
+    return _derive(session, level, deltas)
+
+def recount(session, level: str, parent_ids) -> dict:
+    """자식 테이블에서 카운터를 다시 셈 (생성 직후 초기화 / 복구) → {parent_id: 새 status}"""
+    parent, child, fk, (total, active, done), _ = LEVELS[level]
+    if not parent_ids:
+        return {}
+    own = child.c[fk] == parent.c[fk]
+    count = lambda *where: select(func.count()).where(own, *where).scalar_subquery()
+    session.execute(
+        update(parent)
+        .where(parent.c[fk].in_(list(parent_ids)))
+        .values({
+            total: count(),
+            active: count(child.c.status.in_(ACTIVE)),
+            done: count(child.c.status.in_(DONE)),
+        })
+    )
+    return _derive(session, level, parent_ids)
+
+# ─────────────────────────────────────────────────────────────
+# 전이 기록: 자식 상태를 바꾼 쪽이 같은 트랜잭션에서 호출
+def record_task_transitions(session, transitions):
+    """transitions: [(workflow_id, 이전 status, 새 status), ...]"""
+    changed = _apply(session, "workflows", transitions)
+    if changed:
+        mirror_fulfillments(session, changed)
+
+def mirror_fulfillments(session, workflow_status: dict) -> int:
+    """{workflow_id: status} → 연결된 RequestFulfillment.status를 맞추고 롤업/Request 카운터에 반영"""
+    RF = RequestFulfillment.__table__
+    rows = [
+        r for r in session.execute(
+            select(RF.c.fulfillment_id, RF.c.workflow_id, RF.c.request_id, RF.c.assigned_team_id,
+                   RF.c.status, RF.c.created_at, RF.c.completed_at)
+            .where(RF.c.workflow_id.in_(list(workflow_status)), RF.c.status.is_distinct_from("REJECTED"))
+        )
+        if r.status != workflow_status[r.workflow_id]
+    ]
+    if not rows:
+        return 0
+    # 새 상태별 UPDATE 1회 (최대 3회), 새 completed_at은 RETURNING으로 (롤업 버킷을 DB에 저장된 값과 맞춤)
+    by_status = {}
+    for r in rows:
+        by_status.setdefault(workflow_status[r.workflow_id], []).append(r.fulfillment_id)
+    new_completed_at = {}
+    for status, ids in by_status.items():
+        new_completed_at.update(session.execute(
+            update(RF)
+            .where(RF.c.fulfillment_id.in_(ids))
+            .values(
+                status=status,
+                completed_at=func.current_timestamp() if status == "COMPLETED" else None,
+            )
+            .returning(RF.c.fulfillment_id, RF.c.completed_at)
+        ).tuples().all())
+
+    # 달력 롤업: 완료된 행은 완료일, 그 외는 생성일 버킷 (rollup.bucket_day)
+    def day(status, created_at, completed_at):
+        if status == "COMPLETED":
+            return day_of(completed_at or created_at)
+        return day_of(created_at)
+    record_transitions(session, "requests", [
+        (r.assigned_team_id, day(r.status, r.created_at, r.completed_at), r.status,
+         day(new, r.created_at, new_completed_at[r.fulfillment_id]), new)
+        for r in rows for new in (workflow_status[r.workflow_id],)
+    ])
+    for team_id in {r.assigned_team_id for r in rows}:
+        invalidate_calendar(session, team_id)
+    for r in rows:
+        publish(session, "fulfillment", r.fulfillment_id, teams=[r.assigned_team_id],
+                status=workflow_status[r.workflow_id], request_id=r.request_id, workflow_id=r.workflow_id)
+    for team_id, year, month in {(r.assigned_team_id, r.created_at.year, r.created_at.month)
+                                 for r in rows if r.created_at}:
+        invalidate_calendar(session, team_id, date(year, month, 1))
+
+    _apply(session, "requests", [(r.request_id, r.status, workflow_status[r.workflow_id]) for r in rows])
+    return len(rows)
+
+# ─────────────────────────────────────────────────────────────
+# 복구: 부모 id 순으로 batch개씩 다시 계산 (배치마다 커밋 → 쓰기 락을 짧게)
+def _batches(session_factory, table, pk, batch: int):
+    last = 0
+    while True:
+        with session_factory(readonly=True) as s:
+            ids = list(s.execute(
+                select(table.c[pk]).where(table.c[pk] > last).order_by(table.c[pk]).limit(batch)
+            ).scalars())
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+def repair(session_factory, batch: int = 500) -> dict:
+    """Workflow 카운터 → Fulfillment 상태 → Request 카운터 순으로 다시 계산. 반환: 상태가 바뀐 행 수"""
+    changed = {"workflows": 0, "fulfillments": 0, "requests": 0}
+    W = Workflow.__table__
+    for ids in _batches(session_factory, W, "workflow_id", batch):
+        with session_factory() as s:
+            changed["workflows"] += len(recount(s, "workflows", ids))
+            # 상태가 그대로인 Workflow라도 어긋난 Fulfillment는 맞춤
+            current = dict(s.execute(select(W.c.workflow_id, W.c.status).where(W.c.workflow_id.in_(ids))).all())
+            changed["fulfillments"] += mirror_fulfillments(s, current)
+    for ids in _batches(session_factory, Request.__table__, "request_id", batch):
+        with session_factory() as s:
+            changed["requests"] += len(recount(s, "requests", ids))
+    return changed
+
+def ensure_counted(added_columns) -> bool:
+    """upgrade_schema가 카운터 컬럼을 새로 추가했으면 (기존 DB 첫 기동) 한 번 복구"""
+    from orm_build import get_session
+    columns = {f"{parent.name}.{c}" for parent, _, _, counters, _ in LEVELS.values() for c in counters}
+    if not columns & set(added_columns):
+        return False
+    repair(get_session)
+    return True
+
+
+if __name__ == "__main__":
+    import argparse
+    from orm_build import get_session
+
+    parser = argparse.ArgumentParser(description="부모 상태 카운터 관리")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_repair = sub.add_parser("repair", help="자식 테이블에서 카운터/상태 다시 계산")
+    p_repair.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    result = repair(get_session, args.batch)
+    print("✅ 카운터 복구 완료 (상태 변경: "
+          + ", ".join(f"{k} {v}건" for k, v in result.items()) + ")")
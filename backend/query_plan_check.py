@@ -0,0 +1,201 @@
+# backend/query_plan_check.py
+# -*- coding: utf-8 -*-
+"""
+엔드포인트별 핵심 쿼리에 EXPLAIN QUERY PLAN을 돌려 풀스캔(SCAN)이 있으면 실패.
+스키마(인덱스) 변경 후 회귀 확인용:  python query_plan_check.py  (실패 시 exit 1)
+핸들러가 실제로 실행한 SQL 검사는 tests/test_query_plans.py (python -m pytest -q tests)
+"""
+import re
+import sys
+
+from sqlalchemy import create_engine, select, func, or_, and_
+
+from orm_build import (
+    Base, User, Team, Responsibility, UserResponsibility,
+    TaskTemplate, TaskTemplateTeamMapping,
+    RequestTemplate, RequestTemplateTeamMapping,
+    WorkflowTemplate, WorkflowTemplateDefinition, WorkflowtemplateTeamMapping,
+    Request, RequestFulfillment, Workflow, Task, TaskDependency, TaskAssignment,
+    DailyStatusCount, Job,
+)
+
+TEAM_ID = 1
+USER_ID = 1
+WT_ID = 1
+
+# (이름, 쿼리, 풀스캔을 허용할 테이블)
+CHECKS = [
+    ("auth.get_teams",
+     select(Team).order_by(Team.team_name),
+     {"teams"}),  # 회원가입 폼: 전체 팀 목록이 목적
+    ("auth.login",
+     select(User).where(User.email == "a@b.c"),
+     set()),
+    ("user_management.team_members",
+     select(User).where(User.team_id == TEAM_ID).order_by(User.user_name),
+     set()),
+    ("user_management.member_responsibilities",
+     select(Responsibility)
+     .join(UserResponsibility, UserResponsibility.responsibility_id == Responsibility.responsibility_id)
+     .where(UserResponsibility.user_id.in_([1, 2, 3])),
+     set()),
+    ("user_management.team_responsibilities",
+     select(Responsibility.responsibility_id, Responsibility.responsibility_name)
+     .where(Responsibility.team_id == TEAM_ID)
+     .order_by(Responsibility.responsibility_name),
+     set()),
+    ("task_management.task_templates",
+     select(TaskTemplate)
+     .join(TaskTemplateTeamMapping, TaskTemplateTeamMapping.task_template_id == TaskTemplate.task_template_id)
+     .where(TaskTemplateTeamMapping.team_id == TEAM_ID)
+     .order_by(TaskTemplate.template_name),
+     set()),
+    ("task_management.task_templates_page",
+     select(TaskTemplate)
+     .join(TaskTemplateTeamMapping, TaskTemplateTeamMapping.task_template_id == TaskTemplate.task_template_id)
+     .where(TaskTemplateTeamMapping.team_id == TEAM_ID, TaskTemplate.category == "HACCP",
+            TaskTemplate.template_name >= "a", TaskTemplate.template_name < "a\U0010ffff")
+     .order_by(TaskTemplate.template_name, TaskTemplate.task_template_id)
+     .limit(51),
+     set()),
+    ("user_management.team_members_page",
+     select(User)
+     .where(User.team_id == TEAM_ID, (User.user_name > "a") | ((User.user_name == "a") & (User.user_id > 3)))
+     .order_by(User.user_name, User.user_id)
+     .limit(51),
+     set()),
+    ("task_management.create_dup_check",
+     select(TaskTemplate).where(TaskTemplate.template_name == "x"),
+     set()),
+    ("request_management.request_templates",
+     select(RequestTemplate)
+     .join(RequestTemplateTeamMapping, RequestTemplateTeamMapping.request_template_id == RequestTemplate.request_template_id)
+     .where(RequestTemplateTeamMapping.team_id == TEAM_ID)
+     .order_by(RequestTemplate.template_name),
+     set()),
+    ("workflow_management.list_workflow_templates",
+     select(WorkflowTemplate)
+     .join(WorkflowtemplateTeamMapping, WorkflowtemplateTeamMapping.workflow_template_id == WorkflowTemplate.workflow_template_id)
+     .where(WorkflowtemplateTeamMapping.team_id == TEAM_ID)
+     .order_by(WorkflowTemplate.template_name),
+     set()),
+    ("workflow_management.definitions_eager",
+     select(WorkflowTemplateDefinition)
+     .where(WorkflowTemplateDefinition.workflow_template_id.in_([1, 2, 3])),
+     set()),
+    ("workflow_management.list_definitions",
+     select(WorkflowTemplateDefinition)
+     .where(WorkflowTemplateDefinition.workflow_template_id == WT_ID)
+     .order_by(WorkflowTemplateDefinition.definition_id),
+     set()),
+    ("workflow_management.delete_task_node",
+     select(WorkflowTemplateDefinition.definition_id).where(
+         WorkflowTemplateDefinition.workflow_template_id == WT_ID,
+         WorkflowTemplateDefinition.task_template_id == 101,
+     ),
+     set()),
+    ("runtime.tasks_of_workflow",
+     select(Task).where(Task.workflow_id == 1, Task.status == "PENDING"),
+     set()),
+    ("runtime.downstream_tasks",
+     select(TaskDependency.downstream_task_id).where(TaskDependency.upstream_task_id.in_([1, 2])),
+     set()),
+    ("runtime.upstream_tasks",
+     select(TaskDependency.upstream_task_id).where(TaskDependency.downstream_task_id == 1),
+     set()),
+    ("runtime.my_tasks",
+     select(Task)
+     .join(TaskAssignment, TaskAssignment.task_id == Task.task_id)
+     .where(TaskAssignment.assigned_user_id == USER_ID),
+     set()),
+    ("task_runtime.ready_team",
+     select(Task.task_id).where(Task.team_id == TEAM_ID, Task.status == "READY").order_by(Task.task_id),
+     set()),
+    ("task_runtime.ready_me",
+     select(Task.task_id)
+     .join(TaskAssignment, TaskAssignment.task_id == Task.task_id)
+     .where(TaskAssignment.assigned_user_id == USER_ID, Task.status == "READY"),
+     set()),
+    ("calendar.month_rollup",
+     select(DailyStatusCount.day, DailyStatusCount.kind, DailyStatusCount.status, DailyStatusCount.count)
+     .where(DailyStatusCount.team_id == TEAM_ID, DailyStatusCount.day.between("2025-01-01", "2025-01-31"))
+     .order_by(DailyStatusCount.day),
+     set()),
+    ("request_runtime.idempotency_keys",
+     select(Request.request_id, Request.idempotency_key)
+     .where(Request.requester_user_id == USER_ID, Request.idempotency_key.in_(["a", "b"])),
+     set()),
+    ("request_runtime.submit_templates",
+     select(RequestTemplateTeamMapping.request_template_id)
+     .where(RequestTemplateTeamMapping.team_id == TEAM_ID, RequestTemplateTeamMapping.request_template_id.in_([1, 2])),
+     set()),
+    ("jobs.claim",
+     select(Job.job_id)
+     .where(or_(and_(Job.status == "QUEUED", Job.run_after <= "2025-01-01"),
+                and_(Job.status == "RUNNING", Job.locked_at < "2025-01-01")))
+     .order_by(Job.run_after, Job.job_id).limit(1),
+     set()),
+    ("jobs.my_jobs",
+     select(Job).where(Job.requested_by == USER_ID).order_by(Job.job_id.desc()).limit(50),
+     set()),
+    ("runtime.team_fulfillments",
+     select(RequestFulfillment)
+     .where(RequestFulfillment.assigned_team_id == TEAM_ID, RequestFulfillment.status == "PENDING"),
+     set()),
+    ("runtime.request_fulfillments",
+     select(RequestFulfillment).where(RequestFulfillment.request_id == 1),
+     set()),
+    ("runtime.workflow_fulfillment",
+     select(RequestFulfillment).where(RequestFulfillment.workflow_id == 1),
+     set()),
+    ("runtime.requests_by_status",
+     select(func.count()).select_from(Request).where(Request.status == "PENDING"),
+     set()),
+    ("runtime.workflows_of_template",
+     select(Workflow.workflow_id).where(Workflow.workflow_template_id == WT_ID),
+     set()),
+]
+
+
+def explain(conn, stmt):
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+
+def table_aliases(sql: str) -> dict:
+    """'tasks AS up' → {"up": "tasks"} (계획에는 별칭이 찍힘)"""
+    return {alias: table for table, alias in re.findall(r"\b(\w+) AS (\w+)\b", sql)
+            if table in Base.metadata.tables}
+
+
+def full_scans(plan, allowed, aliases=None):
+    """'SCAN <table>' (인덱스 유무와 무관하게 전체 순회) 중 허용되지 않은 것
+    실제 테이블만 셈 — CTE/서브쿼리/VALUES 리터럴 행(이미 걸러진 중간 결과)의 순회는 제외"""
+    bad = []
+    for detail in plan:
+        if not detail.startswith("SCAN "):
+            continue
+        table = detail.split()[1]
+        table = (aliases or {}).get(table, table)
+        if table in Base.metadata.tables and table not in allowed:
+            bad.append(detail)
+    return bad
+
+
+def run(engine=None) -> list:
+    engine = engine or create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    failures = []
+    with engine.connect() as conn:
+        for name, stmt, allowed in CHECKS:
+            sql = str(stmt.compile(dialect=conn.dialect))
+            bad = full_scans(explain(conn, stmt), allowed, table_aliases(sql))
+            status = "FAIL" if bad else "ok"
+            print(f"[{status:4}] {name}" + (f"  → {'; '.join(bad)}" if bad else ""))
+            if bad:
+                failures.append((name, bad))
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if run() else 0)
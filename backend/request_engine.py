@@ -0,0 +1,170 @@
+# backend/request_engine.py
+# -*- coding: utf-8 -*-
+import json
+
+from sqlalchemy import select, insert, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from orm_build import Request, RequestFulfillment, RequestTemplateTeamMapping
+from calendark import invalidate_calendar
+from rollup import record_created
+from progress import recount
+from events import publish
+
+# ─────────────────────────────────────────────────────────────
+# Request 일괄 제출: RequestTemplate → Request + 매핑된 팀별 RequestFulfillment
+# - 건수와 무관하게 SELECT 3회 + INSERT 3회 (키 있는/없는 Request, fulfillment fan-out)
+#   + 롤업 UPSERT 1회 + Request 카운터 초기화 UPDATE 2회
+# - 멱등 키: (requester_user_id, idempotency_key) 유니크 인덱스
+#   · 이미 있는 키는 새로 만들지 않고 기존 request_id를 돌려줌 (created=False)
+#   · 같은 키로 다른 내용(template/parameters)을 보내면 IdempotencyConflict
+#   · 동시에 같은 키가 들어오면 ON CONFLICT DO NOTHING으로 한쪽만 생성, 나머지는 기존 행을 다시 읽음
+
+class SubmissionError(ValueError):
+    pass
+
+class IdempotencyConflict(SubmissionError):
+    pass
+
+
+def _payload(item) -> tuple:
+    return int(item["request_template_id"]), item.get("parameters")
+
+def _payload_key(template_id, parameters) -> str:
+    return json.dumps([template_id, parameters], sort_keys=True, ensure_ascii=False)
+
+def _check_replays(rows, by_key):
+    """기존 행 (request_id, key, template_id, parameters) 과 제출 내용이 같은지 확인 → {key: request_id}"""
+    found = {}
+    for request_id, key, template_id, parameters in rows:
+        if (template_id, parameters) != _payload(by_key[key]):
+            raise IdempotencyConflict(f"idempotency_key '{key}'가 다른 내용의 요청에 이미 사용되었습니다")
+        found[key] = request_id
+    return found
+
+def _existing(session, requester_user_id, keys, by_key):
+    if not keys:
+        return {}
+    R = Request.__table__
+    return _check_replays(session.execute(
+        select(R.c.request_id, R.c.idempotency_key, R.c.request_template_id, R.c.parameters)
+        .where(R.c.requester_user_id == requester_user_id, R.c.idempotency_key.in_(keys))
+    ).all(), by_key)
+
+
+def submit_requests(session, requester_user_id, team_id, items):
+    """
+    items: [{"request_template_id": int, "parameters": dict|None, "idempotency_key": str|None}, ...]
+    반환: {"requests": [{"request_id", "idempotency_key", "created"} ...입력 순서...], "fulfillments": n}
+    호출자의 트랜잭션 안에서 실행 (커밋은 호출자 몫)
+    """
+    if not items:
+        return {"requests": [], "fulfillments": 0}
+
+    # 요청 서식은 요청자 팀에 매핑된 것만 (목록 API와 같은 범위)
+    template_ids = {int(i["request_template_id"]) for i in items}
+    M = RequestTemplateTeamMapping
+    visible = set(session.execute(
+        select(M.request_template_id)
+        .where(M.team_id == team_id, M.request_template_id.in_(template_ids))
+    ).scalars())
+    if visible != template_ids:
+        raise SubmissionError(f"사용할 수 없는 request_template_id: {sorted(template_ids - visible)}")
+
+    # 배치 안의 같은 키는 한 건으로 (내용이 다르면 충돌)
+    by_key = {}
+    for item in items:
+        key = item.get("idempotency_key")
+        if key is None:
+            continue
+        first = by_key.setdefault(key, item)
+        if _payload(first) != _payload(item):
+            raise IdempotencyConflict(f"같은 배치 안에서 idempotency_key '{key}'의 내용이 다릅니다")
+
+    request_ids = _existing(session, requester_user_id, list(by_key), by_key)  # key → request_id
+    replayed = set(request_ids)
+    R = Request.__table__
+
+    # 1) 키 있는 새 Request: 동시 제출과 경합하면 DO NOTHING → 아래에서 기존 행으로 처리
+    fresh = [k for k in by_key if k not in request_ids]
+    if fresh:
+        rows = session.execute(
+            sqlite_insert(R)
+            .on_conflict_do_nothing(index_elements=[R.c.requester_user_id, R.c.idempotency_key])
+            .returning(R.c.request_id, R.c.idempotency_key),
+            [
+                {
+                    "request_template_id": int(by_key[k]["request_template_id"]),
+                    "requester_user_id": requester_user_id,
+                    "parameters": by_key[k].get("parameters"),
+                    "idempotency_key": k,
+                }
+                for k in fresh
+            ],
+        ).all()
+        request_ids.update({key: request_id for request_id, key in rows})
+        lost = [k for k in fresh if k not in request_ids]
+        request_ids.update(_existing(session, requester_user_id, lost, by_key))
+        replayed.update(lost)
+
+    # 2) 키 없는 Request: SQLite는 RETURNING 순서를 보장하지 않고 sort_by_parameter_order는
+    #    행마다 INSERT로 풀리므로, 내용(template, parameters)으로 입력 항목에 되돌려 붙임
+    #    (키 없는 같은 내용의 요청끼리는 서로 바꿔도 같은 결과)
+    keyless = [i for i in items if i.get("idempotency_key") is None]
+    keyless_ids = []
+    if keyless:
+        pool = {}
+        for request_id, template_id, parameters in session.execute(
+            insert(R).returning(R.c.request_id, R.c.request_template_id, R.c.parameters),
+            [
+                {
+                    "request_template_id": int(i["request_template_id"]),
+                    "requester_user_id": requester_user_id,
+                    "parameters": i.get("parameters"),
+                }
+                for i in keyless
+            ],
+        ):
+            pool.setdefault(_payload_key(template_id, parameters), []).append(request_id)
+        for ids in pool.values():
+            ids.sort(reverse=True)
+        keyless_ids = [pool[_payload_key(*_payload(i))].pop() for i in keyless]
+
+    created_ids = keyless_ids + [request_ids[k] for k in by_key if k not in replayed]
+    fulfillment_rows = 0
+    if created_ids:
+        # 3) 팀 fan-out: 새 Request × 서식에 매핑된 팀 (INSERT … SELECT 1회)
+        RF = RequestFulfillment.__table__
+        fanned = session.execute(
+            insert(RF).from_select(
+                ["request_id", "assigned_team_id", "status"],
+                select(R.c.request_id, M.team_id, literal("PENDING"))
+                .join(M, M.request_template_id == R.c.request_template_id)
+                .where(R.c.request_id.in_(created_ids)),
+            ).returning(RF.c.fulfillment_id, RF.c.request_id, RF.c.assigned_team_id)
+        ).all()
+        fulfillment_rows = len(fanned)
+        for fulfillment_id, request_id, assigned_team_id in fanned:
+            publish(session, "fulfillment", fulfillment_id, teams=[assigned_team_id],
+                    status="PENDING", request_id=request_id)
+        record_created(session, "requests", RequestFulfillment.request_id.in_(created_ids))
+        recount(session, "requests", created_ids)
+
+        created_templates = {
+            int(i["request_template_id"]) for i in items
+            if i.get("idempotency_key") is None or i["idempotency_key"] not in replayed
+        }
+        for assigned_team_id in set(session.execute(
+            select(M.team_id).where(M.request_template_id.in_(created_templates)).distinct()
+        ).scalars()):
+            invalidate_calendar(session, assigned_team_id)
+
+    keyless_iter = iter(keyless_ids)
+    results = []
+    for item in items:
+        key = item.get("idempotency_key")
+        if key is None:
+            results.append({"request_id": next(keyless_iter), "idempotency_key": None, "created": True})
+        else:
+            results.append({"request_id": request_ids[key], "idempotency_key": key, "created": key not in replayed})
+    return {"requests": results, "fulfillments": fulfillment_rows}
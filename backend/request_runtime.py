@@ -0,0 +1,132 @@
+# backend/request_runtime.py
+# -*- coding: utf-8 -*-
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+
+from orm_build import request_session, Request, RequestFulfillment, Workflow
+from authz import current_principal
+from config import REQUEST_BATCH_MAX
+from request_engine import submit_requests, SubmissionError, IdempotencyConflict
+from progress import progress_percent
+
+bp_request_runtime = Blueprint("request_runtime", __name__, url_prefix="/api/requests")
+
+MAX_KEY_LENGTH = 255
+
+
+def _parse_item(raw, header_key=None) -> dict:
+    if not isinstance(raw, dict):
+        raise ValueError("각 요청은 객체여야 합니다")
+    template_id = raw.get("request_template_id")
+    if isinstance(template_id, bool) or not isinstance(template_id, int):
+        raise ValueError("request_template_id는 정수여야 합니다")
+    parameters = raw.get("parameters")
+    if parameters is not None and not isinstance(parameters, dict):
+        raise ValueError("parameters는 객체여야 합니다")
+    key = raw.get("idempotency_key", header_key)
+    if key is not None and (not isinstance(key, str) or not 0 < len(key) <= MAX_KEY_LENGTH):
+        raise ValueError(f"idempotency_key는 1~{MAX_KEY_LENGTH}자 문자열이어야 합니다")
+    return {"request_template_id": template_id, "parameters": parameters, "idempotency_key": key}
+
+
+# ─────────────────────────────────────────────────────────────
+# Request 제출 (단건 또는 배치)
+#   단건: {"request_template_id", "parameters", "idempotency_key"} (키는 Idempotency-Key 헤더로도 가능)
+#   배치: {"requests": [단건, ...]} — 전부 성공하거나 전부 실패
+# 응답: 새로 만든 Request가 있으면 201, 전부 재전송(기존 키)이면 200
+@bp_request_runtime.post("")
+@jwt_required()
+def submit():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"message": "JSON 본문이 필요합니다"}), 400
+    header_key = request.headers.get("Idempotency-Key")
+    try:
+        if "requests" in body:
+            raw_items = body["requests"]
+            if not isinstance(raw_items, list) or not raw_items:
+                raise ValueError("requests는 비어 있지 않은 배열이어야 합니다")
+            if header_key is not None:
+                raise ValueError("배치 제출은 Idempotency-Key 헤더 대신 항목별 idempotency_key를 사용하세요")
+            items = [_parse_item(raw) for raw in raw_items]
+        else:
+            items = [_parse_item(body, header_key)]
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    if len(items) > REQUEST_BATCH_MAX:
+        return jsonify({"message": f"한 번에 최대 {REQUEST_BATCH_MAX}건까지 제출할 수 있습니다"}), 413
+
+    principal = current_principal()
+    if not principal:
+        return jsonify({"message": "유저를 찾을 수 없습니다"}), 404
+    if not principal.team_id:
+        return jsonify({"message": "소속 팀이 없는 사용자는 요청을 제출할 수 없습니다"}), 403
+
+    try:
+        result = submit_requests(request_session(), principal.user_id, principal.team_id, items)
+    except IdempotencyConflict as e:
+        return jsonify({"message": str(e)}), 409
+    except SubmissionError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # 배치 안에서 같은 키를 반복한 항목은 한 건으로 셈
+    created = len({r["request_id"] for r in result["requests"] if r["created"]})
+    return jsonify({
+        "requests": result["requests"],
+        "created": created,
+        "replayed": sum(not r["created"] for r in result["requests"]),
+        "fulfillments": result["fulfillments"],
+    }), 201 if created else 200
+
+
+def _progress(total, active, done) -> dict:
+    return {"total": total, "active": active, "done": done, "percent": progress_percent(total, done)}
+
+# ─────────────────────────────────────────────────────────────
+# Request 진행 상황: 상태/진행률은 부모 행의 카운터에서 (자식 Task를 세지 않음)
+@bp_request_runtime.get("/<int:request_id>")
+@jwt_required()
+def get_request(request_id: int):
+    principal = current_principal()
+    if not principal:
+        return jsonify({"message": "유저를 찾을 수 없습니다"}), 404
+    s = request_session()
+    req = s.get(Request, request_id)
+    if req is None:
+        return jsonify({"message": "요청을 찾을 수 없습니다"}), 404
+
+    RF = RequestFulfillment
+    fulfillments = s.execute(
+        select(RF.fulfillment_id, RF.assigned_team_id, RF.status, RF.workflow_id, RF.completed_at,
+               Workflow.task_total, Workflow.task_active, Workflow.task_done)
+        .outerjoin(Workflow, Workflow.workflow_id == RF.workflow_id)
+        .where(RF.request_id == request_id)
+        .order_by(RF.fulfillment_id)
+    ).all()
+    # 요청자 본인 또는 처리 담당 팀원만
+    if req.requester_user_id != principal.user_id \
+            and principal.team_id not in {f.assigned_team_id for f in fulfillments}:
+        return jsonify({"message": "요청을 찾을 수 없습니다"}), 404
+
+    return jsonify({
+        "request_id": req.request_id,
+        "request_template_id": req.request_template_id,
+        "requester_user_id": req.requester_user_id,
+        "status": req.status,
+        "progress": _progress(req.fulfillment_total, req.fulfillment_active, req.fulfillment_done),
+        "parameters": req.parameters,
+        "created_at": req.created_at,
+        "completed_at": req.completed_at,
+        "fulfillments": [
+            {
+                "fulfillment_id": f.fulfillment_id,
+                "assigned_team_id": f.assigned_team_id,
+                "status": f.status,
+                "workflow_id": f.workflow_id,
+                "completed_at": f.completed_at,
+                "progress": _progress(f.task_total or 0, f.task_active or 0, f.task_done or 0),
+            }
+            for f in fulfillments
+        ],
+    }), 200
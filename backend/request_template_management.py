@@ -1,145 +1,152 @@
 # -*- coding: utf-8 -*-
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 # orm
-from orm_build import get_session, User, Team, RequestTemplate
+from orm_build import request_session, User, Team, RequestTemplate, RequestTemplateTeamMapping
 
 # custom decorator
 from user_management import require_db_admin
+from authz import current_principal
+from team_revision import team_etag, touch_teams, bump_after_write
+from listing import list_params, apply_listing, paginate, sparse, listing_response
 
 bp_request_management = Blueprint("request_management", __name__, url_prefix="/api/request-management")
+bp_request_management.after_request(bump_after_write)  # 쓰기 성공 시 팀 revision +1
 
 
 @bp_request_management.get("/request-templates")
 @jwt_required()
+@team_etag
 def get_request_templates():
-    """사용자 팀에 매핑된 RequestTemplate 목록을 반환"""
-    uid = int(get_jwt_identity())
-    with get_session() as s:
-        current_user = s.get(User, uid)
-        if not current_user or not current_user.team_id:
-            return jsonify({"request_templates": []})
-
-        request_templates = (
-            s.query(RequestTemplate)
-            .join(RequestTemplate.teams)
-            .filter(Team.team_id == current_user.team_id)
-            .order_by(RequestTemplate.template_name)
-            .all()
-        )
-
-        return jsonify({
-            "request_templates": [
-                {
-                    "request_template_id": rt.request_template_id,
-                    "template_name": rt.template_name,
-                    "description": rt.description,
-                } for rt in request_templates
-            ]
-        })
+    """사용자 팀에 매핑된 RequestTemplate 목록 (이름순, keyset 페이지네이션 / q·fields 필터)"""
+    principal = current_principal()
+    params = list_params()
+    s = request_session()
+    if not principal or not principal.team_id:
+        return jsonify({"request_templates": []})
+
+    stmt = apply_listing(
+        select(RequestTemplate)
+        .join(RequestTemplateTeamMapping, RequestTemplateTeamMapping.request_template_id == RequestTemplate.request_template_id)
+        .where(RequestTemplateTeamMapping.team_id == principal.team_id),
+        params, RequestTemplate.template_name, RequestTemplate.request_template_id,
+    )
+    request_templates, next_cursor = paginate(
+        s.execute(stmt).scalars().all(), params, lambda rt: (rt.template_name, rt.request_template_id)
+    )
+
+    return listing_response({
+        "request_templates": [
+            sparse({
+                "request_template_id": rt.request_template_id,
+                "template_name": rt.template_name,
+                "description": rt.description,
+            }, params, keep=("request_template_id",)) for rt in request_templates
+        ]
+    }, next_cursor)
 
 @bp_request_management.post("/request-templates")
 @require_db_admin
 def create_request_template():
     """새로운 RequestTemplate을 생성하고 현재 사용자의 팀에 매핑"""
-    uid = int(get_jwt_identity())
+    principal = current_principal()
     data = request.get_json()
     template_name = data.get("template_name")
     if not template_name:
         return jsonify({"message": "템플릿 이름은 필수입니다."}), 400
 
-    with get_session() as s:
-        current_user = s.get(User, uid)
-        if not current_user or not current_user.team_id:
-            return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
-
-        existing = s.query(RequestTemplate).filter_by(template_name=template_name).first()
-        if existing:
-            if not any(team.team_id == current_user.team_id for team in existing.teams):
-                team_to_map = s.get(Team, current_user.team_id)
-                existing.teams.append(team_to_map)
-                s.commit()
-                return jsonify({"message": f"기존 템플릿 '{template_name}'을 현재 팀에 추가했습니다."}), 200
-            else:
-                return jsonify({"message": "이미 같은 이름의 템플릿이 존재합니다."}), 409
-
-        new_template = RequestTemplate(
-            template_name=template_name,
-            description=data.get("description")
-        )
-        
-        team_to_map = s.get(Team, current_user.team_id)
-        new_template.teams.append(team_to_map)
-        
-        s.add(new_template)
-        s.flush()
-        
-        # 생성된 객체를 직렬화하여 반환
-        s.refresh(new_template)
-        return jsonify({
-            "message": "새 요청 서식이 생성되었습니다.",
-            "request_template_id": new_template.request_template_id,
-            "template_name": new_template.template_name,
-            "description": new_template.description
-        }), 201
+    s = request_session()
+    if not principal or not principal.team_id:
+        return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
+
+    existing = s.query(RequestTemplate).filter_by(template_name=template_name).first()
+    if existing:
+        if not any(team.team_id == principal.team_id for team in existing.teams):
+            team_to_map = s.get(Team, principal.team_id)
+            existing.teams.append(team_to_map)
+            s.flush()
+            return jsonify({"message": f"기존 템플릿 '{template_name}'을 현재 팀에 추가했습니다."}), 200
+        else:
+            return jsonify({"message": "이미 같은 이름의 템플릿이 존재합니다."}), 409
+
+    new_template = RequestTemplate(
+        template_name=template_name,
+        description=data.get("description")
+    )
+
+    team_to_map = s.get(Team, principal.team_id)
+    new_template.teams.append(team_to_map)
+
+    s.add(new_template)
+    s.flush()
+
+    # 생성된 객체를 직렬화하여 반환
+    s.refresh(new_template)
+    return jsonify({
+        "message": "새 요청 서식이 생성되었습니다.",
+        "request_template_id": new_template.request_template_id,
+        "template_name": new_template.template_name,
+        "description": new_template.description
+    }), 201
 
 @bp_request_management.put("/request-templates/<int:template_id>")
 @require_db_admin
 def update_request_template(template_id: int):
     """RequestTemplate 정보를 업데이트"""
-    uid = int(get_jwt_identity())
+    principal = current_principal()
     data = request.get_json()
-    with get_session() as s:
-        current_user = s.get(User, uid)
-        if not current_user or not current_user.team_id:
-            return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
-
-        rt = s.query(RequestTemplate).options(selectinload(RequestTemplate.teams)).filter_by(request_template_id=template_id).first()
-        if not rt:
-            return jsonify({"message": "템플릿을 찾을 수 없습니다."}), 404
-
-        if not any(team.team_id == current_user.team_id for team in rt.teams):
-            return jsonify({"message": "이 템플릿을 수정할 권한이 없습니다."}), 403
-
-        rt.template_name = data.get("template_name", rt.template_name)
-        rt.description = data.get("description", rt.description)
-        
-        s.commit()
-        s.refresh(rt)
-        return jsonify({
-            "message": "요청 서식이 업데이트되었습니다.",
-            "request_template_id": rt.request_template_id,
-            "template_name": rt.template_name,
-            "description": rt.description
-        })
+    s = request_session()
+    if not principal or not principal.team_id:
+        return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
+
+    rt = s.query(RequestTemplate).options(selectinload(RequestTemplate.teams)).filter_by(request_template_id=template_id).first()
+    if not rt:
+        return jsonify({"message": "템플릿을 찾을 수 없습니다."}), 404
+
+    if not any(team.team_id == principal.team_id for team in rt.teams):
+        return jsonify({"message": "이 템플릿을 수정할 권한이 없습니다."}), 403
+
+    # 이 서식을 공유하는 모든 팀의 목록이 바뀜
+    touch_teams(*(team.team_id for team in rt.teams))
+
+    rt.template_name = data.get("template_name", rt.template_name)
+    rt.description = data.get("description", rt.description)
+
+    s.flush()
+    return jsonify({
+        "message": "요청 서식이 업데이트되었습니다.",
+        "request_template_id": rt.request_template_id,
+        "template_name": rt.template_name,
+        "description": rt.description
+    })
 
 
 @bp_request_management.delete("/request-templates/<int:template_id>")
 @require_db_admin
 def delete_request_template(template_id: int):
     """RequestTemplate과 현재 사용자 팀의 매핑을 제거. 다른 팀에서도 사용하지 않으면 템플릿 자체를 삭제."""
-    uid = int(get_jwt_identity())
-    with get_session() as s:
-        current_user = s.get(User, uid)
-        if not current_user or not current_user.team_id:
-            return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
-
-        rt = s.query(RequestTemplate).options(selectinload(RequestTemplate.teams)).filter_by(request_template_id=template_id).first()
-        if not rt:
-            return jsonify({"message": "템플릿을 찾을 수 없습니다."}), 404
-
-        team_to_remove = next((team for team in rt.teams if team.team_id == current_user.team_id), None)
-        if team_to_remove:
-            rt.teams.remove(team_to_remove)
-            
-            if not rt.teams:
-                s.delete(rt)
-                s.commit()
-                return jsonify({"message": "요청 서식이 팀에서 제거되었고, 다른 팀에서도 사용하지 않아 완전히 삭제되었습니다."}), 200
-            else:
-                s.commit()
-                return jsonify({"message": "요청 서식이 팀에서 제거되었습니다."}), 200
+    principal = current_principal()
+    s = request_session()
+    if not principal or not principal.team_id:
+        return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
+
+    rt = s.query(RequestTemplate).options(selectinload(RequestTemplate.teams)).filter_by(request_template_id=template_id).first()
+    if not rt:
+        return jsonify({"message": "템플릿을 찾을 수 없습니다."}), 404
+
+    team_to_remove = next((team for team in rt.teams if team.team_id == principal.team_id), None)
+    if team_to_remove:
+        rt.teams.remove(team_to_remove)
+
+        if not rt.teams:
+            s.delete(rt)
+            s.flush()
+            return jsonify({"message": "요청 서식이 팀에서 제거되었고, 다른 팀에서도 사용하지 않아 완전히 삭제되었습니다."}), 200
         else:
-            return jsonify({"message": "해당 템플릿은 현재 팀에 매핑되어 있지 않습니다."}), 404
+            s.flush()
+            return jsonify({"message": "요청 서식이 팀에서 제거되었습니다."}), 200
+    else:
+        return jsonify({"message": "해당 템플릿은 현재 팀에 매핑되어 있지 않습니다."}), 404
@@ -0,0 +1,181 @@
+# backend/rollup.py
+# -*- coding: utf-8 -*-
+"""
+팀/일자/상태별 건수 롤업(daily_status_counts) 유지·재구성·검증
+
+  python rollup.py rebuild [--team N]   원본 테이블에서 다시 집계 (백필)
+  python rollup.py check                원본과 비교, 불일치가 있으면 exit 1
+"""
+import sys
+from datetime import datetime, date, timezone
+
+from sqlalchemy import select, delete, func, case, literal, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from orm_build import DailyStatusCount, Task, RequestFulfillment
+
+# ─────────────────────────────────────────────────────────────
+# 집계 대상: kind → (모델, 팀 컬럼)
+KINDS = {
+    "tasks": (Task, Task.team_id),
+    "requests": (RequestFulfillment, RequestFulfillment.assigned_team_id),
+}
+
+def bucket_day(model):
+    """완료된 행은 completed_at, 그 외는 created_at 의 날짜 (SQL 식)"""
+    return func.date(case(
+        (model.status == "COMPLETED", func.coalesce(model.completed_at, model.created_at)),
+        else_=model.created_at,
+    ))
+
+def day_of(ts) -> str:
+    """RETURNING으로 받은 시각 → 'YYYY-MM-DD' (bucket_day와 같은 규칙의 파이썬 쪽)"""
+    if ts is None:
+        ts = datetime.now(timezone.utc)
+    if isinstance(ts, str):
+        return ts[:10]
+    if isinstance(ts, datetime):
+        return ts.date().isoformat()
+    if isinstance(ts, date):
+        return ts.isoformat()
+    raise TypeError(f"날짜로 변환할 수 없음: {ts!r}")
+
+def _upsert():
+    DSC = DailyStatusCount.__table__
+    stmt = sqlite_insert(DSC)
+    return stmt.on_conflict_do_update(
+        index_elements=[DSC.c.team_id, DSC.c.day, DSC.c.kind, DSC.c.status],
+        set_={"count": DSC.c.count + stmt.excluded.count},
+    )
+
+# ─────────────────────────────────────────────────────────────
+# 증감: 상태 전이를 수행한 쪽이 같은 트랜잭션에서 호출
+def apply_deltas(session, kind: str, deltas: dict):
+    """deltas: {(team_id, day, status): +n/-n} → executemany UPSERT 1회"""
+    rows = [
+        {"team_id": team_id, "day": day, "kind": kind, "status": status, "count": n}
+        for (team_id, day, status), n in deltas.items()
+        if team_id is not None and n
+    ]
+    if rows:
+        session.connection().execute(_upsert(), rows)
+
+def record_transitions(session, kind: str, transitions):
+    """transitions: [(team_id, 이전 day, 이전 status, 새 day, 새 status), ...]"""
+    deltas = {}
+    for team_id, old_day, old_status, new_day, new_status in transitions:
+        if (old_day, old_status) == (new_day, new_status):
+            continue
+        if old_status is not None:
+            key = (team_id, old_day, old_status)
+            deltas[key] = deltas.get(key, 0) - 1
+        key = (team_id, new_day, new_status)
+        deltas[key] = deltas.get(key, 0) + 1
+    apply_deltas(session, kind, deltas)
+
+def record_created(session, kind: str, *where):
+    """방금 INSERT한 행(where로 지정)을 INSERT … SELECT 집계로 한 번에 가산"""
+    model, team_col = KINDS[kind]
+    day = bucket_day(model)
+    session.execute(
+        _upsert().from_select(
+            ["team_id", "day", "kind", "status", "count"],
+            select(team_col, day, literal(kind), func.coalesce(model.status, "PENDING"), func.count())
+            .where(team_col.is_not(None), *where)
+            .group_by(team_col, day, model.status),
+        )
+    )
+
+# ─────────────────────────────────────────────────────────────
+# 원본 테이블 기준 집계 (재구성 / 검증용)
+def _source_counts(team_id=None):
+    parts = []
+    for kind, (model, team_col) in KINDS.items():
+        day = bucket_day(model)
+        q = (
+            select(
+                team_col.label("team_id"), day.label("day"), literal(kind).label("kind"),
+                func.coalesce(model.status, "PENDING").label("status"), func.count().label("count"),
+            )
+            .where(team_col.is_not(None))
+            .group_by(team_col, day, model.status)
+        )
+        if team_id is not None:
+            q = q.where(team_col == team_id)
+        parts.append(q)
+    return union_all(*parts)
+
+def rebuild(session, team_id=None) -> int:
+    """롤업을 원본에서 다시 채움. 반환: 기록된 행 수"""
+    DSC = DailyStatusCount.__table__
+    q = delete(DSC)
+    if team_id is not None:
+        q = q.where(DSC.c.team_id == team_id)
+    session.execute(q)
+    src = _source_counts(team_id).subquery()
+    return session.execute(
+        DSC.insert().from_select(
+            ["team_id", "day", "kind", "status", "count"],
+            select(src.c.team_id, src.c.day, src.c.kind, src.c.status, src.c.count),
+        )
+    ).rowcount
+
+def check(session) -> list:
+    """원본과 다른 (team_id, day, kind, status) 목록: [(키, 롤업 값, 원본 값), ...]"""
+    DSC = DailyStatusCount.__table__
+    stored = {
+        (t, d, k, s): n
+        for t, d, k, s, n in session.execute(
+            select(DSC.c.team_id, DSC.c.day, DSC.c.kind, DSC.c.status, DSC.c.count)
+        )
+    }
+    actual = {(t, d, k, s): n for t, d, k, s, n in session.execute(_source_counts())}
+    return [
+        (key, stored.get(key, 0), actual.get(key, 0))
+        for key in sorted(set(stored) | set(actual), key=str)
+        if stored.get(key, 0) != actual.get(key, 0)
+    ]
+
+def ensure_backfilled(session) -> bool:
+    """롤업이 비어 있고 원본에 데이터가 있으면 재구성 (기존 DB 첫 기동 시)"""
+    if session.execute(select(DailyStatusCount.team_id).limit(1)).first() is not None:
+        return False
+    if session.execute(select(Task.task_id).where(Task.team_id.is_not(None)).limit(1)).first() is None \
+            and session.execute(select(RequestFulfillment.fulfillment_id).limit(1)).first() is None:
+        return False
+    rebuild(session)
+    return True
+
+# ─────────────────────────────────────────────────────────────
+# 조회: 팀의 기간 내 롤업 행 (PK (team_id, day, …) 범위 조회)
+def counts_between(session, team_id: int, start: str, end: str):
+    DSC = DailyStatusCount
+    return session.execute(
+        select(DSC.day, DSC.kind, DSC.status, DSC.count)
+        .where(DSC.team_id == team_id, DSC.day.between(start, end), DSC.count != 0)
+        .order_by(DSC.day)
+    ).all()
+
+
+if __name__ == "__main__":
+    import argparse
+    from orm_build import get_session
+
+    parser = argparse.ArgumentParser(description="daily_status_counts 롤업 관리")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_rebuild = sub.add_parser("rebuild", help="원본 테이블에서 다시 집계")
+    p_rebuild.add_argument("--team", type=int, default=None)
+    sub.add_parser("check", help="원본과 비교 (불일치 시 exit 1)")
+    args = parser.parse_args()
+
+    if args.cmd == "rebuild":
+        with get_session() as s:
+            n = rebuild(s, args.team)
+        print(f"✅ 롤업 재구성 완료: {n}행")
+    else:
+        with get_session(readonly=True) as s:
+            diffs = check(s)
+        for (team_id, day, kind, status), stored, actual in diffs:
+            print(f"[FAIL] team={team_id} {day} {kind}/{status}: rollup={stored} actual={actual}")
+        print("✅ 롤업 일치" if not diffs else f"❌ 불일치 {len(diffs)}건")
+        sys.exit(1 if diffs else 0)
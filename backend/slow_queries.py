@@ -0,0 +1,173 @@
+# backend/slow_queries.py
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from flask import Blueprint, jsonify, request, has_request_context
+from sqlalchemy import event
+
+from config import (
+    SLOW_QUERY_MS, SLOW_QUERY_LOG, SLOW_QUERY_LOG_BYTES, SLOW_QUERY_LOG_BACKUPS, SLOW_QUERY_EXPLAIN,
+)
+from orm_build import engine
+from user_management import require_db_admin
+
+bp_slow_queries = Blueprint("slow_queries", __name__, url_prefix="/api/admin/slow-queries")
+
+# ─────────────────────────────────────────────────────────────
+# 느린 SQL 로그: 실행 시간이 SLOW_QUERY_MS 이상인 문장을 JSON 한 줄씩 회전 파일에 기록
+# - 기록: SQL, 파라미터 모양(값은 남기지 않음: 타입과 개수만), 호출한 Flask endpoint, EXPLAIN QUERY PLAN
+# - 시간은 cursor.execute까지 (SELECT 결과를 나중에 fetch하는 시간은 제외)
+# - EXPLAIN은 같은 DBAPI 커넥션에서 바로 실행 (SQLAlchemy 이벤트를 다시 타지 않음), 같은 SQL의 계획은 캐시
+# - 여러 프로세스가 같은 파일에 쓰면 회전 시점이 겹칠 수 있음 → 프로세스별 SLOW_QUERY_LOG 권장
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+MAX_SQL_CHARS = 10000
+PLAN_CACHE_SIZE = 256
+
+_logger = logging.getLogger("slow_queries")
+_plans: OrderedDict = OrderedDict()  # SQL → 계획 (LRU)
+_plans_lock = threading.Lock()
+
+def _shape(value) -> str:
+    if value is None:
+        return "null"
+    return type(value).__name__
+
+def _is_many(parameters, executemany: bool) -> bool:
+    # insertmanyvalues(INSERT … VALUES (…), (…) RETURNING)는 executemany=True여도 파라미터가 평평한 tuple 1개
+    return executemany and bool(parameters) and isinstance(parameters[0], (tuple, list, dict))
+
+def _param_shape(parameters, executemany: bool):
+    """값 대신 타입 목록 (연속된 같은 타입은 'int×500'으로 묶음) — IN 목록 길이도 보이도록"""
+    if _is_many(parameters, executemany):
+        rows = list(parameters or ())
+        return {"rows": len(rows), "first": _param_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {k: _shape(v) for k, v in parameters.items()}
+    runs = []
+    for value in parameters or ():
+        shape = _shape(value)
+        if runs and runs[-1][0] == shape:
+            runs[-1][1] += 1
+        else:
+            runs.append([shape, 1])
+    return [shape if n == 1 else f"{shape}×{n}" for shape, n in runs]
+
+def _explain(dbapi_connection, statement, parameters, executemany: bool):
+    if not SLOW_QUERY_EXPLAIN or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    with _plans_lock:
+        if statement in _plans:
+            _plans.move_to_end(statement)
+            return _plans[statement]
+    params = parameters[0] if _is_many(parameters, executemany) else parameters
+    try:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, params or ())
+            # (id, parent, notused, detail) → 들여쓰기로 트리 표시
+            depth = {0: -1}
+            plan = []
+            for node_id, parent, _, detail in cursor.fetchall():
+                depth[node_id] = depth.get(parent, -1) + 1
+                plan.append("  " * depth[node_id] + detail)
+        finally:
+            cursor.close()
+    except Exception as e:  # 계획을 못 얻어도 원래 실행에는 영향 없음
+        return [f"(EXPLAIN 실패: {e!r})"]
+    with _plans_lock:
+        _plans[statement] = plan
+        while len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+def _origin() -> dict:
+    if has_request_context():
+        # 쿼리스트링은 남기지 않음 (?jwt= 토큰 등)
+        return {"endpoint": request.endpoint or "unmatched", "method": request.method, "path": request.path}
+    return {"endpoint": "background", "thread": threading.current_thread().name}
+
+# ─────────────────────────────────────────────────────────────
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slowlog_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("slowlog_started")
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+    try:
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round(elapsed_ms, 2),
+            **_origin(),
+            "sql": statement[:MAX_SQL_CHARS],
+            "params": _param_shape(parameters, executemany),
+            "plan": _explain(cursor.connection, statement, parameters, executemany),
+        }
+        _logger.warning(json.dumps(entry, ensure_ascii=False))
+    except Exception as e:  # 로그 실패가 원래 쿼리를 깨뜨리면 안 됨
+        print(f"⚠️ 느린 SQL 기록 실패: {e!r}")
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    started = conn.info.get("slowlog_started") if conn is not None else None
+    if started:
+        started.pop()
+
+_installed = False
+
+def init_slow_query_log(app):
+    """create_app에서 호출. SLOW_QUERY_MS <= 0이면 끔 (관리 API는 빈 목록)"""
+    global _installed
+    app.register_blueprint(bp_slow_queries)
+    if SLOW_QUERY_MS <= 0 or _installed:
+        return
+    os.makedirs(os.path.dirname(SLOW_QUERY_LOG), exist_ok=True)
+    handler = RotatingFileHandler(SLOW_QUERY_LOG, maxBytes=SLOW_QUERY_LOG_BYTES,
+                                  backupCount=SLOW_QUERY_LOG_BACKUPS, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.WARNING)
+    _logger.propagate = False  # 콘솔에는 찍지 않음
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    _installed = True
+    print(f"Slow query log: >= {SLOW_QUERY_MS}ms → {SLOW_QUERY_LOG}")
+
+# ─────────────────────────────────────────────────────────────
+def read_entries(limit: int = 100, endpoint: str = None, min_ms: float = 0) -> list:
+    """최근 기록 (최신순). 회전된 파일은 읽지 않음"""
+    if not os.path.exists(SLOW_QUERY_LOG):
+        return []
+    recent = deque(maxlen=limit)
+    with open(SLOW_QUERY_LOG, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # 회전 중 잘린 줄
+            if endpoint and entry.get("endpoint") != endpoint:
+                continue
+            if entry.get("duration_ms", 0) < min_ms:
+                continue
+            recent.append(entry)
+    return list(reversed(recent))
+
+# 관리용 조회: ?limit=100&endpoint=workflow_management.list_workflow_templates&min_ms=500
+@bp_slow_queries.get("")
+@require_db_admin
+def list_slow_queries():
+    limit = min(max(request.args.get("limit", 100, type=int) or 100, 1), 1000)
+    min_ms = request.args.get("min_ms", 0, type=float) or 0
+    entries = read_entries(limit, request.args.get("endpoint") or None, min_ms)
+    return jsonify({"threshold_ms": SLOW_QUERY_MS, "entries": entries}), 200
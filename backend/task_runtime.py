@@ -0,0 +1,89 @@
+# backend/task_runtime.py
+# -*- coding: utf-8 -*-
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select, or_
+
+# orm
+from orm_build import request_session, Task, TaskTemplate, TaskAssignment
+
+from authz import current_principal
+from task_scheduler import complete_tasks
+
+bp_task_runtime = Blueprint("task_runtime", __name__, url_prefix="/api/tasks")
+
+
+# ─────────────────────────────────────────────────────────────
+# 지금 시작 가능한(READY) Task 목록
+@bp_task_runtime.get("/ready")
+@jwt_required()
+def list_ready_tasks():
+    """scope=team(기본): 우리 팀 READY Task / scope=me: 나에게 배정된 READY Task"""
+    scope = request.args.get("scope", "team")
+    if scope not in ("team", "me"):
+        return jsonify({"message": "scope는 team 또는 me 입니다"}), 400
+    principal = current_principal()
+    if not principal:
+        return jsonify({"message": "유저를 찾을 수 없습니다"}), 404
+
+    q = (
+        select(Task.task_id, Task.workflow_id, Task.task_template_id,
+               TaskTemplate.template_name, Task.created_at)
+        .outerjoin(TaskTemplate, TaskTemplate.task_template_id == Task.task_template_id)
+        .where(Task.status == "READY")
+    )
+    if scope == "me":
+        q = q.join(TaskAssignment, TaskAssignment.task_id == Task.task_id) \
+             .where(TaskAssignment.assigned_user_id == principal.user_id)
+    else:
+        if not principal.team_id:
+            return jsonify([]), 200
+        q = q.where(Task.team_id == principal.team_id)  # ix_tasks_team_status
+
+    rows = request_session().execute(q.order_by(Task.task_id)).all()
+    return jsonify([
+        {
+            "task_id": task_id,
+            "workflow_id": workflow_id,
+            "task_template_id": tt_id,
+            "template_name": name,
+            "created_at": created_at,
+        }
+        for task_id, workflow_id, tt_id, name, created_at in rows
+    ]), 200
+
+
+# ─────────────────────────────────────────────────────────────
+# Task 완료 (여러 건 일괄) → 새로 READY가 된 Task 반환
+@bp_task_runtime.post("/complete")
+@jwt_required()
+def complete_task_batch():
+    body = request.get_json(silent=True) or {}
+    try:
+        ids = {int(t) for t in body.get("task_ids") or []}
+    except (TypeError, ValueError):
+        return jsonify({"message": "task_ids 형식이 올바르지 않습니다"}), 400
+    if not ids:
+        return jsonify({"message": "task_ids is required"}), 400
+
+    principal = current_principal()
+    if not principal:
+        return jsonify({"message": "유저를 찾을 수 없습니다"}), 404
+
+    s = request_session()
+    # 권한: 우리 팀 Task 또는 나에게 배정된 Task만
+    allowed = set(s.execute(
+        select(Task.task_id).where(
+            Task.task_id.in_(ids),
+            or_(
+                Task.team_id == principal.team_id,
+                Task.task_id.in_(
+                    select(TaskAssignment.task_id).where(TaskAssignment.assigned_user_id == principal.user_id)
+                ),
+            ),
+        )
+    ).scalars())
+    if allowed != ids:
+        return jsonify({"message": "Task not found", "task_ids": sorted(ids - allowed)}), 404
+
+    return jsonify(complete_tasks(s, ids)), 200
@@ -0,0 +1,99 @@
+# backend/task_scheduler.py
+# -*- coding: utf-8 -*-
+from datetime import date
+
+from sqlalchemy import select, update, func
+
+from orm_build import Task, TaskDependency
+from calendark import invalidate_calendar
+from rollup import record_transitions, day_of
+from progress import record_task_transitions
+from events import publish
+
+# ─────────────────────────────────────────────────────────────
+# READY 스케줄러
+# - Task.remaining_upstream = 아직 완료되지 않은 선행 Task 수 (인스턴스 생성 시 초기화)
+# - 완료 처리 시 후행 Task 카운터를 한 문장으로 감소, 0이 된 Task는 READY
+# - 상태 전이는 같은 트랜잭션에서 daily_status_counts 롤업과 Workflow 카운터(progress)에 반영
+# - "지금 시작 가능한 Task" 조회는 (team_id, status) 인덱스로 결과 크기만큼만 읽음
+
+COMPLETABLE = ("READY", "IN_PROGRESS")
+
+
+def complete_tasks(session, task_ids):
+    """
+    task_ids 중 완료 가능한(READY/IN_PROGRESS) Task를 COMPLETED로 바꾸고
+    후행 카운터를 갱신. 반환: {"completed": [...], "ready": [...새로 READY...]}
+    """
+    T = Task.__table__
+    TD = TaskDependency.__table__
+    ids = list({int(t) for t in task_ids})
+    if not ids:
+        return {"completed": [], "ready": []}
+
+    # 이전 상태별로 갱신 → 롤업에서 뺄 버킷이 정확 (상태당 UPDATE 1회, 최대 2회)
+    by_status = {}
+    for task_id, status in session.execute(
+        select(T.c.task_id, T.c.status).where(T.c.task_id.in_(ids), T.c.status.in_(COMPLETABLE))
+    ):
+        by_status.setdefault(status, []).append(task_id)
+    done_rows, workflow_transitions = [], []
+    for status, status_ids in by_status.items():
+        rows = session.execute(
+            update(T)
+            .where(T.c.task_id.in_(status_ids), T.c.status == status)
+            .values(status="COMPLETED", completed_at=func.current_timestamp())
+            .returning(T.c.task_id, T.c.team_id, T.c.created_at, T.c.completed_at, T.c.workflow_id)
+        ).all()
+        record_transitions(session, "tasks", [
+            (team_id, day_of(created_at), status, day_of(completed_at), "COMPLETED")
+            for _, team_id, created_at, completed_at, _ in rows
+        ])
+        workflow_transitions.extend((workflow_id, status, "COMPLETED") for *_, workflow_id in rows)
+        done_rows.extend(rows)
+    if not done_rows:
+        return {"completed": [], "ready": []}
+    completed = [task_id for task_id, *_ in done_rows]
+    # Workflow 카운터 → 상태가 바뀐 Workflow의 Fulfillment → Request 카운터 순으로 전파
+    record_task_transitions(session, workflow_transitions)
+
+    # 달력: 생성 월 버킷에서 빠지고 완료 월(지금) 버킷에 들어감
+    for team_id in {team_id for _, team_id, *_ in done_rows}:
+        invalidate_calendar(session, team_id)
+    for team_id, year, month in {(t, c.year, c.month) for _, t, c, *_ in done_rows if c}:
+        invalidate_calendar(session, team_id, date(year, month, 1))
+
+    # 후행 Task별로 이번에 완료된 선행 수만큼 감소 (SET 식은 모두 갱신 전 값 기준)
+    finished_upstream = (
+        select(func.count())
+        .where(TD.c.downstream_task_id == T.c.task_id, TD.c.upstream_task_id.in_(completed))
+        .scalar_subquery()
+    )
+    downstream = select(TD.c.downstream_task_id).where(TD.c.upstream_task_id.in_(completed))
+    session.execute(
+        update(T)
+        .where(T.c.task_id.in_(downstream))
+        .values(remaining_upstream=T.c.remaining_upstream - finished_upstream)
+    )
+    # 카운터가 0이 된 PENDING → READY (생성일 버킷 안에서 상태만 이동)
+    ready_rows = session.execute(
+        update(T)
+        .where(T.c.task_id.in_(downstream), T.c.status == "PENDING", T.c.remaining_upstream <= 0)
+        .values(status="READY")
+        .returning(T.c.task_id, T.c.team_id, T.c.created_at, T.c.workflow_id)
+    ).all()
+    record_transitions(session, "tasks", [
+        (team_id, day_of(created_at), "PENDING", day_of(created_at), "READY")
+        for _, team_id, created_at, _ in ready_rows
+    ])
+
+    # 팀 구독자에게 상태 변경 이벤트 (커밋 후 발행)
+    for task_id, team_id, *_, workflow_id in done_rows:
+        publish(session, "task", task_id, teams=[team_id], status="COMPLETED", workflow_id=workflow_id)
+    for task_id, team_id, _, workflow_id in ready_rows:
+        publish(session, "task", task_id, teams=[team_id], status="READY", workflow_id=workflow_id)
+
+    return {
+        "completed": sorted(completed),
+        "ready": sorted(task_id for task_id, *_ in ready_rows),
+    }
@@ -1,158 +1,190 @@
 # -*- coding: utf-8 -*-
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select, or_
 from sqlalchemy.orm import selectinload
 
 # orm
-from orm_build import get_session, User, Team, Responsibility, TaskTemplate
+from orm_build import (
+    request_session, User, Team, Responsibility, TaskTemplate, TaskTemplateTeamMapping,
+    WorkflowTemplateDefinition, WorkflowtemplateTeamMapping,
+)
+from workflow_graph import bump_revision
 
 # custom decorator
 from user_management import require_db_admin
+from authz import current_principal
+from team_revision import team_etag, touch_teams, bump_after_write
+from listing import list_params, apply_listing, paginate, sparse, listing_response
 
 bp_task_management = Blueprint("task_management", __name__, url_prefix="/api/task-management")
+bp_task_management.after_request(bump_after_write)  # 쓰기 성공 시 팀 revision +1
 
 
 # ─────────────────────────────────────────────────────────────
 # 업무 정보 관리 (팀장 또는 DT전문가)
 @bp_task_management.get("/task-templates")
 @require_db_admin  # 팀장 또는 DT전문가
+@team_etag
 def get_task_templates():
-    """사용자 팀에 매핑된 TaskTemplate 목록과 Responsibility 목록을 반환"""
-    uid = int(get_jwt_identity())
-    with get_session() as s:
-        current_user = s.get(User, uid)
-        if not current_user or not current_user.team_id:
-            return jsonify({"task_templates": [], "responsibilities": []})
-
-        # 사용자의 팀에 매핑된 TaskTemplate 목록 조회 (task_template_team_mappings 기반)
-        task_templates = (
-            s.query(TaskTemplate)
-            .join(TaskTemplate.teams)
-            .filter(Team.team_id == current_user.team_id)
-            .order_by(TaskTemplate.template_name)
-            .all()
-        )
-
-        # 프론트엔드에서 담당 책임(Responsibility)을 선택할 수 있도록 팀의 전체 책임 목록 전달
-        responsibilities = s.query(Responsibility).filter_by(team_id=current_user.team_id).all()
-
-        return jsonify({
-            "task_templates": [
-                {
-                    "task_template_id": tt.task_template_id,
-                    "template_name": tt.template_name,
-                    "category": tt.category,
-                    "description": tt.description,
-                } for tt in task_templates
-            ]
-        })
+    """사용자 팀에 매핑된 TaskTemplate 목록 (이름순, keyset 페이지네이션 / q·category·fields 필터)"""
+    principal = current_principal()
+    params = list_params()
+    s = request_session()
+    if not principal or not principal.team_id:
+        return jsonify({"task_templates": []})
+
+    # 사용자의 팀에 매핑된 TaskTemplate 목록 조회 (task_template_team_mappings 기반)
+    stmt = apply_listing(
+        select(TaskTemplate)
+        .join(TaskTemplateTeamMapping, TaskTemplateTeamMapping.task_template_id == TaskTemplate.task_template_id)
+        .where(TaskTemplateTeamMapping.team_id == principal.team_id),
+        params, TaskTemplate.template_name, TaskTemplate.task_template_id, TaskTemplate.category,
+    )
+    task_templates, next_cursor = paginate(
+        s.execute(stmt).scalars().all(), params, lambda tt: (tt.template_name, tt.task_template_id)
+    )
+
+    return listing_response({
+        "task_templates": [
+            sparse({
+                "task_template_id": tt.task_template_id,
+                "template_name": tt.template_name,
+                "category": tt.category,
+                "description": tt.description,
+            }, params, keep=("task_template_id",)) for tt in task_templates
+        ]
+    }, next_cursor)
 
 @bp_task_management.put("/task-templates/<int:template_id>")
 @require_db_admin  # 팀장 또는 DT전문가
 def update_task_template(template_id: int):
     """TaskTemplate 정보를 업데이트"""
-    uid = int(get_jwt_identity())
+    principal = current_principal()
     data = request.get_json()
     
-    with get_session() as s:
-        current_user = s.get(User, uid)
-        if not current_user or not current_user.team_id:
-            return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
+    s = request_session()
+    if not principal or not principal.team_id:
+        return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
 
-        # 템플릿 조회 (팀 관계 포함)
-        tt = s.query(TaskTemplate).options(selectinload(TaskTemplate.teams)).filter_by(task_template_id=template_id).first()
-        if not tt:
-            return jsonify({"message": "템플릿을 찾을 수 없습니다."}), 404
+    # 템플릿 조회 (팀 관계 포함)
+    tt = s.query(TaskTemplate).options(selectinload(TaskTemplate.teams)).filter_by(task_template_id=template_id).first()
+    if not tt:
+        return jsonify({"message": "템플릿을 찾을 수 없습니다."}), 404
 
-        # (보안) 해당 템플릿이 사용자의 팀에 매핑되어 있는지 확인
-        if not any(team.team_id == current_user.team_id for team in tt.teams):
-            return jsonify({"message": "이 템플릿을 수정할 권한이 없습니다."}), 403
+    # (보안) 해당 템플릿이 사용자의 팀에 매핑되어 있는지 확인
+    if not any(team.team_id == principal.team_id for team in tt.teams):
+        return jsonify({"message": "이 템플릿을 수정할 권한이 없습니다."}), 403
 
-        # 정보 업데이트
-        tt.template_name = data.get("template_name", tt.template_name)
-        tt.category = data.get("category", tt.category)
-        tt.description = data.get("description", tt.description)
-        
-        s.commit()
-        return jsonify({"message": "업무 템플릿이 업데이트되었습니다."})
+    # 이 템플릿을 공유하는 모든 팀의 목록이 바뀜
+    touch_teams(*(team.team_id for team in tt.teams))
+
+    # 정보 업데이트
+    tt.template_name = data.get("template_name", tt.template_name)
+    tt.category = data.get("category", tt.category)
+    tt.description = data.get("description", tt.description)
+
+    s.flush()
+    return jsonify({"message": "업무 템플릿이 업데이트되었습니다."})
 
 
 @bp_task_management.post("/task-templates")
 @require_db_admin  # 팀장 또는 DT전문가
 def create_task_template():
     """새로운 TaskTemplate을 생성하고 현재 사용자의 팀에 매핑"""
-    uid = int(get_jwt_identity())
+    principal = current_principal()
     data = request.get_json()
     
     template_name = data.get("template_name")
     if not template_name:
         return jsonify({"message": "템플릿 이름은 필수입니다."}), 400
 
-    with get_session() as s:
-        current_user = s.get(User, uid)
-        if not current_user or not current_user.team_id:
-            return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
-
-        # (중복 방지) 같은 이름의 템플릿이 이미 있는지 확인
-        existing = s.query(TaskTemplate).filter_by(template_name=template_name).first()
-        if existing:
-            # 이미 존재하지만, 현재 팀에 매핑되지 않았다면 매핑만 추가
-            if not any(team.team_id == current_user.team_id for team in existing.teams):
-                team_to_map = s.get(Team, current_user.team_id)
-                existing.teams.append(team_to_map)
-                s.commit()
-                return jsonify({"message": f"기존 템플릿 '{template_name}'을 현재 팀에 추가했습니다."}), 200
-            else:
-                return jsonify({"message": "이미 같은 이름의 템플릿이 존재합니다."}), 409
-
-        # 새 템플릿 생성
-        new_template = TaskTemplate(
-            template_name=template_name,
-            
-            category=data.get("category"),
-            description=data.get("description"),
-        )
-        
-        # 생성한 템플릿을 현재 사용자의 팀에 매핑
-        team_to_map = s.get(Team, current_user.team_id)
-        new_template.teams.append(team_to_map)
-        
-        s.add(new_template)
-        s.flush() # ID를 받아오기 위해 flush
-        
-        return jsonify({
-            "message": "새 업무 템플릿이 생성되었습니다.",
-            "task_template_id": new_template.task_template_id
-        }), 201
+    s = request_session()
+    if not principal or not principal.team_id:
+        return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
+
+    # (중복 방지) 같은 이름의 템플릿이 이미 있는지 확인
+    existing = s.query(TaskTemplate).filter_by(template_name=template_name).first()
+    if existing:
+        # 이미 존재하지만, 현재 팀에 매핑되지 않았다면 매핑만 추가
+        if not any(team.team_id == principal.team_id for team in existing.teams):
+            team_to_map = s.get(Team, principal.team_id)
+            existing.teams.append(team_to_map)
+            s.flush()
+            return jsonify({"message": f"기존 템플릿 '{template_name}'을 현재 팀에 추가했습니다."}), 200
+        else:
+            return jsonify({"message": "이미 같은 이름의 템플릿이 존재합니다."}), 409
+
+    # 새 템플릿 생성
+    new_template = TaskTemplate(
+        template_name=template_name,
+
+        category=data.get("category"),
+        description=data.get("description"),
+    )
+
+    # 생성한 템플릿을 현재 사용자의 팀에 매핑
+    team_to_map = s.get(Team, principal.team_id)
+    new_template.teams.append(team_to_map)
+
+    s.add(new_template)
+    s.flush() # ID를 받아오기 위해 flush
+
+    return jsonify({
+        "message": "새 업무 템플릿이 생성되었습니다.",
+        "task_template_id": new_template.task_template_id
+    }), 201
+
+
+def _definitions_removed(session, template_id):
+    # 템플릿 삭제 시 이를 쓰는 워크플로우 정의도 함께 사라짐(cascade) / 선행 참조는 NULL
+    # → 해당 워크플로우 템플릿의 revision +1(컴파일 그래프 폐기), 공유 팀들의 목록 ETag 갱신
+    wt_ids = session.execute(
+        select(WorkflowTemplateDefinition.workflow_template_id)
+        .where(or_(
+            WorkflowTemplateDefinition.task_template_id == template_id,
+            WorkflowTemplateDefinition.depends_on_task_template_id == template_id,
+        ))
+        .distinct()
+    ).scalars().all()
+    if not wt_ids:
+        return
+    for wt_id in wt_ids:
+        bump_revision(session, wt_id)
+    touch_teams(*session.execute(
+        select(WorkflowtemplateTeamMapping.team_id)
+        .where(WorkflowtemplateTeamMapping.workflow_template_id.in_(wt_ids))
+        .distinct()
+    ).scalars())
 
 
 @bp_task_management.delete("/task-templates/<int:template_id>")
 @require_db_admin  # 팀장 또는 DT전문가
 def delete_task_template(template_id: int):
     """TaskTemplate과 현재 사용자 팀의 매핑을 제거. 다른 팀에서도 사용하지 않으면 템플릿 자체를 삭제."""
-    uid = int(get_jwt_identity())
+    principal = current_principal()
     
-    with get_session() as s:
-        current_user = s.get(User, uid)
-        if not current_user or not current_user.team_id:
-            return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
-
-        tt = s.query(TaskTemplate).options(selectinload(TaskTemplate.teams)).filter_by(task_template_id=template_id).first()
-        if not tt:
-            return jsonify({"message": "템플릿을 찾을 수 없습니다."}), 404
-
-        # 현재 팀과의 매핑 제거
-        team_to_remove = next((team for team in tt.teams if team.team_id == current_user.team_id), None)
-        if team_to_remove:
-            tt.teams.remove(team_to_remove)
-            
-            # 다른 팀에서도 이 템플릿을 사용하지 않는다면, 템플릿 자체를 삭제
-            if not tt.teams:
-                s.delete(tt)
-                s.commit()
-                return jsonify({"message": "업무 템플릿이 팀에서 제거되었고, 다른 팀에서도 사용하지 않아 완전히 삭제되었습니다."}), 200
-            else:
-                s.commit()
-                return jsonify({"message": "업무 템플릿이 팀에서 제거되었습니다."}), 200
+    s = request_session()
+    if not principal or not principal.team_id:
+        return jsonify({"message": "유효한 사용자가 아닙니다."}), 401
+
+    tt = s.query(TaskTemplate).options(selectinload(TaskTemplate.teams)).filter_by(task_template_id=template_id).first()
+    if not tt:
+        return jsonify({"message": "템플릿을 찾을 수 없습니다."}), 404
+
+    # 현재 팀과의 매핑 제거
+    team_to_remove = next((team for team in tt.teams if team.team_id == principal.team_id), None)
+    if team_to_remove:
+        tt.teams.remove(team_to_remove)
+
+        # 다른 팀에서도 이 템플릿을 사용하지 않는다면, 템플릿 자체를 삭제
+        if not tt.teams:
+            _definitions_removed(s, template_id)
+            s.delete(tt)
+            s.flush()
+            return jsonify({"message": "업무 템플릿이 팀에서 제거되었고, 다른 팀에서도 사용하지 않아 완전히 삭제되었습니다."}), 200
         else:
-            return jsonify({"message": "해당 템플릿은 현재 팀에 매핑되어 있지 않습니다."}), 404
+            s.flush()
+            return jsonify({"message": "업무 템플릿이 팀에서 제거되었습니다."}), 200
+    else:
+        return jsonify({"message": "해당 템플릿은 현재 팀에 매핑되어 있지 않습니다."}), 404
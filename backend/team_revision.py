@@ -0,0 +1,80 @@
+# backend/team_revision.py
+# -*- coding: utf-8 -*-
+import hashlib
+from functools import wraps
+
+from flask import g, request, make_response
+from sqlalchemy import select, update
+
+from orm_build import request_session, Team
+from authz import current_principal
+from events import publish
+
+# ─────────────────────────────────────────────────────────────
+# 팀별 revision: 팀에 보이는 템플릿/팀원 목록이 바뀔 때마다 +1
+# - 쓰기 요청이 성공하면 블루프린트 after_request에서 호출자 팀 (+ touch_teams로 지정한 팀) 증가
+# - 목록 GET은 revision으로 강한 ETag를 만들고 If-None-Match가 맞으면 ORM 조회 없이 304
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+def touch_teams(*team_ids):
+    """호출자 팀 외에 목록이 바뀌는 팀 (공유 템플릿 수정, 팀 이동 등)"""
+    touched = g.setdefault("touched_teams", set())
+    touched.update(t for t in team_ids if t is not None)
+
+def bump_team_revisions(session, team_ids):
+    ids = list({int(t) for t in team_ids if t is not None})
+    if not ids:
+        return
+    rows = session.execute(
+        update(Team)
+        .where(Team.team_id.in_(ids))
+        .values(revision=Team.revision + 1)
+        .returning(Team.team_id, Team.revision)
+        .execution_options(synchronize_session=False)
+    ).all()
+    # 팀 구독자는 revision이 바뀐 목록만 다시 받음 (If-None-Match로)
+    for team_id, revision in rows:
+        publish(session, "team", team_id, teams=[team_id], revision=revision)
+
+def bump_after_write(response):
+    """블루프린트 after_request: 성공한 쓰기 요청이면 같은 요청 세션(커밋 전)에서 revision 증가"""
+    if request.method not in WRITE_METHODS or response.status_code >= 400:
+        return response
+    teams = set(g.get("touched_teams", ()))
+    try:
+        principal = current_principal()
+    except (RuntimeError, ValueError, TypeError):
+        principal = None  # JWT 없는 요청
+    if principal and principal.team_id:
+        teams.add(principal.team_id)
+    bump_team_revisions(request_session(), teams)
+    return response
+
+# ─────────────────────────────────────────────────────────────
+def _team_etag(principal) -> str:
+    revision = request_session().execute(
+        select(Team.revision).where(Team.team_id == principal.team_id)
+    ).scalar_one_or_none()
+    raw = f"{principal.team_id}:{revision}:{principal.user_id}:{request.full_path}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+def team_etag(fn):
+    """팀 revision 기반 ETag / 304 (권한 데코레이터 아래에 둘 것)"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        principal = current_principal()
+        if not principal or not principal.team_id:
+            return fn(*args, **kwargs)
+
+        etag = _team_etag(principal)
+        # If-None-Match는 약한 비교 (압축 응답은 W/ ETag로 나감)
+        if request.if_none_match.contains_weak(etag):
+            resp = make_response("", 304)
+        else:
+            resp = make_response(fn(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "private, no-cache"  # 매번 재검증
+        return resp
+    return wrapper
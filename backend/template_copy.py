@@ -0,0 +1,122 @@
+# backend/template_copy.py
+# -*- coding: utf-8 -*-
+from sqlalchemy import select, insert, union, literal, values, column, func, Integer
+
+from orm_build import WorkflowTemplate, WorkflowTemplateDefinition, WorkflowtemplateTeamMapping, TaskTemplateTeamMapping
+
+# ─────────────────────────────────────────────────────────────
+# WorkflowTemplate 깊은 복사: 템플릿 + 정의(노드/엣지) + 팀 매핑을 DB 안에서 INSERT … SELECT로
+# - 템플릿 수·정의 수와 무관하게 SELECT 3회 + INSERT 3회 (+ 행 수 확인 changes() 2회), 정의를 Python 객체로 읽지 않음
+# - 새 이름 = name_prefix + 원본 이름 (template_name은 전역 유니크 → 이름으로 원본 id와 짝지음)
+# - 복사본은 target_team_id 팀에만 매핑됨 (원본의 다른 공유 팀은 따라가지 않음)
+# - 정의가 가리키는 업무 템플릿(TaskTemplate)은 복사하지 않음 → 대상 팀에 매핑돼 있지 않으면 거부
+
+class TemplateCopyError(ValueError):
+    pass
+
+DEFAULT_PREFIX = "[복제] "
+
+def _changes(session) -> int:
+    # WITH로 시작하는 INSERT는 pysqlite cursor.rowcount가 -1 → 같은 연결의 changes()
+    return session.execute(select(func.changes())).scalar_one()
+
+
+def copy_workflow_templates(session, wt_ids, target_team_id, name_prefix: str = DEFAULT_PREFIX):
+    """
+    반환: {"templates": [{"source_id", "workflow_template_id", "template_name", "description"} ...입력 순서...],
+           "rows": {"workflow_templates", "workflow_template_definitions", "workflow_template_team_mappings"}}
+    호출자의 트랜잭션 안에서 실행 (커밋은 호출자 몫). 대상 팀에 대한 권한 확인은 호출자 몫
+    """
+    wt_ids = list(dict.fromkeys(int(i) for i in wt_ids))
+    if not wt_ids:
+        return {"templates": [], "rows": {"workflow_templates": 0, "workflow_template_definitions": 0,
+                                          "workflow_template_team_mappings": 0}}
+    if not name_prefix:
+        raise TemplateCopyError("name_prefix가 비어 있으면 원본과 이름이 겹칩니다")
+
+    WT = WorkflowTemplate.__table__
+    sources = {
+        wt_id: (name, description) for wt_id, name, description in session.execute(
+            select(WT.c.workflow_template_id, WT.c.template_name, WT.c.description)
+            .where(WT.c.workflow_template_id.in_(wt_ids))
+        )
+    }
+    missing = set(wt_ids) - set(sources)
+    if missing:
+        raise TemplateCopyError(f"존재하지 않는 workflow_template_id: {sorted(missing)}")
+    # 정의의 업무 템플릿(작업/선행 모두)이 대상 팀에 보여야 함 — 안 보이는 템플릿을 가리키는 복사본은 만들지 않음
+    D = WorkflowTemplateDefinition.__table__
+    TT = TaskTemplateTeamMapping.__table__
+    used = union(
+        select(D.c.task_template_id.label("task_template_id")).where(D.c.workflow_template_id.in_(wt_ids)),
+        select(D.c.depends_on_task_template_id).where(
+            D.c.workflow_template_id.in_(wt_ids), D.c.depends_on_task_template_id.is_not(None)
+        ),
+    ).subquery()
+    hidden = session.execute(
+        select(used.c.task_template_id).where(
+            used.c.task_template_id.not_in(select(TT.c.task_template_id).where(TT.c.team_id == int(target_team_id)))
+        )
+    ).scalars().all()
+    if hidden:
+        raise TemplateCopyError(f"대상 팀에 매핑되지 않은 task_template_id: {sorted(hidden)}")
+    # 새 이름이 이미 있으면 전부 중단 (유니크 위반으로 트랜잭션이 깨지기 전에)
+    taken = session.execute(
+        select(WT.c.template_name)
+        .where(WT.c.template_name.in_([name_prefix + name for name, _ in sources.values()]))
+    ).scalars().all()
+    if taken:
+        raise TemplateCopyError(f"이미 있는 템플릿 이름: {sorted(taken)}")
+
+    # 1) 템플릿 행
+    created = session.execute(
+        insert(WT).from_select(
+            ["template_name", "description"],
+            select(literal(name_prefix) + WT.c.template_name, WT.c.description)
+            .where(WT.c.workflow_template_id.in_(wt_ids)),
+        ).returning(WT.c.workflow_template_id, WT.c.template_name)
+    ).all()
+    source_of_name = {name_prefix + name: source_id for source_id, (name, _) in sources.items()}
+    new_id = {source_of_name[name]: wt_id for wt_id, name in created}
+
+    # 원본 id → 새 id 대응표 (WITH id_map(src_id, dst_id) AS (VALUES …) — SQLite는 FROM 절 VALUES에 열 이름을 못 붙임)
+    id_map = values(column("src_id", Integer), column("dst_id", Integer), name="id_map").data(
+        list(new_id.items())
+    ).cte("id_map")
+
+    # 2) 정의: 원본 정의 × 대응표 (INSERT … SELECT)
+    session.execute(
+        insert(D).from_select(
+            ["workflow_template_id", "task_template_id", "depends_on_task_template_id"],
+            select(id_map.c.dst_id, D.c.task_template_id, D.c.depends_on_task_template_id)
+            .join(id_map, id_map.c.src_id == D.c.workflow_template_id),
+        )
+    )
+    definition_rows = _changes(session)
+
+    # 3) 팀 매핑
+    M = WorkflowtemplateTeamMapping.__table__
+    session.execute(
+        insert(M).from_select(
+            ["workflow_template_id", "team_id"],
+            select(id_map.c.dst_id, literal(int(target_team_id))),
+        )
+    )
+    mapping_rows = _changes(session)
+
+    return {
+        "templates": [
+            {
+                "source_id": src,
+                "workflow_template_id": new_id[src],
+                "template_name": name_prefix + sources[src][0],
+                "description": sources[src][1],
+            }
+            for src in wt_ids
+        ],
+        "rows": {
+            "workflow_templates": len(created),
+            "workflow_template_definitions": definition_rows,
+            "workflow_template_team_mappings": mapping_rows,
+        },
+    }
@@ -0,0 +1,238 @@
+# backend/template_search.py
+# -*- coding: utf-8 -*-
+"""
+업무/요청/워크플로우 템플릿 통합 검색 (SQLite FTS5 trigram)
+
+  python template_search.py rebuild    검색 인덱스를 원본 테이블에서 다시 채움
+"""
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from sqlalchemy import text, union_all, select, literal
+
+from orm_build import (
+    engine, request_session,
+    TaskTemplate, TaskTemplateTeamMapping,
+    RequestTemplate, RequestTemplateTeamMapping,
+    WorkflowTemplate, WorkflowtemplateTeamMapping,
+)
+from authz import current_principal
+from user_management import ALLOWED_POS, ALLOWED_RESP
+
+bp_search = Blueprint("search", __name__, url_prefix="/api/search")
+
+# ─────────────────────────────────────────────────────────────
+# 인덱스: template_search(template_name, description, category, kind)
+# - rowid = 원본 id * 4 + 종류 코드 → 트리거의 삭제/갱신이 rowid 조회 한 번
+# - trigram 토크나이저: 한글 부분 문자열 검색 가능 (3글자 이상)
+KINDS = {
+    # kind: (코드, 테이블, id 컬럼, category 식, 매핑 테이블)
+    "task": (1, "task_templates", "task_template_id", "category", "task_template_team_mappings"),
+    "request": (2, "request_templates", "request_template_id", "NULL", "request_template_team_mappings"),
+    "workflow": (3, "workflow_templates", "workflow_template_id", "NULL", "workflow_template_team_mappings"),
+}
+MAX_LIMIT = 50
+MIN_TRIGRAM = 3
+
+def _trigger_ddl(kind, code, table, id_col, category):
+    rowid = f"{{row}}.{id_col} * 4 + {code}"
+    insert = (
+        "INSERT INTO template_search(rowid, template_name, description, category, kind) "
+        f"VALUES ({rowid.format(row='new')}, new.template_name, new.description, "
+        f"{'new.' + category if category != 'NULL' else 'NULL'}, '{kind}');"
+    )
+    delete = f"DELETE FROM template_search WHERE rowid = {rowid.format(row='old')};"
+    watched = "template_name, description" + (f", {category}" if category != "NULL" else "")
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_au AFTER UPDATE OF {watched} ON {table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+def _source_counts(conn) -> int:
+    return sum(
+        conn.exec_driver_sql(f"SELECT count(*) FROM {table}").scalar()
+        for _, table, _, _, _ in KINDS.values()
+    )
+
+def rebuild(conn) -> int:
+    conn.exec_driver_sql("DELETE FROM template_search")
+    for kind, (code, table, id_col, category, _) in KINDS.items():
+        conn.exec_driver_sql(
+            "INSERT INTO template_search(rowid, template_name, description, category, kind) "
+            f"SELECT {id_col} * 4 + {code}, template_name, description, {category}, '{kind}' FROM {table}"
+        )
+    return conn.exec_driver_sql("SELECT count(*) FROM template_search").scalar()
+
+_fts_enabled = False
+
+def ensure_search_index() -> bool:
+    """FTS5 테이블/트리거 생성 (create_app에서 호출). FTS5가 없는 SQLite면 False → LIKE 검색"""
+    global _fts_enabled
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as conn:
+        try:
+            conn.exec_driver_sql(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS template_search USING fts5("
+                "template_name, description, category, kind UNINDEXED, tokenize='trigram')"
+            )
+        except Exception as e:
+            print(f"⚠️ FTS5 trigram 사용 불가, LIKE 검색으로 동작: {e}")
+            return False
+        for kind, (code, table, id_col, category, _) in KINDS.items():
+            for ddl in _trigger_ddl(kind, code, table, id_col, category):
+                conn.exec_driver_sql(ddl)
+        # 새로 만들었거나 (스키마 리셋 등으로) 어긋났으면 다시 채움
+        indexed = conn.exec_driver_sql("SELECT count(*) FROM template_search").scalar()
+        if indexed != _source_counts(conn):
+            print(f"🛠  템플릿 검색 인덱스 재구성: {rebuild(conn)}건")
+    _fts_enabled = True
+    return True
+
+# ─────────────────────────────────────────────────────────────
+def _fts_query(terms) -> str:
+    # 각 단어를 구문(phrase)으로 감싸 FTS 문법 문자(" * - : 등)를 무력화, 단어 간 AND
+    return " AND ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+def _visible(kinds) -> str:
+    # 종류는 rowid % 4로 판별 (kind 컬럼을 읽으면 행마다 본문 조회가 생김)
+    whens = []
+    for kind in kinds:
+        code, _, id_col, _, mapping = KINDS[kind]
+        whens.append(
+            f"WHEN {code} THEN EXISTS (SELECT 1 FROM {mapping} m "
+            f"WHERE m.{id_col} = s.rowid / 4 AND m.team_id = :team_id)"
+        )
+    return f"CASE s.rowid % 4 {' '.join(whens)} ELSE 0 END"
+
+def _search_fts(session, q, kinds, team_id, limit):
+    terms = q.split()
+    long_terms = [t for t in terms if len(t) >= MIN_TRIGRAM]
+    short_terms = [t for t in terms if len(t) < MIN_TRIGRAM]
+    if not long_terms:
+        # 짧은 단어뿐이면 (예: "입고 검사") 공백 포함 전체를 한 구문으로
+        long_terms, short_terms = [q], []
+    params = {"team_id": team_id, "match": _fts_query(long_terms), "limit": limit}
+    # 3글자 미만 단어는 trigram으로 찾을 수 없으므로 MATCH 결과 안에서 부분 문자열로 거름
+    extra = ""
+    for i, t in enumerate(short_terms):
+        params[f"s{i}"] = t
+        extra += (f" AND (instr(s.template_name, :s{i}) OR instr(coalesce(s.description, ''), :s{i})"
+                  f" OR instr(coalesce(s.category, ''), :s{i}))")
+    # 순위는 rowid/점수만으로 매기고, 본문 컬럼은 상위 limit건만 rowid로 다시 읽음
+    rows = session.execute(text(
+        "SELECT s.kind, r.id / 4, s.template_name, s.description, s.category, r.score "
+        "FROM (SELECT s.rowid AS id, bm25(template_search, 10.0, 1.0, 3.0) AS score "
+        "      FROM template_search s "
+        f"     WHERE template_search MATCH :match AND {_visible(kinds)}{extra} "
+        "      ORDER BY score LIMIT :limit) r "
+        "JOIN template_search s ON s.rowid = r.id "
+        "ORDER BY r.score"
+    ), params).all()
+    return [
+        {"kind": k, "id": i, "template_name": n, "description": d, "category": c, "score": round(-sc, 4)}
+        for k, i, n, d, c, sc in rows
+    ]
+
+def _team_templates(kinds, team_id, prefix=None):
+    """종류별 (kind, id, 이름, 설명, 분류) SELECT — 팀 매핑으로 한정, prefix면 이름 인덱스 범위 조건"""
+    specs = {
+        "task": (TaskTemplate, TaskTemplate.task_template_id, TaskTemplate.category,
+                 TaskTemplateTeamMapping, TaskTemplateTeamMapping.task_template_id),
+        "request": (RequestTemplate, RequestTemplate.request_template_id, None,
+                    RequestTemplateTeamMapping, RequestTemplateTeamMapping.request_template_id),
+        "workflow": (WorkflowTemplate, WorkflowTemplate.workflow_template_id, None,
+                     WorkflowtemplateTeamMapping, WorkflowtemplateTeamMapping.workflow_template_id),
+    }
+    for kind in kinds:
+        model, id_col, category, mapping, mapping_id = specs[kind]
+        stmt = (
+            select(
+                literal(kind).label("kind"), id_col.label("id"), model.template_name.label("template_name"),
+                model.description.label("description"),
+                (category if category is not None else literal(None)).label("category"),
+            )
+            .join(mapping, mapping_id == id_col)
+            .where(mapping.team_id == team_id)
+        )
+        if prefix:
+            stmt = stmt.where(model.template_name >= prefix, model.template_name < prefix + "\U0010ffff")
+        yield stmt
+
+def _search_union(session, kinds, team_id, limit, prefix=None, where=None):
+    u = union_all(*_team_templates(kinds, team_id, prefix)).subquery()
+    stmt = select(u)
+    if where is not None:
+        stmt = stmt.where(where(u.c))
+    rows = session.execute(stmt.order_by(u.c.template_name, u.c.kind, u.c.id).limit(limit)).all()
+    return [
+        {"kind": k, "id": i, "template_name": n, "description": d, "category": c, "score": None}
+        for k, i, n, d, c in rows
+    ]
+
+def _search_prefix(session, q, kinds, team_id, limit):
+    """이름 접두어 (타이핑 중 자동완성), 이름순"""
+    return _search_union(session, kinds, team_id, limit, prefix=q)
+
+def _search_like(session, q, kinds, team_id, limit):
+    """FTS5가 없는 환경용 (LIKE '%q%' 스캔)"""
+    pattern = f"%{q}%"
+    return _search_union(
+        session, kinds, team_id, limit,
+        where=lambda c: c.template_name.like(pattern) | c.description.like(pattern) | c.category.like(pattern),
+    )
+
+@bp_search.get("/templates")
+@jwt_required()
+def search_templates():
+    """
+    팀에 매핑된 템플릿 검색
+      ?q=<검색어>&kinds=task,request,workflow&mode=search|prefix&limit=20
+    mode=search(기본): 이름/설명/분류 부분 일치, 관련도순 (검색어가 3글자 미만이면 prefix로 동작)
+    mode=prefix: 이름 접두어 자동완성, 이름순
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"message": "q는 필수입니다"}), 400
+    mode = request.args.get("mode", "search")
+    if mode not in ("search", "prefix"):
+        return jsonify({"message": "mode는 search 또는 prefix"}), 400
+    limit = min(max(request.args.get("limit", 20, type=int) or 20, 1), MAX_LIMIT)
+
+    principal = current_principal()
+    if not principal or not principal.team_id:
+        return jsonify({"mode": mode, "results": []})
+
+    # 업무/워크플로우 템플릿 목록은 팀장·DT전문가 전용 → 검색도 같은 범위
+    is_admin = principal.position in ALLOWED_POS or bool(principal.responsibilities & ALLOWED_RESP)
+    allowed = set(KINDS) if is_admin else {"request"}
+    requested = {k.strip() for k in request.args.get("kinds", ",".join(KINDS)).split(",") if k.strip()}
+    unknown = requested - set(KINDS)
+    if unknown:
+        return jsonify({"message": f"알 수 없는 kinds: {sorted(unknown)}"}), 400
+    kinds = [k for k in KINDS if k in requested & allowed]
+    if not kinds:
+        return jsonify({"mode": mode, "results": []})
+
+    s = request_session()
+    if mode == "search" and len(q) < MIN_TRIGRAM:
+        mode = "prefix"
+    if mode == "prefix":
+        results = _search_prefix(s, q, kinds, principal.team_id, limit)
+    elif _fts_enabled:
+        results = _search_fts(s, q, kinds, principal.team_id, limit)
+    else:
+        results = _search_like(s, q, kinds, principal.team_id, limit)
+    return jsonify({"mode": mode, "results": results})
+
+
+if __name__ == "__main__":
+    import sys
+    if sys.argv[1:] != ["rebuild"]:
+        print(__doc__)
+        sys.exit(2)
+    if not ensure_search_index():
+        sys.exit("FTS5를 사용할 수 없습니다")
+    with engine.begin() as conn:
+        print(f"✅ 템플릿 검색 인덱스 재구성 완료: {rebuild(conn)}건")
@@ -0,0 +1,107 @@
+# backend/tests/conftest.py
+# -*- coding: utf-8 -*-
+"""
+pytest 공통 픽스처: 임시 SQLite DB에 최소 데이터(팀/팀장/팀원/업무·요청·워크플로우 템플릿)를 넣고 앱을 만듦
+
+  cd backend && python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+# config는 import 시점에 환경변수를 읽음 → 앱 모듈보다 먼저 설정
+_TMP = tempfile.mkdtemp(prefix="app-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'db.sqlite3')}"
+os.environ["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:1000"   # 테스트 속도용 (운영 기본값은 scrypt)
+os.environ["JOBS_WORKERS"] = "0"
+os.environ["SLOW_QUERY_MS"] = "0"
+os.environ["SLOW_QUERY_LOG"] = os.path.join(_TMP, "slow_queries.log")
+os.environ["NPLUSONE_MODE"] = "off"
+os.environ["JWT_SECRET"] = "test-jwt-secret-0123456789abcdef0123"  # HS256 권장 길이(32바이트) 이상
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+import orm_build as ob  # noqa: E402
+
+TEAM_ID = 1
+PASSWORD = "pw"
+
+
+def _seed():
+    ob.build_schema()
+    pw = generate_password_hash(PASSWORD, method=os.environ["PASSWORD_HASH_METHOD"])
+    with ob.get_session() as s:
+        team = ob.Team(team_id=TEAM_ID, team_name="QC")
+        s.add_all([team, ob.Team(team_id=2, team_name="Ops")])
+        s.flush()
+        s.add(ob.Responsibility(responsibility_name="DT_Expert", team_id=TEAM_ID))
+        s.add_all([
+            ob.User(user_id=1, user_name="lead", email="lead@x", position="팀장", hashed_password=pw, team_id=TEAM_ID),
+            ob.User(user_id=2, user_name="mem", email="mem@x", position="주임", hashed_password=pw, team_id=TEAM_ID),
+        ])
+        s.add_all([ob.User(user_id=10 + i, user_name=f"u{i}", email=f"u{i}@x", position="사원",
+                           hashed_password=pw, team_id=TEAM_ID) for i in range(8)])
+        tts = [ob.TaskTemplate(task_template_id=100 + i, template_name=f"업무{i}",
+                               category="HACCP" if i % 2 else "Q") for i in range(1, 7)]
+        s.add_all(tts)
+        s.flush()
+        team.task_templates.extend(tts)
+        s.add(ob.WorkflowTemplate(workflow_template_id=1, template_name="WF1"))
+        s.flush()
+        s.add(ob.WorkflowtemplateTeamMapping(workflow_template_id=1, team_id=TEAM_ID))
+        for task, upstream in [(101, None), (102, 101), (103, 101), (104, 102), (104, 103)]:
+            s.add(ob.WorkflowTemplateDefinition(workflow_template_id=1, task_template_id=task,
+                                                depends_on_task_template_id=upstream))
+        s.add(ob.RequestTemplate(request_template_id=1, template_name="REQ1"))
+        s.flush()
+        s.add(ob.RequestTemplateTeamMapping(request_template_id=1, team_id=TEAM_ID))
+
+
+@pytest.fixture(scope="session")
+def app():
+    _seed()
+    from app import create_app
+    app = create_app()
+    app.testing = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope="session")
+def lead_headers(app):
+    """팀장(user 1) 토큰"""
+    r = app.test_client().post("/api/auth/login", json={"email": "lead@x", "password": PASSWORD})
+    assert r.status_code == 200, r.data
+    return {"Authorization": "Bearer " + r.get_json()["token"]}
+
+
+@pytest.fixture
+def query_budget():
+    """
+    with query_budget(max_statements, endpoint=None, repeat=NPLUSONE_THRESHOLD): ...
+    블록 안 SQL이 max_statements개를 넘거나 같은 SQL이 repeat번을 넘게 반복되면 실패 (nplusone.track_queries)
+    """
+    from config import NPLUSONE_THRESHOLD
+    from nplusone import track_queries
+
+    @contextmanager
+    def budget(max_statements: int, endpoint: str = None, repeat: int = NPLUSONE_THRESHOLD):
+        with track_queries(endpoint, threshold=repeat) as tracker:
+            yield tracker
+        problems = tracker.report()
+        if tracker.total > max_statements:
+            problems.insert(0, f"SQL {tracker.total}개 (예산 {max_statements}개)"
+                               + (f" [{endpoint}]" if endpoint else ""))
+        if problems:
+            lines = "\n".join(f"  {n}× {' '.join(sql.split())[:160]}" for sql, n in tracker.statements.most_common())
+            pytest.fail("\n".join(problems) + "\n실행된 SQL:\n" + lines, pytrace=False)
+    return budget
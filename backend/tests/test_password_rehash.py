@@ -0,0 +1,38 @@
+# backend/tests/test_password_rehash.py
+# -*- coding: utf-8 -*-
+"""비밀번호 해시 방식 이전: 접두어 계산 / 로그인 후 백그라운드 재해싱"""
+import time
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+import orm_build as ob
+from conftest import PASSWORD, TEAM_ID
+from password_hasher import hasher, method_prefix
+
+
+@pytest.mark.parametrize("method", ["scrypt", "scrypt:16384:8:1", "pbkdf2", "pbkdf2:sha512", "pbkdf2:sha256:1000"])
+def test_method_prefix_matches_werkzeug(method):
+    assert method_prefix(method) == generate_password_hash("x", method=method).split("$", 1)[0]
+
+
+def test_login_rehashes_old_hash_in_background(client):
+    old = generate_password_hash(PASSWORD, method="pbkdf2:sha256:500")
+    with ob.get_session() as s:
+        s.add(ob.User(user_id=50, user_name="old", email="old@x", position="사원",
+                      hashed_password=old, team_id=TEAM_ID))
+    assert hasher.needs_rehash(old)
+
+    r = client.post("/api/auth/login", json={"email": "old@x", "password": PASSWORD})
+    assert r.status_code == 200, r.data
+
+    deadline = time.monotonic() + 5
+    while True:
+        with ob.get_session(readonly=True) as s:
+            stored = s.get(ob.User, 50).hashed_password
+        if stored != old or time.monotonic() > deadline:
+            break
+        time.sleep(0.01)
+    assert not hasher.needs_rehash(stored)
+    r = client.post("/api/auth/login", json={"email": "old@x", "password": PASSWORD})
+    assert r.status_code == 200, r.data
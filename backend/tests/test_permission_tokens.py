@@ -0,0 +1,47 @@
+# backend/tests/test_permission_tokens.py
+# -*- coding: utf-8 -*-
+"""책임 변경 후 토큰 재발급 / 낡은 토큰의 권한 주체 캐시 (authz)"""
+from flask_jwt_extended import decode_token
+
+import orm_build as ob
+from authz import bump_permission_version
+from conftest import PASSWORD
+
+JOBS = "/api/jobs"
+MY_RESPS = "/api/user-management/me/responsibilities"
+JOBS_ENDPOINT = "jobs.list_jobs"  # 모든 사용자가 쓰는 current_principal() 엔드포인트
+
+
+def _login(client, email):
+    r = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+    assert r.status_code == 200, r.data
+    return r.get_json()["token"]
+
+
+def test_responsibility_change_returns_fresh_token(app, client):
+    old = _login(client, "u0@x")
+    r = client.post(MY_RESPS, headers={"Authorization": "Bearer " + old}, json={"responsibility_id": 1})
+    assert r.status_code == 201, r.data
+    added = r.get_json()["token"]
+    with app.app_context():
+        assert decode_token(added)["resps"] == ["DT_Expert"]
+        assert decode_token(added)["pv"] == decode_token(old)["pv"] + 1
+
+    r = client.delete(f"{MY_RESPS}/1", headers={"Authorization": "Bearer " + added})
+    assert r.status_code == 200, r.data
+    removed = r.get_json()["token"]
+    with app.app_context():
+        assert decode_token(removed)["resps"] == []
+        assert decode_token(removed)["pv"] == decode_token(added)["pv"] + 1
+
+
+def test_stale_token_reuses_cached_principal(client, query_budget):
+    headers = {"Authorization": "Bearer " + _login(client, "u1@x")}
+    with ob.get_session() as s:
+        bump_permission_version(s, [11])   # 관리자가 책임표를 바꾼 경우와 같음 (토큰은 그대로)
+
+    # 첫 요청만 현재 권한을 다시 읽고, 같은 버전의 다음 요청은 캐시된 주체를 씀
+    with query_budget(100, endpoint=JOBS_ENDPOINT) as first:
+        assert client.get(JOBS, headers=headers).status_code == 200
+    with query_budget(first.total - 2, endpoint=JOBS_ENDPOINT):   # 사용자 + 책임 재조회(2회)가 빠짐
+        assert client.get(JOBS, headers=headers).status_code == 200
@@ -0,0 +1,59 @@
+# backend/tests/test_query_budget.py
+# -*- coding: utf-8 -*-
+"""query_budget 픽스처 / N+1 감지 (nplusone)"""
+import logging
+
+import pytest
+from flask import Response
+from sqlalchemy import select
+
+import nplusone
+import orm_build as ob
+from conftest import TEAM_ID
+
+MEMBERS = "/api/user-management/team-members"
+MEMBERS_ENDPOINT = "user_management.get_team_members"
+
+
+def test_team_members_within_budget(client, lead_headers, query_budget):
+    # 권한 버전 + 팀 revision(ETag) + 팀원 + 팀원별 책임(selectinload 1회)
+    with query_budget(4, endpoint=MEMBERS_ENDPOINT):
+        r = client.get(MEMBERS, headers=lead_headers)
+    assert r.status_code == 200
+
+
+def test_team_members_query_count_does_not_grow(client, lead_headers, query_budget):
+    with query_budget(4, endpoint=MEMBERS_ENDPOINT) as before:
+        client.get(MEMBERS, headers=lead_headers)
+    with ob.get_session() as s:
+        dt_expert = s.execute(
+            select(ob.Responsibility).where(ob.Responsibility.team_id == TEAM_ID)
+        ).scalars().first()
+        for i in range(10):
+            user = ob.User(user_name=f"budget{i}", email=f"budget{i}@x", position="사원",
+                           hashed_password="-", team_id=TEAM_ID)
+            user.responsibilities.append(dt_expert)
+            s.add(user)
+        s.execute(ob.Team.__table__.update().where(ob.Team.team_id == TEAM_ID)
+                  .values(revision=ob.Team.revision + 1))
+    with query_budget(before.total, endpoint=MEMBERS_ENDPOINT):
+        r = client.get(MEMBERS, headers=lead_headers)
+    assert len(r.get_json()) >= 20
+
+
+def test_query_budget_fails_on_lazy_load_loop(app, query_budget):
+    with pytest.raises(pytest.fail.Exception, match="lazy load User.responsibilities"):
+        with ob.get_session(readonly=True) as s, query_budget(100, repeat=1):
+            for user in s.execute(select(ob.User).where(ob.User.team_id == TEAM_ID)).scalars():
+                list(user.responsibilities)
+
+
+def test_warn_mode_logs_repeated_statements(app, caplog):
+    with app.test_request_context(MEMBERS), ob.get_session(readonly=True) as s:
+        nplusone._start()
+        for user in s.execute(select(ob.User).where(ob.User.team_id == TEAM_ID)).scalars():
+            list(user.responsibilities)
+        with caplog.at_level(logging.WARNING, logger="nplusone"):
+            response = nplusone._finish(Response())
+    assert int(response.headers["X-Query-Count"]) > nplusone.NPLUSONE_THRESHOLD
+    assert any("lazy load User.responsibilities" in rec.getMessage() for rec in caplog.records)
@@ -0,0 +1,107 @@
+# backend/tests/test_query_plans.py
+# -*- coding: utf-8 -*-
+"""
+실제 엔드포인트를 호출하면서 실행된 SQL을 커서 훅으로 모아 EXPLAIN QUERY PLAN → 허용되지 않은 풀스캔(SCAN)이 있으면 실패
+(query_plan_check.py는 손으로 옮겨 적은 쿼리, 여기서는 핸들러가 실제로 만든 SQL)
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from orm_build import Base, engine
+from query_plan_check import full_scans, table_aliases
+
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+@contextmanager
+def captured_sql():
+    """블록 안에서 실행된 (SQL, 파라미터) 목록"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(EXPLAINABLE):
+            # 진짜 executemany는 첫 행만 (insertmanyvalues는 평평한 tuple 1개)
+            if executemany and parameters and isinstance(parameters[0], (tuple, list, dict)):
+                parameters = parameters[0]
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+# 계획은 통계 없는 빈 스키마(메모리 DB)에서 — 테스트 데이터는 작아서 sqlite_stat1이 있으면 작은 테이블은
+# 원래 SCAN이 유리함. 통계가 없으면 플래너는 큰 테이블을 가정 (query_plan_check.run과 같은 조건)
+_planner = create_engine("sqlite://")
+Base.metadata.create_all(_planner)
+
+
+def plan_of(statement, parameters) -> list:
+    conn = _planner.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())
+        return [row[-1] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def scan_problems(statements, allowed=frozenset()) -> list:
+    problems = []
+    for sql, params in statements:
+        bad = full_scans(plan_of(sql, params), allowed, table_aliases(sql))
+        if bad:
+            problems.append(f"{'; '.join(bad)}  ← {' '.join(sql.split())[:200]}")
+    return problems
+
+
+# (method, url, json, 풀스캔을 허용할 테이블) — 쓰기 엔드포인트도 실제로 실행됨 (세션 DB에 누적)
+ENDPOINTS = [
+    ("get", "/api/auth/teams", None, {"teams"}),  # 회원가입 폼: 전체 팀 목록이 목적
+    ("get", "/api/user-management/me", None, set()),
+    ("get", "/api/user-management/team-members", None, set()),
+    ("get", "/api/user-management/team-members?limit=3", None, set()),
+    ("get", "/api/task-management/task-templates", None, set()),
+    ("get", "/api/task-management/task-templates?limit=2&category=HACCP", None, set()),
+    ("get", "/api/request-management/request-templates", None, set()),
+    ("get", "/api/workflow-management/workflow-templates", None, set()),
+    ("get", "/api/workflow-management/workflow-templates/1/definitions", None, set()),
+    ("get", "/api/workflow-management/workflow-templates/1/candidates", None, set()),
+    ("post", "/api/workflow-management/workflow-templates/copy",
+     {"workflow_template_ids": [1], "name_prefix": "[plan] "}, set()),
+    ("post", "/api/requests",
+     {"requests": [{"request_template_id": 1}, {"request_template_id": 1, "idempotency_key": "plan-1"}]}, set()),
+    ("post", "/api/workflow-management/workflows",
+     {"instances": [{"workflow_template_id": 1}, {"workflow_template_id": 1, "parameters": {"a": 1}}]}, set()),
+    ("get", "/api/tasks/ready", None, set()),
+    ("get", "/api/tasks/ready?scope=me", None, set()),
+    ("get", "/api/calendar/status?year=2026&month=1", None, set()),
+    ("get", "/api/jobs", None, set()),
+]
+
+
+@pytest.mark.parametrize("method, url, body, allowed", ENDPOINTS, ids=[f"{m.upper()} {u}" for m, u, _, _ in ENDPOINTS])
+def test_endpoint_has_no_full_scan(client, lead_headers, method, url, body, allowed):
+    with captured_sql() as statements:
+        r = getattr(client, method)(url, headers=lead_headers, json=body)
+    assert r.status_code < 400, r.data
+    assert statements, "SQL이 캡처되지 않음"
+    problems = scan_problems(statements, allowed)
+    assert not problems, "\n".join(problems)
+
+
+def test_complete_tasks_has_no_full_scan(client, lead_headers):
+    """READY Task 완료 → 후행 Task 전이/카운터/롤업 갱신 SQL"""
+    client.post("/api/workflow-management/workflows", headers=lead_headers,
+                json={"instances": [{"workflow_template_id": 1, "team_id": 1}]})
+    ready = client.get("/api/tasks/ready", headers=lead_headers).get_json()
+    assert ready
+    with captured_sql() as statements:
+        r = client.post("/api/tasks/complete", headers=lead_headers, json={"task_ids": [ready[0]["task_id"]]})
+    assert r.status_code == 200, r.data
+    problems = scan_problems(statements)
+    assert not problems, "\n".join(problems)
@@ -0,0 +1,40 @@
+# backend/tests/test_task_template_delete.py
+# -*- coding: utf-8 -*-
+"""업무 템플릿 삭제 → 이를 쓰던 워크플로우 템플릿의 revision / 컴파일 그래프 / 공유 팀 ETag"""
+import orm_build as ob
+from conftest import TEAM_ID
+from workflow_graph import get_compiled
+
+OTHER_TEAM = 2
+
+
+def _revisions(wt_id):
+    with ob.get_session(readonly=True) as s:
+        return s.get(ob.WorkflowTemplate, wt_id).revision, s.get(ob.Team, OTHER_TEAM).revision
+
+
+def test_delete_task_template_invalidates_workflow_graphs(client, lead_headers):
+    with ob.get_session() as s:
+        tt = ob.TaskTemplate(template_name="삭제 대상")
+        wt = ob.WorkflowTemplate(template_name="WF-del")
+        s.add_all([tt, wt])
+        s.flush()
+        tt_id, wt_id = tt.task_template_id, wt.workflow_template_id
+        s.add_all([
+            ob.TaskTemplateTeamMapping(task_template_id=tt_id, team_id=TEAM_ID),
+            ob.WorkflowtemplateTeamMapping(workflow_template_id=wt_id, team_id=TEAM_ID),
+            ob.WorkflowtemplateTeamMapping(workflow_template_id=wt_id, team_id=OTHER_TEAM),
+            ob.WorkflowTemplateDefinition(workflow_template_id=wt_id, task_template_id=105),
+            ob.WorkflowTemplateDefinition(workflow_template_id=wt_id, task_template_id=tt_id,
+                                          depends_on_task_template_id=105),
+        ])
+    with ob.get_session(readonly=True) as s:
+        assert tt_id in get_compiled(s, wt_id).nodes
+    wt_before, team_before = _revisions(wt_id)
+
+    r = client.delete(f"/api/task-management/task-templates/{tt_id}", headers=lead_headers)
+    assert r.status_code == 200, r.data
+
+    assert _revisions(wt_id) == (wt_before + 1, team_before + 1)
+    with ob.get_session(readonly=True) as s:
+        assert tt_id not in get_compiled(s, wt_id).nodes
@@ -0,0 +1,54 @@
+# backend/tests/test_template_copy.py
+# -*- coding: utf-8 -*-
+"""POST /workflow-templates/copy — 다른 팀으로 복사하는 권한 / 업무 템플릿 가시성"""
+from sqlalchemy import select
+
+import orm_build as ob
+
+COPY = "/api/workflow-management/workflow-templates/copy"
+OTHER_TEAM = 2
+
+
+def _revision(team_id):
+    with ob.get_session(readonly=True) as s:
+        return s.get(ob.Team, team_id).revision
+
+
+def test_copy_to_other_team_requires_admin_rights_there(client, lead_headers):
+    before = _revision(OTHER_TEAM)
+    r = client.post(COPY, headers=lead_headers,
+                    json={"workflow_template_ids": [1], "target_team_id": OTHER_TEAM, "name_prefix": "[x1] "})
+    assert r.status_code == 403, r.data
+    r = client.post(COPY, headers=lead_headers,
+                    json={"workflow_template_ids": [1], "target_team_id": 999, "name_prefix": "[x1] "})
+    assert r.status_code == 404, r.data
+    assert _revision(OTHER_TEAM) == before
+
+
+def test_copy_to_other_team_with_admin_rights(client, lead_headers):
+    # 팀장(user 1)에게 팀 2의 DT_Expert 책임 부여
+    with ob.get_session() as s:
+        resp = ob.Responsibility(responsibility_name="DT_Expert", team_id=OTHER_TEAM)
+        s.add(resp)
+        s.flush()
+        s.add(ob.UserResponsibility(user_id=1, responsibility_id=resp.responsibility_id))
+    body = {"workflow_template_ids": [1], "target_team_id": OTHER_TEAM, "name_prefix": "[x2] "}
+
+    # 정의가 쓰는 업무 템플릿(101~104)이 팀 2에 안 보이면 거부, 아무것도 만들지 않음
+    r = client.post(COPY, headers=lead_headers, json=body)
+    assert r.status_code == 409, r.data
+    assert "101" in r.get_json()["message"]
+
+    with ob.get_session() as s:
+        s.add_all([ob.TaskTemplateTeamMapping(task_template_id=tt, team_id=OTHER_TEAM) for tt in (101, 102, 103, 104)])
+    before = _revision(OTHER_TEAM)
+    r = client.post(COPY, headers=lead_headers, json=body)
+    assert r.status_code == 201, r.data
+    copied = r.get_json()["templates"][0]["workflow_template_id"]
+    with ob.get_session(readonly=True) as s:
+        teams = set(s.execute(
+            select(ob.WorkflowtemplateTeamMapping.team_id)
+            .where(ob.WorkflowtemplateTeamMapping.workflow_template_id == copied)
+        ).scalars())
+    assert teams == {OTHER_TEAM}
+    assert _revision(OTHER_TEAM) == before + 1
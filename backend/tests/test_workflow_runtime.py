@@ -0,0 +1,108 @@
+# backend/tests/test_workflow_runtime.py
+# -*- coding: utf-8 -*-
+"""
+집합 기반 런타임 경로: 워크플로우 인스턴스 생성 / Task 완료 전이 / 정의 일괄 교체 / 요청 재전송
+WF1 = 다이아몬드 101 → (102, 103) → 104
+"""
+from sqlalchemy import select
+
+import orm_build as ob
+
+WORKFLOWS = "/api/workflow-management/workflows"
+DEFINITIONS = "/api/workflow-management/workflow-templates/1/definitions"
+COMPLETE = "/api/tasks/complete"
+REQUESTS = "/api/requests"
+
+
+def _tasks(workflow_id) -> dict:
+    """{task_template_id: (task_id, status, remaining_upstream)}"""
+    with ob.get_session(readonly=True) as s:
+        return {tt: (task_id, status, remaining) for task_id, tt, status, remaining in s.execute(
+            select(ob.Task.task_id, ob.Task.task_template_id, ob.Task.status, ob.Task.remaining_upstream)
+            .where(ob.Task.workflow_id == workflow_id)
+        )}
+
+
+def _instantiate_diamond(client, headers) -> int:
+    r = client.post(WORKFLOWS, headers=headers, json={"instances": [{"workflow_template_id": 1}]})
+    assert r.status_code == 201, r.data
+    body = r.get_json()
+    assert (body["tasks"], body["dependencies"]) == (4, 4)
+    return body["workflow_ids"][0]
+
+
+def test_instantiate_diamond(client, lead_headers):
+    workflow_id = _instantiate_diamond(client, lead_headers)
+    tasks = _tasks(workflow_id)
+    assert sorted(tasks) == [101, 102, 103, 104]
+    assert {tt for tt, (_, status, _) in tasks.items() if status == "READY"} == {101}
+    assert {tt: remaining for tt, (_, _, remaining) in tasks.items()} == {101: 0, 102: 1, 103: 1, 104: 2}
+    with ob.get_session(readonly=True) as s:
+        edges = set(s.execute(
+            select(ob.TaskDependency.upstream_task_id, ob.TaskDependency.downstream_task_id)
+            .where(ob.TaskDependency.downstream_task_id.in_([task_id for task_id, _, _ in tasks.values()]))
+        ).all())
+    tid = {tt: task_id for tt, (task_id, _, _) in tasks.items()}
+    assert edges == {(tid[101], tid[102]), (tid[101], tid[103]), (tid[102], tid[104]), (tid[103], tid[104])}
+
+
+def test_completion_decrements_counters_and_promotes(client, lead_headers):
+    workflow_id = _instantiate_diamond(client, lead_headers)
+    tid = {tt: task_id for tt, (task_id, _, _) in _tasks(workflow_id).items()}
+
+    # 아직 READY가 아닌 Task는 완료되지 않음
+    r = client.post(COMPLETE, headers=lead_headers, json={"task_ids": [tid[104]]})
+    assert r.get_json() == {"completed": [], "ready": []}
+
+    r = client.post(COMPLETE, headers=lead_headers, json={"task_ids": [tid[101]]})
+    assert r.get_json() == {"completed": [tid[101]], "ready": sorted([tid[102], tid[103]])}
+
+    r = client.post(COMPLETE, headers=lead_headers, json={"task_ids": [tid[102]]})
+    assert r.get_json()["ready"] == []
+    assert _tasks(workflow_id)[104][1:] == ("PENDING", 1)
+
+    r = client.post(COMPLETE, headers=lead_headers, json={"task_ids": [tid[103]]})
+    assert r.get_json()["ready"] == [tid[104]]
+    assert _tasks(workflow_id)[104][1:] == ("READY", 0)
+
+    client.post(COMPLETE, headers=lead_headers, json={"task_ids": [tid[104]]})
+    with ob.get_session(readonly=True) as s:
+        workflow = s.get(ob.Workflow, workflow_id)
+        assert (workflow.task_total, workflow.task_active, workflow.task_done) == (4, 0, 4)
+        assert workflow.status == "COMPLETED"
+
+
+def test_replace_definitions_rejects_cycle(client, lead_headers):
+    def current():
+        with ob.get_session(readonly=True) as s:
+            return sorted(s.execute(
+                select(ob.WorkflowTemplateDefinition.task_template_id,
+                       ob.WorkflowTemplateDefinition.depends_on_task_template_id)
+                .where(ob.WorkflowTemplateDefinition.workflow_template_id == 1)
+            ).all(), key=repr), s.get(ob.WorkflowTemplate, 1).revision
+
+    before = current()
+    # 104 → 101 역방향 엣지를 더하면 101 → 102 → 104 → 101 순환
+    cyclic = [{"task_template_id": t, "depends_on_task_template_id": d}
+              for t, d in [(101, None), (102, 101), (103, 101), (104, 102), (104, 103), (101, 104)]]
+    r = client.put(DEFINITIONS, headers=lead_headers, json={"definitions": cyclic})
+    assert r.status_code == 400, r.data
+    assert current() == before
+
+
+def test_request_replay_returns_same_request(client, lead_headers):
+    item = {"request_template_id": 1, "idempotency_key": "runtime-replay-1"}
+    r = client.post(REQUESTS, headers=lead_headers, json=item)
+    assert r.status_code == 201, r.data
+    first = r.get_json()["requests"][0]
+    assert first["created"] is True
+
+    r = client.post(REQUESTS, headers=lead_headers, json=item)
+    assert r.status_code == 200, r.data
+    replay = r.get_json()
+    assert replay["requests"] == [{**first, "created": False}]
+    assert (replay["created"], replay["replayed"], replay["fulfillments"]) == (0, 1, 0)
+    with ob.get_session(readonly=True) as s:
+        assert len(s.execute(
+            select(ob.Request.request_id).where(ob.Request.idempotency_key == "runtime-replay-1")
+        ).all()) == 1
@@ -4,12 +4,16 @@ from functools import wraps
 from typing import Any
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select, insert, delete, tuple_
 from sqlalchemy.orm import selectinload, joinedload
-import time
 
-from orm_build import get_session, User, Team, Responsibility, UserResponsibility
+from orm_build import request_session, User, Team, Responsibility, UserResponsibility
+from authz import Principal, current_principal, bump_permission_version, issue_access_token
+from team_revision import team_etag, touch_teams, bump_after_write
+from listing import list_params, apply_listing, paginate, sparse, listing_response
 
 bp_user_management = Blueprint("user_management", __name__, url_prefix="/api/user-management")
+bp_user_management.after_request(bump_after_write)  # 쓰기 성공 시 팀 revision +1
 
 # ─────────────────────────────────────────────────────────────
 # 권한 가드: DT_Expert OR 팀장만 통과
@@ -32,16 +36,17 @@ def _serialize_user(user: User) -> dict:
     }
 
 def require_team_lead(fn):
-    """팀장만 접근을 허용하는 데코레이터"""
+    """팀장만 접근을 허용하는 데코레이터 (토큰 권한 클레임으로 판정)"""
     @wraps(fn)
     @jwt_required()
     def wrapper(*args, **kwargs):
-        uid = int(get_jwt_identity())
-        with get_session() as s:
-            user = s.get(User, uid)
-            if not user or user.position != "팀장":
-                return jsonify({"message": "팀장만 접근할 수 있는 기능입니다."}), 403
-        return fn(user, *args, **kwargs) # user 객체를 다음 함수로 전달
+        try:
+            principal = current_principal()
+        except (ValueError, TypeError):
+            return jsonify({"message": "잘못된 토큰 식별자"}), 401
+        if not principal or principal.position != "팀장":
+            return jsonify({"message": "팀장만 접근할 수 있는 기능입니다."}), 403
+        return fn(principal, *args, **kwargs) # principal을 다음 함수로 전달
     return wrapper
 
 
@@ -50,28 +55,20 @@ def require_db_admin(fn):
     @wraps(fn)
     @jwt_required()
     def wrapper(*args, **kwargs):
-        # 토큰 → user_id 획득
+        # 토큰 → 권한 주체 (클레임이 최신이면 DB 조회 없음)
         try:
-            uid = int(get_jwt_identity())
+            principal = current_principal()
         except (ValueError, TypeError):
             return jsonify({"message": "잘못된 토큰 식별자"}), 401
+        if not principal:
+            return jsonify({"message": "유저 없음"}), 404
 
         # 권한 확인 (책임/직위)
-        with get_session() as s:
-            user = (
-                s.query(User)
-                .options(selectinload(User.responsibilities))
-                .get(uid)
-            )
-            if not user:
-                return jsonify({"message": "유저 없음"}), 404
-
-            pos_ok = (user.position or "").strip() in ALLOWED_POS
-            resp_ok = any((r.responsibility_name or "").strip() in ALLOWED_RESP
-                          for r in user.responsibilities)
-
-            if not (pos_ok or resp_ok):
-                return jsonify({"message": "접근 권한이 없습니다 (DT_Expert 또는 팀장 전용)"}), 403
+        pos_ok = principal.position in ALLOWED_POS
+        resp_ok = bool(principal.responsibilities & ALLOWED_RESP)
+
+        if not (pos_ok or resp_ok):
+            return jsonify({"message": "접근 권한이 없습니다 (DT_Expert 또는 팀장 전용)"}), 403
 
         # 권한 통과 시 실제 핸들러 실행
         return fn(*args, **kwargs)
@@ -83,19 +80,19 @@ def require_db_admin(fn):
 @jwt_required()
 def me_get():
     uid = int(get_jwt_identity())
-    with get_session() as s:
-        me = (
-            s.query(User)
-            .options(
-                joinedload(User.team),
-                selectinload(User.responsibilities)  # ← N+1 방지용 eager-load
-            )
-            .filter(User.user_id == uid)
-            .first()
+    s = request_session()
+    me = (
+        s.query(User)
+        .options(
+            joinedload(User.team),
+            selectinload(User.responsibilities)  # ← N+1 방지용 eager-load
         )
-        if not me:
-            return jsonify({"message": "유저를 찾을 수 없습니다"}), 404
-        return jsonify(_serialize_user(me)), 200
+        .filter(User.user_id == uid)
+        .first()
+    )
+    if not me:
+        return jsonify({"message": "유저를 찾을 수 없습니다"}), 404
+    return jsonify(_serialize_user(me)), 200
 # ─────────────────────────────────────────────────────────────
 # 내 정보 수정
 @bp_user_management.route("/me", methods=["PUT"])
@@ -122,111 +119,226 @@ def me_update():
         except (ValueError, TypeError):
             return jsonify({"message": "team_id 형식이 올바르지 않습니다"}), 400
 
-    with get_session() as s:
-        user = s.get(User, uid)
-        if not user:
-            return jsonify({"message": "유저 없음"}), 404
+    s = request_session()
+    user = s.get(User, uid)
+    if not user:
+        return jsonify({"message": "유저 없음"}), 404
 
-        # 이메일 중복 체크 (자기 자신 제외)
-        if email != user.email:
-            exists = (
-                s.query(User)
-                .filter(User.email == email, User.user_id != uid)
-                .first()
-            )
-            if exists:
-                return jsonify({"message": "이미 사용 중인 이메일입니다"}), 409
-
-        # 기본 정보 업데이트
-        user.user_name = name
-        user.email = email
-        user.position = position
-
-        # 팀 매핑 업데이트 (옵션)
-        if team_id is not None:
-            new_team = s.get(Team, team_id)
-            if not new_team:
-                return jsonify({"message": "존재하지 않는 team_id"}), 400
-            user.team = new_team  # 직접 관계 할당
-        
-        response_data = _serialize_user(user)
-        response_data["message"] = "저장되었습니다"
-        return jsonify(response_data), 200
+    # 이메일 중복 체크 (자기 자신 제외)
+    if email != user.email:
+        exists = (
+            s.query(User)
+            .filter(User.email == email, User.user_id != uid)
+            .first()
+        )
+        if exists:
+            return jsonify({"message": "이미 사용 중인 이메일입니다"}), 409
+
+    # 직위/팀이 바뀌면 기존 토큰의 권한 클레임 무효화 (응답으로 새 토큰 발급)
+    claims_changed = position != user.position or (team_id is not None and team_id != user.team_id)
+    if claims_changed:
+        bump_permission_version(s, [uid])
+
+    # 기본 정보 업데이트
+    user.user_name = name
+    user.email = email
+    user.position = position
+
+    # 팀 매핑 업데이트 (옵션)
+    if team_id is not None:
+        new_team = s.get(Team, team_id)
+        if not new_team:
+            return jsonify({"message": "존재하지 않는 team_id"}), 400
+        touch_teams(user.team_id, new_team.team_id)  # 떠나는 팀/들어가는 팀 팀원 목록
+        user.team = new_team  # 직접 관계 할당
+
+    response_data = _serialize_user(user)
+    response_data["message"] = "저장되었습니다"
+    if claims_changed:
+        response_data["token"] = _reissue_token(s, user)
+    return jsonify(response_data), 200
+
+def _reissue_token(s, user: User) -> str:
+    """권한 클레임이 바뀐 본인에게 새 토큰 (옛 토큰의 pv는 다시 맞지 않음 → 매 요청 재조회 대신)"""
+    s.flush()
+    s.refresh(user, ["perm_version"])
+    return issue_access_token(user)
 
 # ─────────────────────────────────────────────────────────────
 # DT 전문가 선임 (팀장 전용)
 @bp_user_management.get("/team-members")
 @require_team_lead
-def get_team_members(current_user: User):
-    """현재 로그인한 팀장의 팀원 목록과 DT 전문가 여부를 반환"""
-    with get_session() as s:
-        # current_user가 detached 상태일 수 있으므로 세션에 다시 attach
-        s.add(current_user)
-        if not current_user.team_id:
-            return jsonify([]), 200
-
-        team_members = s.query(User).filter(User.team_id == current_user.team_id).options(selectinload(User.responsibilities)).order_by(User.user_name).all()
-        
-        data = []
-        for member in team_members:
-            # is_dt_expert = any(r.responsibility_name == "DT_Expert" for r in member.responsibilities)
-            data.append({
-                "user_id": member.user_id,
-                "name": member.user_name,
-                "position": member.position,
-                "email": member.email,
-                "is_dt_expert": any(r.responsibility_name == "DT_Expert" for r in member.responsibilities),
-                "responsibilities": [
-                    {"id": r.responsibility_id, "name": r.responsibility_name}
-                    for r in member.responsibilities
-                ]
-            })
-        return jsonify(data), 200
+@team_etag
+def get_team_members(principal: Principal):
+    """현재 로그인한 팀장의 팀원 목록과 DT 전문가 여부 (이름순, keyset 페이지네이션 / q·fields 필터)"""
+    params = list_params()
+    if not principal.team_id:
+        return jsonify([]), 200
+    s = request_session()
+    stmt = apply_listing(
+        select(User).where(User.team_id == principal.team_id),  # ix_users_team_name (+rowid) 순서 그대로
+        params, User.user_name, User.user_id,
+    )
+    # 책임 정보를 요청하지 않으면 selectin 조회 생략
+    need_resps = params.wants("responsibilities") or params.wants("is_dt_expert")
+    if need_resps:
+        stmt = stmt.options(selectinload(User.responsibilities))
+    team_members, next_cursor = paginate(
+        s.execute(stmt).scalars().all(), params, lambda u: (u.user_name, u.user_id)
+    )
+
+    data = []
+    for member in team_members:
+        item = {
+            "user_id": member.user_id,
+            "name": member.user_name,
+            "position": member.position,
+            "email": member.email,
+        }
+        if need_resps:
+            item["is_dt_expert"] = any(r.responsibility_name == "DT_Expert" for r in member.responsibilities)
+            item["responsibilities"] = [
+                {"id": r.responsibility_id, "name": r.responsibility_name}
+                for r in member.responsibilities
+            ]
+        data.append(sparse(item, params, keep=("user_id",)))
+    return listing_response(data, next_cursor)
+
+# ─────────────────────────────────────────────────────────────
+# 팀원 × 책임 매트릭스 일괄 반영 (집합 연산: 현재 상태 조회 1회 + DELETE 1회 + INSERT 1회)
+class MatrixError(ValueError):
+    pass
+
+def apply_responsibility_matrix(session, team_id: int, assignments, scope=None) -> list:
+    """
+    assignments: [{"user_id": int, "responsibility_ids": [int, ...]}, ...]
+      → 각 팀원이 (scope 안에서) 가져야 할 책임 집합. 목록에 없는 팀원은 그대로
+    scope: 관리 대상 책임 id (None = 팀의 모든 책임). 다른 팀 책임은 건드리지 않음
+    반환: 책임이 바뀐 user_id 목록
+    """
+    member_ids = set(session.execute(
+        select(User.user_id).where(User.team_id == team_id)
+    ).scalars())
+    team_resp_ids = set(session.execute(
+        select(Responsibility.responsibility_id).where(Responsibility.team_id == team_id)
+    ).scalars())
+    scope = team_resp_ids if scope is None else set(scope)
+    if not scope <= team_resp_ids:
+        raise MatrixError(f"팀에 없는 책임: {sorted(scope - team_resp_ids)}")
+
+    desired = {}
+    for row in assignments:
+        try:
+            uid = int(row["user_id"])
+            rids = {int(r) for r in row.get("responsibility_ids") or []}
+        except (KeyError, TypeError, ValueError):
+            raise MatrixError("assignments 항목 형식: {user_id, responsibility_ids: [...]}")
+        if uid not in member_ids:
+            raise MatrixError(f"팀원이 아닌 user_id: {uid}")
+        if not rids <= scope:
+            raise MatrixError(f"user {uid}: 관리 대상이 아닌 책임 {sorted(rids - scope)}")
+        desired[uid] = rids
+    if not desired:
+        return []
+
+    UR = UserResponsibility
+    current = {}
+    for uid, rid in session.execute(
+        select(UR.user_id, UR.responsibility_id)
+        .where(UR.user_id.in_(list(desired)), UR.responsibility_id.in_(list(scope)))
+    ):
+        current.setdefault(uid, set()).add(rid)
+
+    to_delete = [(uid, rid) for uid, rids in desired.items() for rid in current.get(uid, set()) - rids]
+    to_insert = [
+        {"user_id": uid, "responsibility_id": rid}
+        for uid, rids in desired.items() for rid in rids - current.get(uid, set())
+    ]
+    if to_delete:
+        session.execute(delete(UR).where(tuple_(UR.user_id, UR.responsibility_id).in_(to_delete)))
+    if to_insert:
+        session.execute(insert(UR).values(to_insert))
+    # ORM 컬렉션(User.responsibilities)이 이미 로드돼 있으면 낡은 값이므로 만료
+    session.expire_all()
+
+    changed = sorted({uid for uid, _ in to_delete} | {row["user_id"] for row in to_insert})
+    bump_permission_version(session, changed)
+    return changed
+
+def _team_roster(session, team_id: int) -> list:
+    """팀원 목록 + 책임 (쿼리 2회: 팀원, 책임 selectin)"""
+    members = session.execute(
+        select(User)
+        .where(User.team_id == team_id)
+        .options(selectinload(User.responsibilities))
+        .order_by(User.user_name, User.user_id)
+    ).scalars().all()
+    return [{
+        "user_id": m.user_id,
+        "name": m.user_name,
+        "position": m.position,
+        "email": m.email,
+        "is_dt_expert": any(r.responsibility_name == "DT_Expert" for r in m.responsibilities),
+        "responsibilities": [
+            {"id": r.responsibility_id, "name": r.responsibility_name}
+            for r in m.responsibilities
+        ],
+    } for m in members]
+
+@bp_user_management.put("/team-members/responsibilities")
+@require_team_lead
+def update_responsibility_matrix(principal: Principal):
+    """
+    팀원 × 책임 매트릭스 일괄 저장 (팀장 전용)
+    body: {"assignments": [{"user_id", "responsibility_ids": [...]}, ...], "scope": [책임 id, ...] (선택)}
+    반환: 반영 후 팀원 목록 (같은 트랜잭션에서 조회)
+    """
+    if not principal.team_id:
+        return jsonify({"message": "팀이 지정되지 않았습니다."}), 400
+    data = request.get_json(silent=True) or {}
+    s = request_session()
+    try:
+        changed = apply_responsibility_matrix(s, principal.team_id, data.get("assignments") or [], data.get("scope"))
+    except MatrixError as e:
+        return jsonify({"message": str(e)}), 400
+    return jsonify({"changed": changed, "members": _team_roster(s, principal.team_id)}), 200
 
 @bp_user_management.put("/team-members/dt-expert-status")
 @require_team_lead
-def update_dt_expert_status(current_user: User):
+def update_dt_expert_status(principal: Principal):
     """팀원들의 DT 전문가 역할을 업데이트하고, 결과를 즉시 반환"""
-    updates = request.get_json().get("updates", [])
-    with get_session() as s:
-        s.add(current_user)
-        dt_expert_responsibility = s.query(Responsibility).filter_by(team_id=current_user.team_id, responsibility_name="DT_Expert").first()
-        if not dt_expert_responsibility:
-            return jsonify({"message": "해당 팀의 DT_Expert 역할이 정의되지 않았습니다."}), 400
-
-        for update in updates:
-            user_id = update.get("user_id")
-            is_dt_expert = update.get("is_dt_expert")
-            
-            member = s.query(User).filter_by(user_id=user_id, team_id=current_user.team_id).options(selectinload(User.responsibilities)).first()
-            if not member: continue
-
-            has_resp = any(r.responsibility_id == dt_expert_responsibility.responsibility_id for r in member.responsibilities)
-
-            if is_dt_expert and not has_resp:
-                member.responsibilities.append(dt_expert_responsibility)
-            elif not is_dt_expert and has_resp:
-                member.responsibilities.remove(dt_expert_responsibility)
-        
-        # ✅ 1. 변경사항을 DB에 최종 커밋
-        s.commit()
-
-        # ✅ 2. 커밋 직후, 동일 세션에서 최신 팀원 목록을 다시 조회
-        team_members = s.query(User).filter(User.team_id == current_user.team_id).options(selectinload(User.responsibilities)).order_by(User.user_name).all()
-        
-        updated_data = []
-        for member in team_members:
-            is_dt_expert = any(r.responsibility_name == "DT_Expert" for r in member.responsibilities)
-            updated_data.append({
-                "user_id": member.user_id,
-                "name": member.user_name,
-                "position": member.position,
-                "email": member.email,
-                "is_dt_expert": is_dt_expert
-            })
-        
-        # ✅ 3. 성공 메시지 대신, 조회된 최신 데이터를 반환
-        return jsonify(updated_data), 200
+    updates = (request.get_json(silent=True) or {}).get("updates", [])
+    s = request_session()
+    dt_expert_id = s.execute(
+        select(Responsibility.responsibility_id)
+        .where(Responsibility.team_id == principal.team_id, Responsibility.responsibility_name == "DT_Expert")
+    ).scalar_one_or_none()
+    if dt_expert_id is None:
+        return jsonify({"message": "해당 팀의 DT_Expert 역할이 정의되지 않았습니다."}), 400
+
+    # user_id는 "12"처럼 문자열로 와도 정수로 (변환 불가면 400)
+    try:
+        updates = [(int(u["user_id"]), bool(u.get("is_dt_expert"))) for u in updates]
+    except (TypeError, ValueError, KeyError, AttributeError):
+        return jsonify({"message": "updates는 정수 user_id를 가진 항목의 목록이어야 합니다."}), 400
+
+    # DT_Expert 한 열만 관리하는 매트릭스로 변환 (팀원이 아닌 user_id는 기존처럼 무시)
+    member_ids = set(s.execute(select(User.user_id).where(User.team_id == principal.team_id)).scalars())
+    assignments = [
+        {"user_id": user_id, "responsibility_ids": [dt_expert_id] if is_dt_expert else []}
+        for user_id, is_dt_expert in updates
+        if user_id in member_ids
+    ]
+    try:
+        apply_responsibility_matrix(s, principal.team_id, assignments, scope=[dt_expert_id])
+    except MatrixError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # 반영 후 팀원 목록 (기존 응답 형태 유지)
+    return jsonify([
+        {k: m[k] for k in ("user_id", "name", "position", "email", "is_dt_expert")}
+        for m in _team_roster(s, principal.team_id)
+    ]), 200
 
 # ─────────────────────────────────────────────
 # user_management.py (추가)
@@ -238,60 +350,62 @@ def me_add_responsibility():
     rid = payload.get("responsibility_id")
     if not rid:
         return jsonify({"message": "responsibility_id is required"}), 400
-    with get_session() as s:
-        me = s.query(User).options(selectinload(User.responsibilities)).get(uid)
-        resp = s.query(Responsibility).get(rid)
-        if not me or not resp:
-            return jsonify({"message":"not found"}), 404
-        if resp in me.responsibilities:
-            return jsonify({"message":"already assigned"}), 409
-        # (선택) 같은 팀 제한 원하면 다음 줄 체크
-        # if me.team_id and resp.team_id != me.team_id: return jsonify({"message":"forbidden"}), 403
-        me.responsibilities.append(resp)
-        return jsonify({"message":"ok"}), 201
+    s = request_session()
+    me = s.query(User).options(selectinload(User.responsibilities)).get(uid)
+    resp = s.query(Responsibility).get(rid)
+    if not me or not resp:
+        return jsonify({"message":"not found"}), 404
+    if resp in me.responsibilities:
+        return jsonify({"message":"already assigned"}), 409
+    # (선택) 같은 팀 제한 원하면 다음 줄 체크
+    # if me.team_id and resp.team_id != me.team_id: return jsonify({"message":"forbidden"}), 403
+    me.responsibilities.append(resp)
+    bump_permission_version(s, [uid])
+    return jsonify({"message":"ok", "token": _reissue_token(s, me)}), 201
 
 @bp_user_management.delete("/me/responsibilities/<int:responsibility_id>")
 @jwt_required()
 def me_remove_responsibility(responsibility_id: int):
     uid = int(get_jwt_identity())
-    with get_session() as s:
-        me = s.query(User).options(selectinload(User.responsibilities)).get(uid)
-        if not me:
-            return jsonify({"message":"not found"}), 404
-        target = next((r for r in me.responsibilities if r.responsibility_id == responsibility_id), None)
-        if not target:
-            return jsonify({"message":"not assigned"}), 404
-        me.responsibilities.remove(target)
-        return ("", 204)
-
-    
+    s = request_session()
+    me = s.query(User).options(selectinload(User.responsibilities)).get(uid)
+    if not me:
+        return jsonify({"message":"not found"}), 404
+    target = next((r for r in me.responsibilities if r.responsibility_id == responsibility_id), None)
+    if not target:
+        return jsonify({"message":"not assigned"}), 404
+    me.responsibilities.remove(target)
+    bump_permission_version(s, [uid])
+    return jsonify({"message":"ok", "token": _reissue_token(s, me)}), 200
+
+
 
 @bp_user_management.get("/team-responsibilities")
 @jwt_required()
 def team_responsibility_list():
     """현재 로그인한 사용자의 팀에 속한 책임(responsibilities) 목록 반환"""
     uid = int(get_jwt_identity())
-    with get_session() as s:
-        me = (
-            s.query(User)
-            .options(joinedload(User.team))
-            .filter(User.user_id == uid)
-            .first()
-        )
-        if not me:
-            return jsonify({"message": "유저를 찾을 수 없습니다"}), 404
-
-        if not me.team_id:
-            # 팀 미지정이면 빈 배열
-            return jsonify([]), 200
-
-        rows = (
-            s.query(Responsibility.responsibility_id, Responsibility.responsibility_name)
-            .filter(Responsibility.team_id == me.team_id)
-            .order_by(Responsibility.responsibility_name.asc())
-            .all()
-        )
-        return jsonify([
-            {"responsibility_id": rid, "name": rname}
-            for rid, rname in rows
-        ]), 200
\ No newline at end of file
+    s = request_session()
+    me = (
+        s.query(User)
+        .options(joinedload(User.team))
+        .filter(User.user_id == uid)
+        .first()
+    )
+    if not me:
+        return jsonify({"message": "유저를 찾을 수 없습니다"}), 404
+
+    if not me.team_id:
+        # 팀 미지정이면 빈 배열
+        return jsonify([]), 200
+
+    rows = (
+        s.query(Responsibility.responsibility_id, Responsibility.responsibility_name)
+        .filter(Responsibility.team_id == me.team_id)
+        .order_by(Responsibility.responsibility_name.asc())
+        .all()
+    )
+    return jsonify([
+        {"responsibility_id": rid, "name": rname}
+        for rid, rname in rows
+    ]), 200
\ No newline at end of file
@@ -0,0 +1,191 @@
+# backend/workflow_engine.py
+# -*- coding: utf-8 -*-
+import json
+
+from sqlalchemy import select, insert, update, union, literal, bindparam, func
+from sqlalchemy.orm import aliased
+
+from orm_build import (
+    Workflow, Task, TaskDependency, RequestFulfillment,
+    WorkflowTemplate, WorkflowTemplateDefinition,
+)
+from workflow_graph import get_compiled, CycleError
+from calendark import invalidate_calendar
+from rollup import record_created
+from progress import recount
+from events import publish
+
+# ─────────────────────────────────────────────────────────────
+# WorkflowTemplate → Workflow / Task / TaskDependency 일괄 생성
+# - 노드 = 템플릿 정의에 등장하는 task_template_id (워크플로우당 1개 Task)
+# - 엣지 = (depends_on_task_template_id → task_template_id)
+# - 인스턴스 수와 무관하게 INSERT 3회 + UPDATE 2회 + 롤업 UPSERT 1회 + 상태 카운터 UPDATE 2회
+#   (+ 팀 지정/fulfillment 연결 executemany)
+# - Task.team_id는 fulfillment의 담당 팀 (없으면 instance의 team_id)
+
+class InstantiationError(ValueError):
+    pass
+
+def _payload_key(template_id, parameters) -> str:
+    return json.dumps([template_id, parameters], sort_keys=True, ensure_ascii=False)
+
+
+def instantiate_workflows(session, instances):
+    """
+    instances: [{"workflow_template_id": int, "fulfillment_id": int|None,
+                 "team_id": int|None, "parameters": dict|None}, ...]
+    반환: {"workflow_ids": [...입력 순서...], "tasks": n, "dependencies": m}
+    호출자의 트랜잭션 안에서 실행 (커밋은 호출자 몫)
+    """
+    if not instances:
+        return {"workflow_ids": [], "tasks": 0, "dependencies": 0}
+
+    wt_ids = {int(i["workflow_template_id"]) for i in instances}
+    found = set(session.execute(
+        select(WorkflowTemplate.workflow_template_id)
+        .where(WorkflowTemplate.workflow_template_id.in_(wt_ids))
+    ).scalars())
+    if found != wt_ids:
+        raise InstantiationError(f"존재하지 않는 workflow_template_id: {sorted(wt_ids - found)}")
+    # 순환이 있는 (과거) 템플릿은 실행 불가 — 컴파일 결과는 캐시됨
+    for wt_id in wt_ids:
+        try:
+            get_compiled(session, wt_id)
+        except CycleError as e:
+            raise InstantiationError(f"workflow_template {wt_id}: {e}")
+
+    fulfillment_ids = [int(i["fulfillment_id"]) for i in instances if i.get("fulfillment_id") is not None]
+    if len(fulfillment_ids) != len(set(fulfillment_ids)):
+        raise InstantiationError("같은 fulfillment_id가 중복되었습니다")
+    fulfillment_team = {}
+    if fulfillment_ids:
+        rows = session.execute(
+            select(
+                RequestFulfillment.fulfillment_id,
+                RequestFulfillment.assigned_team_id,
+                RequestFulfillment.workflow_id,
+            )
+            .where(RequestFulfillment.fulfillment_id.in_(fulfillment_ids))
+        ).all()
+        taken = [fid for fid, _, wf_id in rows if wf_id is not None]
+        if taken:
+            raise InstantiationError(f"이미 워크플로우가 연결된 fulfillment: {sorted(taken)}")
+        fulfillment_team = {fid: team_id for fid, team_id, _ in rows}
+        missing = set(fulfillment_ids) - set(fulfillment_team)
+        if missing:
+            raise InstantiationError(f"존재하지 않는 fulfillment_id: {sorted(missing)}")
+
+    # 1) Workflow 행: 다중 행 INSERT … RETURNING 1회
+    #    SQLite는 RETURNING 순서를 보장하지 않고 sort_by_parameter_order는 행마다 INSERT로 풀리므로,
+    #    내용(template, parameters)으로 입력 항목에 되돌려 붙임 (request_engine과 같은 방식)
+    #    같은 내용의 Workflow끼리는 서로 바꿔도 같은 결과 (팀/fulfillment는 아래에서 id로 연결)
+    W = Workflow.__table__
+    pool = {}
+    for workflow_id, wt_id, parameters in session.execute(
+        insert(W).returning(W.c.workflow_id, W.c.workflow_template_id, W.c.parameters),
+        [
+            {
+                "workflow_template_id": int(i["workflow_template_id"]),
+                "status": "PENDING",
+                "parameters": i.get("parameters"),
+            }
+            for i in instances
+        ],
+    ):
+        pool.setdefault(_payload_key(wt_id, parameters), []).append(workflow_id)
+    for ids in pool.values():
+        ids.sort(reverse=True)
+    workflow_ids = [pool[_payload_key(int(i["workflow_template_id"]), i.get("parameters"))].pop() for i in instances]
+
+    # 2) Task 행: 템플릿 노드 × 새 워크플로우 (INSERT … SELECT)
+    D = WorkflowTemplateDefinition
+    # UNION 안쪽에는 바깥 조건이 내려가지 않음 → 이번 템플릿으로 직접 제한 (정의 전체 SCAN 방지)
+    nodes = union(
+        select(D.workflow_template_id.label("wt_id"), D.task_template_id.label("tt_id"))
+        .where(D.workflow_template_id.in_(wt_ids)),
+        select(D.workflow_template_id, D.depends_on_task_template_id)
+        .where(D.workflow_template_id.in_(wt_ids), D.depends_on_task_template_id.is_not(None)),
+    ).subquery("nodes")
+    T = Task.__table__
+    task_rows = session.execute(
+        insert(T).from_select(
+            ["task_template_id", "workflow_id", "status"],
+            select(nodes.c.tt_id, W.c.workflow_id, literal("PENDING"))
+            .join(W, W.c.workflow_template_id == nodes.c.wt_id)
+            .where(W.c.workflow_id.in_(workflow_ids)),
+        )
+    ).rowcount
+
+    # 담당 팀 지정 (워크플로우 단위 executemany 1회)
+    teams = [
+        {"wf": wf_id, "team": fulfillment_team.get(i.get("fulfillment_id"), i.get("team_id"))}
+        for i, wf_id in zip(instances, workflow_ids)
+    ]
+    teams = [t for t in teams if t["team"] is not None]
+    if teams:
+        session.connection().execute(
+            update(T).where(T.c.workflow_id == bindparam("wf")).values(team_id=bindparam("team")),
+            teams,
+        )
+    for team_id in {t["team"] for t in teams}:
+        invalidate_calendar(session, team_id)
+
+    # 3) TaskDependency 행: 정의 엣지를 같은 워크플로우의 Task 쌍으로 변환
+    up = aliased(Task.__table__, name="up")
+    down = aliased(Task.__table__, name="down")
+    dep_rows = session.execute(
+        insert(TaskDependency.__table__).from_select(
+            ["upstream_task_id", "downstream_task_id"],
+            select(up.c.task_id, down.c.task_id)
+            .select_from(down)
+            .join(W, W.c.workflow_id == down.c.workflow_id)
+            .join(
+                D.__table__,
+                (D.workflow_template_id == W.c.workflow_template_id)
+                & (D.task_template_id == down.c.task_template_id),
+            )
+            .join(
+                up,
+                (up.c.workflow_id == down.c.workflow_id)
+                & (up.c.task_template_id == D.depends_on_task_template_id),
+            )
+            .where(down.c.workflow_id.in_(workflow_ids))
+            .distinct(),
+        )
+    ).rowcount
+
+    # 4) 선행 Task 카운터 초기화 → 선행 없는 Task는 바로 READY
+    TD = TaskDependency.__table__
+    session.execute(
+        update(T)
+        .where(T.c.workflow_id.in_(workflow_ids))
+        .values(remaining_upstream=(
+            select(func.count()).where(TD.c.downstream_task_id == T.c.task_id).scalar_subquery()
+        ))
+    )
+    ready_rows = session.execute(
+        update(T)
+        .where(T.c.workflow_id.in_(workflow_ids), T.c.remaining_upstream == 0)
+        .values(status="READY")
+        .returning(T.c.task_id, T.c.team_id, T.c.workflow_id)
+    ).all()
+    for task_id, team_id, workflow_id in ready_rows:
+        publish(session, "task", task_id, teams=[team_id], status="READY", workflow_id=workflow_id)
+    # 최종 상태 기준으로 롤업 가산 (INSERT … SELECT 집계 1회) + Workflow 상태 카운터 초기화
+    record_created(session, "tasks", Task.workflow_id.in_(workflow_ids))
+    recount(session, "workflows", workflow_ids)
+
+    # 5) RequestFulfillment ↔ Workflow 연결 (executemany 1회)
+    links = [
+        {"fid": int(i["fulfillment_id"]), "wf": wf_id}
+        for i, wf_id in zip(instances, workflow_ids)
+        if i.get("fulfillment_id") is not None
+    ]
+    if links:
+        RF = RequestFulfillment.__table__
+        session.connection().execute(
+            update(RF).where(RF.c.fulfillment_id == bindparam("fid")).values(workflow_id=bindparam("wf")),
+            links,
+        )
+
+    return {"workflow_ids": workflow_ids, "tasks": task_rows, "dependencies": dep_rows}
@@ -0,0 +1,170 @@
+# backend/workflow_graph.py
+# -*- coding: utf-8 -*-
+import threading
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from sqlalchemy import select, update
+
+from orm_build import WorkflowTemplate, WorkflowTemplateDefinition, on_commit
+
+# ─────────────────────────────────────────────────────────────
+# 워크플로우 템플릿 그래프의 컴파일 형태
+# - 노드 = task_template_id, 엣지 = depends_on → task
+# - 노드는 위상 정렬 순서로 재배치, 후행 목록은 CSR(offsets/targets) 배열
+# - (template_id, revision) 키로 프로세스 내 캐시 → 정의가 바뀔 때만 재컴파일
+
+class CycleError(ValueError):
+    def __init__(self, nodes):
+        self.nodes = sorted(nodes)
+        super().__init__(f"순환 의존으로 정렬할 수 없는 노드: {self.nodes}")
+
+
+@dataclass(frozen=True)
+class CompiledGraph:
+    workflow_template_id: int
+    revision: int
+    nodes: tuple      # task_template_id (위상 정렬 순서)
+    index: dict       # task_template_id → nodes 내 위치
+    levels: array     # 노드별 단계 (선행 없음 = 0)
+    offsets: array    # 노드 i의 후행 = targets[offsets[i]:offsets[i + 1]]
+    targets: array
+
+    def successors(self, i: int):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def level_map(self) -> dict:
+        return {tt_id: self.levels[i] for i, tt_id in enumerate(self.nodes)}
+
+
+def compile_graph(nodes, edges, workflow_template_id: int = 0, revision: int = 0) -> CompiledGraph:
+    """Kahn 알고리즘으로 위상 정렬/단계 계산 (O(V+E)). 순환이면 CycleError"""
+    ids = sorted(set(nodes) | {a for a, _ in edges} | {b for _, b in edges})
+    pos = {tt_id: i for i, tt_id in enumerate(ids)}
+    n = len(ids)
+    adj = [[] for _ in range(n)]
+    indeg = [0] * n
+    for a, b in set(edges):
+        adj[pos[a]].append(pos[b])
+        indeg[pos[b]] += 1
+
+    level = [0] * n
+    queue = deque(i for i in range(n) if indeg[i] == 0)
+    order = []
+    while queue:
+        i = queue.popleft()
+        order.append(i)
+        for j in adj[i]:
+            level[j] = max(level[j], level[i] + 1)
+            indeg[j] -= 1
+            if indeg[j] == 0:
+                queue.append(j)
+    if len(order) < n:
+        raise CycleError(ids[i] for i in range(n) if indeg[i] > 0)
+
+    # 위상 순서로 재번호 후 CSR 구성
+    rank = [0] * n
+    for r, i in enumerate(order):
+        rank[i] = r
+    offsets = array("i", [0])
+    targets = array("i")
+    for i in order:
+        targets.extend(sorted(rank[j] for j in adj[i]))
+        offsets.append(len(targets))
+
+    nodes_out = tuple(ids[i] for i in order)
+    return CompiledGraph(
+        workflow_template_id=workflow_template_id,
+        revision=revision,
+        nodes=nodes_out,
+        index={tt_id: r for r, tt_id in enumerate(nodes_out)},
+        levels=array("i", (level[i] for i in order)),
+        offsets=offsets,
+        targets=targets,
+    )
+
+
+def would_create_cycle(graph: CompiledGraph, dep_id: int, task_id: int, skip=None) -> bool:
+    """dep → task 엣지를 추가하면 순환이 생기는지 (skip=(dep, task): 교체되어 빠질 기존 엣지)"""
+    if dep_id == task_id:
+        return True
+    src, dst = graph.index.get(task_id), graph.index.get(dep_id)
+    if src is None or dst is None:
+        return False  # 새 노드가 끼면 기존 경로가 있을 수 없음
+    # 위상 순서상 task가 dep보다 뒤면 task → dep 경로는 불가능
+    if src > dst:
+        return False
+    skip_edge = (graph.index.get(skip[0]), graph.index.get(skip[1])) if skip else None
+
+    seen = {src}
+    stack = [src]
+    while stack:
+        i = stack.pop()
+        for j in graph.successors(i):
+            if (i, j) == skip_edge or j in seen or j > dst:
+                continue
+            if j == dst:
+                return True
+            seen.add(j)
+            stack.append(j)
+    return False
+
+# ─────────────────────────────────────────────────────────────
+# (template_id, revision) → CompiledGraph  LRU 캐시
+_CACHE_MAX = 256
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_compiled(session, wt_id: int) -> CompiledGraph:
+    """현재 revision의 컴파일된 그래프 (캐시 적중 시 PK 조회 1회)"""
+    revision = session.execute(
+        select(WorkflowTemplate.revision).where(WorkflowTemplate.workflow_template_id == wt_id)
+    ).scalar_one()
+    key = (wt_id, revision)
+    with _cache_lock:
+        graph = _cache.get(key)
+        if graph is not None:
+            _cache.move_to_end(key)
+            return graph
+
+    rows = session.execute(
+        select(WorkflowTemplateDefinition.task_template_id, WorkflowTemplateDefinition.depends_on_task_template_id)
+        .where(WorkflowTemplateDefinition.workflow_template_id == wt_id)
+    ).all()
+    graph = compile_graph(
+        nodes=[t for t, _ in rows],
+        edges=[(d, t) for t, d in rows if d is not None],
+        workflow_template_id=wt_id,
+        revision=revision,
+    )
+    with _cache_lock:
+        _cache[key] = graph
+        while len(_cache) > _CACHE_MAX:
+            _cache.popitem(last=False)
+    return graph
+
+
+def bump_revision(session, wt_id: int):
+    """정의가 바뀔 때마다 호출 → 이전 revision의 컴파일 결과는 더 이상 사용되지 않음"""
+    session.execute(
+        update(WorkflowTemplate)
+        .where(WorkflowTemplate.workflow_template_id == wt_id)
+        .values(revision=WorkflowTemplate.revision + 1)
+        .execution_options(synchronize_session=False)
+    )
+    _evict(wt_id)
+
+
+def forget_template(session, wt_id: int):
+    """템플릿 삭제 시 호출 → 커밋 후 캐시에서 제거
+    (SQLite는 마지막 rowid를 재사용 → 새 템플릿이 같은 (id, revision 0) 키로 옛 그래프를 받지 않도록)
+    커밋 전에 지우면 그 사이 다른 요청이 옛 정의로 다시 캐시할 수 있음"""
+    on_commit(session, lambda: _evict(wt_id))
+
+
+def _evict(wt_id: int):
+    with _cache_lock:
+        for key in [k for k in _cache if k[0] == wt_id]:
+            del _cache[key]
@@ -2,36 +2,46 @@
 # -*- coding: utf-8 -*-
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import select
+from sqlalchemy import select, insert, delete
 from sqlalchemy.orm import selectinload
 
 # orm
 from orm_build import (
-    get_session, User, Team,
+    request_session, User, Team,
     TaskTemplateTeamMapping, TaskTemplate,
     WorkflowTemplate, WorkflowTemplateDefinition,
-    WorkflowtemplateTeamMapping
+    WorkflowtemplateTeamMapping, RequestFulfillment,
+    Responsibility, UserResponsibility,
 )
+from workflow_engine import instantiate_workflows, InstantiationError
+from template_copy import copy_workflow_templates, TemplateCopyError, DEFAULT_PREFIX
+from workflow_graph import get_compiled, compile_graph, would_create_cycle, bump_revision, forget_template, CycleError
 
 # custom decorator
-from user_management import require_db_admin
+from user_management import require_db_admin, ALLOWED_RESP
+from authz import current_principal
+from team_revision import team_etag, touch_teams, bump_after_write, bump_team_revisions
+from jobs import enqueue, job_handler, job_accepted, wants_async, JobFailed
+from listing import list_params, apply_listing, paginate, sparse, listing_response
 
 # ─────────────────────────────────────────────────────────────
 # Blueprint: 반드시 한 번만 생성!
 bp_workflow_management = Blueprint(
     "workflow_management", __name__, url_prefix="/api/workflow-management"
 )
+bp_workflow_management.after_request(bump_after_write)  # 쓰기 성공 시 팀 revision +1
 
 # ─────────────────────────────────────────────────────────────
 # 공통 유틸
 def _get_user_and_team(session, user_id):
-    user = session.get(User, user_id)
-    if not user:
+    # 토큰 권한 클레임의 team_id 사용 (User 재조회 없음)
+    principal = current_principal()
+    if not principal:
         return None, None, (jsonify({"message": "User not found"}), 404)
-    team = user.team
+    team = session.get(Team, principal.team_id) if principal.team_id else None
     if not team:
         return None, None, (jsonify({"message": "User is not assigned to any team"}), 400)
-    return user, team, None
+    return principal, team, None
 
 def _assert_template_belongs_to_team(session, wt_id, team_id):
     # 매핑 테이블을 명시적으로 join해서 소속 확인
@@ -43,47 +53,76 @@ def _assert_template_belongs_to_team(session, wt_id, team_id):
     ).scalar_one_or_none()
     return session.get(WorkflowTemplate, wt_id) if hit else None
 
+def _administers_team(session, user_id, team_id) -> bool:
+    # 다른 팀의 관리 권한 = 그 팀에 정의된 관리 책임(DT_Expert)을 맡고 있음 (직위 팀장은 자기 팀에만 유효)
+    return session.execute(
+        select(UserResponsibility.responsibility_id)
+        .join(Responsibility, Responsibility.responsibility_id == UserResponsibility.responsibility_id)
+        .where(UserResponsibility.user_id == user_id, Responsibility.team_id == team_id,
+               Responsibility.responsibility_name.in_(ALLOWED_RESP))
+        .limit(1)
+    ).first() is not None
+
+def _touch_template_teams(session, wt_id):
+    # 템플릿을 공유하는 모든 팀의 목록 ETag 갱신
+    touch_teams(*session.execute(
+        select(WorkflowtemplateTeamMapping.team_id)
+        .where(WorkflowtemplateTeamMapping.workflow_template_id == wt_id)
+    ).scalars())
+
+def _definitions_changed(session, wt_id):
+    bump_revision(session, wt_id)
+    _touch_template_teams(session, wt_id)
+
 # ─────────────────────────────────────────────────────────────
 # 템플릿 목록 (정의 일부까지 eager-load)
 @bp_workflow_management.route("/workflow-templates", methods=["GET"])
 @jwt_required()
 @require_db_admin
+@team_etag
 def list_workflow_templates():
     user_id = get_jwt_identity()
-    with get_session() as s:
-        user, team, err = _get_user_and_team(s, user_id)
-        if err: return err
-
-        rows = s.execute(
-            select(WorkflowTemplate)
-            .join(
-                WorkflowtemplateTeamMapping,
-                WorkflowtemplateTeamMapping.workflow_template_id == WorkflowTemplate.workflow_template_id
-            )
-            .where(WorkflowtemplateTeamMapping.team_id == team.team_id)
-            .options(
-                selectinload(WorkflowTemplate.definitions).selectinload(WorkflowTemplateDefinition.task_template),
-                selectinload(WorkflowTemplate.definitions).selectinload(WorkflowTemplateDefinition.depends_on),
-            )
-            .order_by(WorkflowTemplate.template_name.asc())
-        ).scalars().all()
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+
+    params = list_params()
+    stmt = apply_listing(
+        select(WorkflowTemplate)
+        .join(
+            WorkflowtemplateTeamMapping,
+            WorkflowtemplateTeamMapping.workflow_template_id == WorkflowTemplate.workflow_template_id
+        )
+        .where(WorkflowtemplateTeamMapping.team_id == team.team_id),
+        params, WorkflowTemplate.template_name, WorkflowTemplate.workflow_template_id,
+    )
+    # 정의를 요청하지 않으면 (fields=) 정의/업무 이름 eager-load 생략
+    if params.wants("definitions"):
+        stmt = stmt.options(
+            selectinload(WorkflowTemplate.definitions).selectinload(WorkflowTemplateDefinition.task_template),
+            selectinload(WorkflowTemplate.definitions).selectinload(WorkflowTemplateDefinition.depends_on),
+        )
+    rows, next_cursor = paginate(
+        s.execute(stmt).scalars().all(), params, lambda wt: (wt.template_name, wt.workflow_template_id)
+    )
 
-        out = []
-        for wt in rows:
-            defs = [{
+    out = []
+    for wt in rows:
+        item = {
+            "workflow_template_id": wt.workflow_template_id,
+            "template_name": wt.template_name,
+            "description": wt.description,
+        }
+        if params.wants("definitions"):
+            item["definitions"] = [{
                 "definition_id": d.definition_id,
                 "task_template_id": d.task_template_id,
                 "task_template_name": d.task_template.template_name if d.task_template else None,
                 "depends_on_task_template_id": d.depends_on_task_template_id,
                 "depends_on_task_template_name": d.depends_on.template_name if d.depends_on else None,
             } for d in wt.definitions]
-            out.append({
-                "workflow_template_id": wt.workflow_template_id,
-                "template_name": wt.template_name,
-                "description": wt.description,
-                "definitions": defs
-            })
-        return jsonify(out), 200
+        out.append(sparse(item, params, keep=("workflow_template_id",)))
+    return listing_response(out, next_cursor)
 
 # 템플릿 생성
 @bp_workflow_management.route("/workflow-templates", methods=["POST"])
@@ -97,26 +136,26 @@ def create_workflow_template():
     if not name:
         return jsonify({"message": "template_name is required"}), 400
 
-    with get_session() as s:
-        user, team, err = _get_user_and_team(s, user_id)
-        if err: return err
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
 
-        wt = WorkflowTemplate(template_name=name, description=desc)
-        s.add(wt)
-        s.flush()  # id 생성
+    wt = WorkflowTemplate(template_name=name, description=desc)
+    s.add(wt)
+    s.flush()  # id 생성
 
-        # 사용자 팀과 매핑
-        s.add(WorkflowtemplateTeamMapping(
-            workflow_template_id=wt.workflow_template_id,
-            team_id=team.team_id
-        ))
+    # 사용자 팀과 매핑
+    s.add(WorkflowtemplateTeamMapping(
+        workflow_template_id=wt.workflow_template_id,
+        team_id=team.team_id
+    ))
 
-        return jsonify({
-            "workflow_template_id": wt.workflow_template_id,
-            "template_name": wt.template_name,
-            "description": wt.description,
-            "definitions": []
-        }), 201
+    return jsonify({
+        "workflow_template_id": wt.workflow_template_id,
+        "template_name": wt.template_name,
+        "description": wt.description,
+        "definitions": []
+    }), 201
 
 # 템플릿 수정
 @bp_workflow_management.route("/workflow-templates/<int:wt_id>", methods=["PUT"])
@@ -125,22 +164,23 @@ def create_workflow_template():
 def update_workflow_template(wt_id):
     user_id = get_jwt_identity()
     data = request.get_json(silent=True) or {}
-    with get_session() as s:
-        user, team, err = _get_user_and_team(s, user_id)
-        if err: return err
-
-        wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
-        if not wt:
-            return jsonify({"message": "Template not found"}), 404
-
-        if "template_name" in data:
-            name = (data["template_name"] or "").strip()
-            if not name:
-                return jsonify({"message": "template_name is required"}), 400
-            wt.template_name = name
-        if "description" in data:
-            wt.description = data["description"] or None
-        return jsonify({"message": "ok"}), 200
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+
+    wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
+    if not wt:
+        return jsonify({"message": "Template not found"}), 404
+
+    if "template_name" in data:
+        name = (data["template_name"] or "").strip()
+        if not name:
+            return jsonify({"message": "template_name is required"}), 400
+        wt.template_name = name
+    _touch_template_teams(s, wt_id)
+    if "description" in data:
+        wt.description = data["description"] or None
+    return jsonify({"message": "ok"}), 200
 
 # 템플릿 삭제
 @bp_workflow_management.route("/workflow-templates/<int:wt_id>", methods=["DELETE"])
@@ -148,63 +188,124 @@ def update_workflow_template(wt_id):
 @require_db_admin
 def delete_workflow_template(wt_id):
     user_id = get_jwt_identity()
-    with get_session() as s:
-        user, team, err = _get_user_and_team(s, user_id)
-        if err: return err
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+
+    wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
+    if not wt:
+        return jsonify({"message": "Template not found"}), 404
+
+    _touch_template_teams(s, wt_id)
+    # 정의 FK는 NOT NULL (ORM이 NULL로 끊으려 하지 않도록 먼저 삭제)
+    s.execute(delete(WorkflowTemplateDefinition).where(WorkflowTemplateDefinition.workflow_template_id == wt_id))
+    s.delete(wt)
+    forget_template(s, wt_id)
+    return jsonify({"message": "deleted"}), 200
+
+# 템플릿 복제 (정의는 DB 안에서 INSERT … SELECT → template_copy)
+def duplicate_template(s, wt_id, team_id):
+    """원본(팀 소속)을 팀의 새 템플릿으로 복제 → 새 템플릿 정보, 원본이 없으면 None"""
+    if not _assert_template_belongs_to_team(s, wt_id, team_id):
+        return None
+    copied = copy_workflow_templates(s, [wt_id], team_id)["templates"][0]
+    return {k: copied[k] for k in ("workflow_template_id", "template_name", "description")}
 
-        wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
-        if not wt:
-            return jsonify({"message": "Template not found"}), 404
-
-        s.delete(wt)
-        return jsonify({"message": "deleted"}), 200
-
-# 템플릿 복제
 @bp_workflow_management.route("/workflow-templates/<int:wt_id>/duplicate", methods=["POST"])
 @jwt_required()
 @require_db_admin
 def duplicate_workflow_template(wt_id):
     user_id = get_jwt_identity()
-    with get_session() as s:
-        user, team, err = _get_user_and_team(s, user_id)
-        if err: return err
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
 
-        # 1. 원본 템플릿 조회 및 권한 확인
-        source_wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
-        if not source_wt:
+    # Prefer: respond-async → 202 + 작업 id (권한은 지금 확인, 복제는 워커에서)
+    if wants_async():
+        if not _assert_template_belongs_to_team(s, wt_id, team.team_id):
             return jsonify({"message": "Template not found"}), 404
-
-        # 2. 새 템플릿 생성
-        new_wt = WorkflowTemplate(
-            template_name=f"[복제] {source_wt.template_name}",
-            description=source_wt.description
+        return job_accepted(enqueue(s, "workflow_template.duplicate", {"workflow_template_id": wt_id, "team_id": team.team_id},
+                                    requested_by=user.user_id, team_id=team.team_id))
+
+    try:
+        result = duplicate_template(s, wt_id, team.team_id)
+    except TemplateCopyError as e:
+        return jsonify({"message": str(e)}), 409
+    if result is None:
+        return jsonify({"message": "Template not found"}), 404
+    return jsonify(result), 201
+
+@job_handler("workflow_template.duplicate")
+def _duplicate_job(s, payload, ctx):
+    try:
+        result = duplicate_template(s, payload["workflow_template_id"], payload["team_id"])
+    except TemplateCopyError as e:
+        raise JobFailed(str(e))
+    if result is None:
+        raise JobFailed("Template not found")
+    bump_team_revisions(s, [payload["team_id"]])
+    return result
+
+# 여러 템플릿을 (다른) 팀으로 깊은 복사
+#   body: {"workflow_template_ids": [...], "target_team_id": 팀 id(생략 시 우리 팀), "name_prefix": "[복제] "}
+#   원본은 모두 우리 팀 소속, 다른 팀이 대상이면 그 팀의 DT_Expert 책임도 필요
+#   (정의의 업무 템플릿이 대상 팀에 안 보이면 409). 응답: 새 템플릿 목록 + 테이블별 생성 행 수
+@bp_workflow_management.route("/workflow-templates/copy", methods=["POST"])
+@jwt_required()
+@require_db_admin
+def copy_workflow_templates_to_team():
+    user_id = get_jwt_identity()
+    body = request.get_json(silent=True) or {}
+    try:
+        wt_ids = {int(i) for i in body.get("workflow_template_ids") or []}
+        target_team_id = int(body["target_team_id"]) if body.get("target_team_id") is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"message": "workflow_template_ids/target_team_id must be integers"}), 400
+    if not wt_ids:
+        return jsonify({"message": "workflow_template_ids is required"}), 400
+    name_prefix = body.get("name_prefix", DEFAULT_PREFIX)
+    if not isinstance(name_prefix, str) or not name_prefix.strip():
+        return jsonify({"message": "name_prefix must be a non-empty string"}), 400
+
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+    target_team_id = target_team_id or team.team_id
+    # 다른 팀으로 복사: 원본 팀(require_db_admin)과 대상 팀 모두의 관리 권한 필요
+    if target_team_id != team.team_id:
+        if s.get(Team, target_team_id) is None:
+            return jsonify({"message": "Target team not found"}), 404
+        if not _administers_team(s, user.user_id, target_team_id):
+            return jsonify({"message": "You need admin rights (DT_Expert) on the target team"}), 403
+    owned = set(s.execute(
+        select(WorkflowtemplateTeamMapping.workflow_template_id).where(
+            WorkflowtemplateTeamMapping.team_id == team.team_id,
+            WorkflowtemplateTeamMapping.workflow_template_id.in_(wt_ids)
         )
-        s.add(new_wt)
-        s.flush()  # 새 ID 확보
-
-        # 3. 새 템플릿을 현재 유저의 팀에 매핑
-        s.add(WorkflowtemplateTeamMapping(
-            workflow_template_id=new_wt.workflow_template_id,
-            team_id=team.team_id
-                ))
-        # 4. 원본의 모든 정의(연결)를 복제 (Bulk Insert로 최적화)
-        if source_wt.definitions:
-            new_defs_data = [
-                {
-                    "workflow_template_id": new_wt.workflow_template_id,
-                    "task_template_id": old_def.task_template_id,
-                    "depends_on_task_template_id": old_def.depends_on_task_template_id
-                }
-                for old_def in source_wt.definitions
-            ]
-            s.bulk_insert_mappings(WorkflowTemplateDefinition, new_defs_data)
-        # 5. 새 템플릿 정보 반환
-        s.flush()
-        return jsonify({
-            "workflow_template_id": new_wt.workflow_template_id,
-            "template_name": new_wt.template_name,
-            "description": new_wt.description,
-        }), 201
+    ).scalars())
+    if owned != wt_ids:
+        return jsonify({"message": "Template not found"}), 404
+
+    payload = {"workflow_template_ids": sorted(wt_ids), "target_team_id": target_team_id, "name_prefix": name_prefix}
+    if wants_async():
+        return job_accepted(enqueue(s, "workflow_template.copy", payload,
+                                    requested_by=user.user_id, team_id=team.team_id))
+    try:
+        result = copy_workflow_templates(s, payload["workflow_template_ids"], target_team_id, name_prefix)
+    except TemplateCopyError as e:
+        return jsonify({"message": str(e)}), 409
+    touch_teams(target_team_id)
+    return jsonify(result), 201
+
+@job_handler("workflow_template.copy")
+def _copy_job(s, payload, ctx):
+    try:
+        result = copy_workflow_templates(s, payload["workflow_template_ids"], payload["target_team_id"],
+                                         payload["name_prefix"])
+    except TemplateCopyError as e:
+        raise JobFailed(str(e))
+    bump_team_revisions(s, [payload["target_team_id"]])
+    return result
 
 # ─────────────────────────────────────────────────────────────
 # (A) 후보 업무: 우리 팀에 매핑된 TaskTemplate 목록
@@ -215,27 +316,31 @@ def duplicate_workflow_template(wt_id):
 @require_db_admin
 def list_task_candidates(wt_id):
     user_id = get_jwt_identity()
-    with get_session() as s:
-        user, team, err = _get_user_and_team(s, user_id)
-        if err: return err
-        wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
-        if not wt:
-            return jsonify({"message": "Template not found"}), 404
-
-        rows = s.execute(
-            select(TaskTemplate)
-            .join(TaskTemplateTeamMapping, TaskTemplateTeamMapping.task_template_id == TaskTemplate.task_template_id)
-            .where(TaskTemplateTeamMapping.team_id == team.team_id)
-            .order_by(TaskTemplate.template_name.asc())
-        ).scalars().all()
-
-        return jsonify([
-            {
-                "task_template_id": t.task_template_id,
-                "template_name": t.template_name,
-                "category": t.category,             # ★ 추가
-            }
-        for t in rows]), 200
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+    wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
+    if not wt:
+        return jsonify({"message": "Template not found"}), 404
+
+    params = list_params()
+    stmt = apply_listing(
+        select(TaskTemplate)
+        .join(TaskTemplateTeamMapping, TaskTemplateTeamMapping.task_template_id == TaskTemplate.task_template_id)
+        .where(TaskTemplateTeamMapping.team_id == team.team_id),
+        params, TaskTemplate.template_name, TaskTemplate.task_template_id, TaskTemplate.category,
+    )
+    rows, next_cursor = paginate(
+        s.execute(stmt).scalars().all(), params, lambda t: (t.template_name, t.task_template_id)
+    )
+
+    return listing_response([
+        sparse({
+            "task_template_id": t.task_template_id,
+            "template_name": t.template_name,
+            "category": t.category,             # ★ 추가
+        }, params, keep=("task_template_id",))
+    for t in rows], next_cursor)
 
 
 # (B) 정의 목록
@@ -245,45 +350,55 @@ def list_task_candidates(wt_id):
 @jwt_required()
 def list_definitions(wt_id):
     user_id = get_jwt_identity()
-    with get_session() as s:
-        user, team, err = _get_user_and_team(s, user_id)
-        if err: return err
-        wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
-        if not wt:
-            return jsonify({"message": "Template not found"}), 404
-
-        defs = s.execute(
-            select(WorkflowTemplateDefinition)
-            .where(WorkflowTemplateDefinition.workflow_template_id == wt_id)
-            .options(
-                selectinload(WorkflowTemplateDefinition.task_template),
-                selectinload(WorkflowTemplateDefinition.depends_on),
-            )
-            .order_by(WorkflowTemplateDefinition.definition_id.asc())
-        ).scalars().all()
-
-        data = [{
-            "definition_id": d.definition_id,
-            "task_template_id": d.task_template_id,
-            "task_template_name": d.task_template.template_name if d.task_template else None,
-            "depends_on_task_template_id": d.depends_on_task_template_id,
-            "depends_on_task_template_name": d.depends_on.template_name if d.depends_on else None,
-            # (옵션) 행 자체에도 카테고리를 넣고 싶다면:
-            # "task_template_category": d.task_template.category if d.task_template else None,
-            # "depends_on_category": d.depends_on.category if d.depends_on else None,
-        } for d in defs]
-
-        node_ids = set([d.task_template_id for d in defs] + [d.depends_on_task_template_id for d in defs if d.depends_on_task_template_id])
-        nodes = []
-        if node_ids:
-            tts = s.execute(select(TaskTemplate).where(TaskTemplate.task_template_id.in_(node_ids))).scalars().all()
-            nodes = [{
-                "task_template_id": t.task_template_id,
-                "template_name": t.template_name,
-                "category": t.category,              # ★ 추가
-            } for t in tts]
-
-        return jsonify({"workflow_template_id": wt_id, "definitions": data, "nodes": nodes}), 200
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+    wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
+    if not wt:
+        return jsonify({"message": "Template not found"}), 404
+
+    defs = s.execute(
+        select(WorkflowTemplateDefinition)
+        .where(WorkflowTemplateDefinition.workflow_template_id == wt_id)
+        .options(
+            selectinload(WorkflowTemplateDefinition.task_template),
+            selectinload(WorkflowTemplateDefinition.depends_on),
+        )
+        .order_by(WorkflowTemplateDefinition.definition_id.asc())
+    ).scalars().all()
+
+    data = [{
+        "definition_id": d.definition_id,
+        "task_template_id": d.task_template_id,
+        "task_template_name": d.task_template.template_name if d.task_template else None,
+        "depends_on_task_template_id": d.depends_on_task_template_id,
+        "depends_on_task_template_name": d.depends_on.template_name if d.depends_on else None,
+        # (옵션) 행 자체에도 카테고리를 넣고 싶다면:
+        # "task_template_category": d.task_template.category if d.task_template else None,
+        # "depends_on_category": d.depends_on.category if d.depends_on else None,
+    } for d in defs]
+
+    node_ids = set([d.task_template_id for d in defs] + [d.depends_on_task_template_id for d in defs if d.depends_on_task_template_id])
+    nodes = []
+    if node_ids:
+        tts = s.execute(select(TaskTemplate).where(TaskTemplate.task_template_id.in_(node_ids))).scalars().all()
+        nodes = [{
+            "task_template_id": t.task_template_id,
+            "template_name": t.template_name,
+            "category": t.category,              # ★ 추가
+        } for t in tts]
+
+    # 컴파일된 그래프(캐시)에서 실행 순서/단계
+    try:
+        graph = get_compiled(s, wt_id)
+        order, levels = list(graph.nodes), graph.level_map()
+    except CycleError:
+        order, levels = None, None
+
+    return jsonify({
+        "workflow_template_id": wt_id, "definitions": data, "nodes": nodes,
+        "order": order, "levels": levels
+    }), 200
 
 
 # (C) 정의 추가
@@ -301,42 +416,138 @@ def add_definition(wt_id):
     if dep_id is not None and dep_id == task_id:
         return jsonify({"message": "A task cannot depend on itself"}), 400
 
-    with get_session() as s:
-        user, team, err = _get_user_and_team(s, user_id)
-        if err: return err
-        wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
-        if not wt:
-            return jsonify({"message": "Template not found"}), 404
-
-        # 후보 업무 제한: 우리 팀에 매핑된 업무만
-        allowed_ids = set(s.execute(
-            select(TaskTemplate.task_template_id)
-            .join(TaskTemplateTeamMapping, TaskTemplateTeamMapping.task_template_id == TaskTemplate.task_template_id)
-            .where(TaskTemplateTeamMapping.team_id == team.team_id)
-        ).scalars().all())
-        if task_id not in allowed_ids or (dep_id is not None and dep_id not in allowed_ids):
-            return jsonify({"message": "task not allowed for this team"}), 403
-
-        # 중복 방지
-        dup = s.execute(
-            select(WorkflowTemplateDefinition).where(
-                WorkflowTemplateDefinition.workflow_template_id == wt_id,
-                WorkflowTemplateDefinition.task_template_id == task_id,
-                (WorkflowTemplateDefinition.depends_on_task_template_id == dep_id)
-                if dep_id is not None else
-                (WorkflowTemplateDefinition.depends_on_task_template_id.is_(None))
-            )
-        ).scalar_one_or_none()
-        if dup:
-            return jsonify({"message":"duplicate definition"}), 409
-
-        d = WorkflowTemplateDefinition(
-            workflow_template_id=wt_id,
-            task_template_id=task_id,
-            depends_on_task_template_id=dep_id
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+    wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
+    if not wt:
+        return jsonify({"message": "Template not found"}), 404
+
+    # 후보 업무 제한: 우리 팀에 매핑된 업무만
+    allowed_ids = set(s.execute(
+        select(TaskTemplate.task_template_id)
+        .join(TaskTemplateTeamMapping, TaskTemplateTeamMapping.task_template_id == TaskTemplate.task_template_id)
+        .where(TaskTemplateTeamMapping.team_id == team.team_id)
+    ).scalars().all())
+    if task_id not in allowed_ids or (dep_id is not None and dep_id not in allowed_ids):
+        return jsonify({"message": "task not allowed for this team"}), 403
+
+    # 중복 방지
+    dup = s.execute(
+        select(WorkflowTemplateDefinition).where(
+            WorkflowTemplateDefinition.workflow_template_id == wt_id,
+            WorkflowTemplateDefinition.task_template_id == task_id,
+            (WorkflowTemplateDefinition.depends_on_task_template_id == dep_id)
+            if dep_id is not None else
+            (WorkflowTemplateDefinition.depends_on_task_template_id.is_(None))
         )
-        s.add(d); s.flush()
-        return jsonify({"definition_id": d.definition_id}), 201
+    ).scalar_one_or_none()
+    if dup:
+        return jsonify({"message":"duplicate definition"}), 409
+
+    # 순환 방지 (컴파일된 그래프에서 task → dep 경로 탐색)
+    if dep_id is not None:
+        try:
+            graph = get_compiled(s, wt_id)
+        except CycleError as e:
+            return jsonify({"message": str(e)}), 409
+        if would_create_cycle(graph, dep_id, task_id):
+            return jsonify({"message": "This dependency would create a cycle"}), 400
+
+    d = WorkflowTemplateDefinition(
+        workflow_template_id=wt_id,
+        task_template_id=task_id,
+        depends_on_task_template_id=dep_id
+    )
+    s.add(d); s.flush()
+    _definitions_changed(s, wt_id)
+    return jsonify({"definition_id": d.definition_id}), 201
+
+# (C-2) 정의 일괄 저장: 원하는 전체 노드/엣지 집합을 받아 차이만 반영
+@bp_workflow_management.route("/workflow-templates/<int:wt_id>/definitions", methods=["PUT"])
+@jwt_required()
+@require_db_admin
+def replace_definitions(wt_id):
+    """
+    body: {"definitions": [{"task_template_id", "depends_on_task_template_id"}, ...],
+           "nodes": [task_template_id, ...]}   # nodes: 엣지 없이 홀로 있는 노드 (선택)
+    권한 확인 1회, 현재 정의와 diff 후 DELETE 1회 + INSERT 1회
+    """
+    user_id = get_jwt_identity()
+    body = request.get_json(silent=True) or {}
+    try:
+        desired = {
+            (int(d["task_template_id"]),
+             int(d["depends_on_task_template_id"]) if d.get("depends_on_task_template_id") is not None else None)
+            for d in body.get("definitions") or []
+        }
+        nodes = {int(n) for n in body.get("nodes") or []}
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"message": "definitions 형식이 올바르지 않습니다"}), 400
+    if any(task == dep for task, dep in desired):
+        return jsonify({"message": "A task cannot depend on itself"}), 400
+    # 독립 노드는 (task, None) 행으로 표현
+    has_row = {task for task, _ in desired}
+    desired |= {(n, None) for n in nodes - has_row}
+
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+    wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
+    if not wt:
+        return jsonify({"message": "Template not found"}), 404
+
+    # 후보 업무 제한: 우리 팀에 매핑된 업무만
+    used = {task for task, _ in desired} | {dep for _, dep in desired if dep is not None}
+    allowed_ids = set(s.execute(
+        select(TaskTemplateTeamMapping.task_template_id).where(
+            TaskTemplateTeamMapping.team_id == team.team_id,
+            TaskTemplateTeamMapping.task_template_id.in_(used)
+        )
+    ).scalars()) if used else set()
+    if used - allowed_ids:
+        return jsonify({"message": "task not allowed for this team", "task_template_ids": sorted(used - allowed_ids)}), 403
+
+    # 순환 검사 (원하는 그래프 전체, O(V+E))
+    try:
+        compile_graph(
+            nodes=[task for task, _ in desired],
+            edges=[(dep, task) for task, dep in desired if dep is not None],
+        )
+    except CycleError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # 현재 정의와 diff (중복 행은 하나만 남김)
+    current = s.execute(
+        select(
+            WorkflowTemplateDefinition.definition_id,
+            WorkflowTemplateDefinition.task_template_id,
+            WorkflowTemplateDefinition.depends_on_task_template_id,
+        ).where(WorkflowTemplateDefinition.workflow_template_id == wt_id)
+    ).all()
+    keep, to_delete = set(), []
+    for def_id, task, dep in current:
+        if (task, dep) in desired and (task, dep) not in keep:
+            keep.add((task, dep))
+        else:
+            to_delete.append(def_id)
+    to_insert = [
+        {"workflow_template_id": wt_id, "task_template_id": task, "depends_on_task_template_id": dep}
+        for task, dep in sorted(desired - keep, key=lambda p: (p[0], p[1] or 0))
+    ]
+
+    if to_delete:
+        s.execute(
+            delete(WorkflowTemplateDefinition)
+            .where(WorkflowTemplateDefinition.definition_id.in_(to_delete))
+            .execution_options(synchronize_session=False)
+        )
+    if to_insert:
+        s.execute(insert(WorkflowTemplateDefinition.__table__), to_insert)
+    if to_delete or to_insert:
+        _definitions_changed(s, wt_id)
+
+    return jsonify({"inserted": len(to_insert), "deleted": len(to_delete), "unchanged": len(keep)}), 200
 
 # (D) 정의 수정
 @bp_workflow_management.route("/workflow-templates/<int:wt_id>/definitions/<int:def_id>", methods=["PUT"])
@@ -351,46 +562,57 @@ def update_definition(wt_id, def_id):
     if new_dep_id is not None and new_task_id is not None and new_dep_id == new_task_id:
         return jsonify({"message": "A task cannot depend on itself"}), 400
 
-    with get_session() as s:
-        user, team, err = _get_user_and_team(s, user_id)
-        if err: return err
-        wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
-        if not wt:
-            return jsonify({"message": "Template not found"}), 404
-
-        d = s.get(WorkflowTemplateDefinition, def_id)
-        if not d or d.workflow_template_id != wt_id:
-            return jsonify({"message":"Definition not found"}), 404
-
-        task_id = new_task_id if new_task_id is not None else d.task_template_id
-        dep_id  = new_dep_id  if new_dep_id  is not None else d.depends_on_task_template_id
-
-        # 허용 업무 체크
-        allowed_ids = set(s.execute(
-            select(TaskTemplate.task_template_id)
-            .join(TaskTemplateTeamMapping, TaskTemplateTeamMapping.task_template_id == TaskTemplate.task_template_id)
-            .where(TaskTemplateTeamMapping.team_id == team.team_id)
-        ).scalars().all())
-        if task_id not in allowed_ids or (dep_id is not None and dep_id not in allowed_ids):
-            return jsonify({"message":"task not allowed"}), 403
-
-        # 중복 방지
-        dup = s.execute(
-            select(WorkflowTemplateDefinition).where(
-                WorkflowTemplateDefinition.workflow_template_id == wt_id,
-                WorkflowTemplateDefinition.task_template_id == task_id,
-                (WorkflowTemplateDefinition.depends_on_task_template_id == dep_id)
-                if dep_id is not None else
-                (WorkflowTemplateDefinition.depends_on_task_template_id.is_(None)),
-                WorkflowTemplateDefinition.definition_id != def_id
-            )
-        ).scalar_one_or_none()
-        if dup:
-            return jsonify({"message":"duplicate definition"}), 409
-
-        d.task_template_id = task_id
-        d.depends_on_task_template_id = dep_id
-        return jsonify({"message":"ok"}), 200
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+    wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
+    if not wt:
+        return jsonify({"message": "Template not found"}), 404
+
+    d = s.get(WorkflowTemplateDefinition, def_id)
+    if not d or d.workflow_template_id != wt_id:
+        return jsonify({"message":"Definition not found"}), 404
+
+    task_id = new_task_id if new_task_id is not None else d.task_template_id
+    dep_id  = new_dep_id  if new_dep_id  is not None else d.depends_on_task_template_id
+
+    # 허용 업무 체크
+    allowed_ids = set(s.execute(
+        select(TaskTemplate.task_template_id)
+        .join(TaskTemplateTeamMapping, TaskTemplateTeamMapping.task_template_id == TaskTemplate.task_template_id)
+        .where(TaskTemplateTeamMapping.team_id == team.team_id)
+    ).scalars().all())
+    if task_id not in allowed_ids or (dep_id is not None and dep_id not in allowed_ids):
+        return jsonify({"message":"task not allowed"}), 403
+
+    # 중복 방지
+    dup = s.execute(
+        select(WorkflowTemplateDefinition).where(
+            WorkflowTemplateDefinition.workflow_template_id == wt_id,
+            WorkflowTemplateDefinition.task_template_id == task_id,
+            (WorkflowTemplateDefinition.depends_on_task_template_id == dep_id)
+            if dep_id is not None else
+            (WorkflowTemplateDefinition.depends_on_task_template_id.is_(None)),
+            WorkflowTemplateDefinition.definition_id != def_id
+        )
+    ).scalar_one_or_none()
+    if dup:
+        return jsonify({"message":"duplicate definition"}), 409
+
+    # 순환 방지 (교체되는 기존 엣지는 제외하고 탐색)
+    if dep_id is not None:
+        try:
+            graph = get_compiled(s, wt_id)
+        except CycleError as e:
+            return jsonify({"message": str(e)}), 409
+        old_edge = (d.depends_on_task_template_id, d.task_template_id) if d.depends_on_task_template_id is not None else None
+        if would_create_cycle(graph, dep_id, task_id, skip=old_edge):
+            return jsonify({"message": "This dependency would create a cycle"}), 400
+
+    d.task_template_id = task_id
+    d.depends_on_task_template_id = dep_id
+    _definitions_changed(s, wt_id)
+    return jsonify({"message":"ok"}), 200
 
 # (E) 정의 삭제
 @bp_workflow_management.route("/workflow-templates/<int:wt_id>/definitions/<int:def_id>", methods=["DELETE"])
@@ -398,18 +620,19 @@ def update_definition(wt_id, def_id):
 @require_db_admin
 def delete_definition(wt_id, def_id):
     user_id = get_jwt_identity()
-    with get_session() as s:
-        user, team, err = _get_user_and_team(s, user_id)
-        if err: return err
-        wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
-        if not wt:
-            return jsonify({"message": "Template not found"}), 404
-
-        d = s.get(WorkflowTemplateDefinition, def_id)
-        if not d or d.workflow_template_id != wt_id:
-            return jsonify({"message":"Definition not found"}), 404
-        s.delete(d)
-        return jsonify({"message":"deleted"}), 200
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+    wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
+    if not wt:
+        return jsonify({"message": "Template not found"}), 404
+
+    d = s.get(WorkflowTemplateDefinition, def_id)
+    if not d or d.workflow_template_id != wt_id:
+        return jsonify({"message":"Definition not found"}), 404
+    s.delete(d)
+    _definitions_changed(s, wt_id)
+    return jsonify({"message":"deleted"}), 200
 
 # (옵션) 특정 업무 노드 자체 삭제: 해당 업무에 대한 모든 정의 제거
 @bp_workflow_management.route("/workflow-templates/<int:wt_id>/tasks/<int:task_template_id>", methods=["DELETE"])
@@ -417,25 +640,98 @@ def delete_definition(wt_id, def_id):
 @require_db_admin
 def delete_task_node(wt_id, task_template_id):
     user_id = get_jwt_identity()
-    with get_session() as s:
-        user, team, err = _get_user_and_team(s, user_id)
-        if err: return err
-        wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
-        if not wt:
-            return jsonify({"message":"Template not found"}), 404
-
-        ids = s.execute(
-            select(WorkflowTemplateDefinition.definition_id).where(
-                WorkflowTemplateDefinition.workflow_template_id == wt_id,
-                WorkflowTemplateDefinition.task_template_id == task_template_id
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+    wt = _assert_template_belongs_to_team(s, wt_id, team.team_id)
+    if not wt:
+        return jsonify({"message":"Template not found"}), 404
+
+    ids = s.execute(
+        select(WorkflowTemplateDefinition.definition_id).where(
+            WorkflowTemplateDefinition.workflow_template_id == wt_id,
+            WorkflowTemplateDefinition.task_template_id == task_template_id
+        )
+    ).scalars().all()
+    if not ids:
+        return jsonify({"message":"nothing to delete"}), 404
+
+    s.query(WorkflowTemplateDefinition)\
+     .filter(
+         WorkflowTemplateDefinition.workflow_template_id == wt_id,
+         WorkflowTemplateDefinition.task_template_id == task_template_id
+     ).delete()
+    _definitions_changed(s, wt_id)
+    return jsonify({"message":"deleted", "count": len(ids)}), 200
+
+# ─────────────────────────────────────────────────────────────
+# 워크플로우 실행 인스턴스 생성 (여러 건 일괄)
+@bp_workflow_management.route("/workflows", methods=["POST"])
+@jwt_required()
+@require_db_admin
+def instantiate_workflow_batch():
+    user_id = get_jwt_identity()
+    body = request.get_json(silent=True) or {}
+    instances = body.get("instances")
+    if not isinstance(instances, list) or not instances:
+        return jsonify({"message": "instances is required"}), 400
+    try:
+        wt_ids = {int(i["workflow_template_id"]) for i in instances}
+        fulfillment_ids = {int(i["fulfillment_id"]) for i in instances if i.get("fulfillment_id") is not None}
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"message": "workflow_template_id is required for every instance"}), 400
+
+    s = request_session()
+    user, team, err = _get_user_and_team(s, user_id)
+    if err: return err
+
+    # 권한: 템플릿은 우리 팀 소속, fulfillment는 우리 팀 배정분만
+    owned = set(s.execute(
+        select(WorkflowtemplateTeamMapping.workflow_template_id).where(
+            WorkflowtemplateTeamMapping.team_id == team.team_id,
+            WorkflowtemplateTeamMapping.workflow_template_id.in_(wt_ids)
+        )
+    ).scalars())
+    if owned != wt_ids:
+        return jsonify({"message": "Template not found"}), 404
+    if fulfillment_ids:
+        mine = set(s.execute(
+            select(RequestFulfillment.fulfillment_id).where(
+                RequestFulfillment.fulfillment_id.in_(fulfillment_ids),
+                RequestFulfillment.assigned_team_id == team.team_id
             )
-        ).scalars().all()
-        if not ids:
-            return jsonify({"message":"nothing to delete"}), 404
-
-        s.query(WorkflowTemplateDefinition)\
-         .filter(
-             WorkflowTemplateDefinition.workflow_template_id == wt_id,
-             WorkflowTemplateDefinition.task_template_id == task_template_id
-         ).delete()
-        return jsonify({"message":"deleted", "count": len(ids)}), 200
+        ).scalars())
+        if mine != fulfillment_ids:
+            return jsonify({"message": "Fulfillment not found"}), 404
+
+    # fulfillment 없이 만든 인스턴스는 요청자 팀 담당
+    instances = [{**i, "team_id": team.team_id} for i in instances]
+    if wants_async():
+        return job_accepted(enqueue(s, "workflow.instantiate", {"instances": instances},
+                                    requested_by=user.user_id, team_id=team.team_id))
+    try:
+        result = instantiate_workflows(s, instances)
+    except InstantiationError as e:
+        return jsonify({"message": str(e)}), 409
+    return jsonify(result), 201
+
+INSTANTIATE_CHUNK = 500
+
+@job_handler("workflow.instantiate")
+def _instantiate_job(s, payload, ctx):
+    """한 트랜잭션 안에서 INSTANTIATE_CHUNK건씩 생성하며 진행률 보고 (실패하면 전부 롤백)"""
+    instances = payload["instances"]
+    fulfillment_ids = [i["fulfillment_id"] for i in instances if i.get("fulfillment_id") is not None]
+    if len(fulfillment_ids) != len(set(fulfillment_ids)):
+        raise JobFailed("같은 fulfillment_id가 중복되었습니다")
+    result = {"workflow_ids": [], "tasks": 0, "dependencies": 0}
+    for start in range(0, len(instances), INSTANTIATE_CHUNK):
+        try:
+            part = instantiate_workflows(s, instances[start:start + INSTANTIATE_CHUNK])
+        except InstantiationError as e:
+            raise JobFailed(str(e))
+        result["workflow_ids"] += part["workflow_ids"]
+        result["tasks"] += part["tasks"]
+        result["dependencies"] += part["dependencies"]
+        ctx.progress(start + len(part["workflow_ids"]), len(instances))
+    return result
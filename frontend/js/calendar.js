@@ -29,10 +29,12 @@ export async function renderCalendar(token) {
     const res = await fetch(`${calendarAPI}?year=${year}&month=${month}`, {
         headers: { 'Authorization': 'Bearer ' + token }
     });
-    const tasks = await res.json();
+    const status = await res.json();
+    const days = status.days || {};
 
     const grid = document.querySelector('.calendar-grid');
     const today = new Date();
+    const startOfToday = new Date(today.getFullYear(), today.getMonth(), today.getDate());
 
     while (grid.children.length > 7) {
         grid.removeChild(grid.lastChild);
@@ -58,21 +60,23 @@ export async function renderCalendar(token) {
 
         const thisDateStr = `${year}-${String(month).padStart(2, '0')}-${String(day).padStart(2, '0')}`;
 
-        const overdue = tasks.filter(t => new Date(t.due_date) < today && t.due_date === thisDateStr);
-        const upcoming = tasks.filter(t => {
-            const diff = (new Date(t.due_date) - today) / (1000 * 60 * 60 * 24);
-            return diff >= 0 && diff <= 3 && t.due_date === thisDateStr;
-        });
+        // 일자별 상태 집계: { tasks: {status: n}, requests: {status: n} }
+        const counts = days[thisDateStr] || { tasks: {}, requests: {} };
+        const open = countOpen(counts.tasks) + countOpen(counts.requests);
+        const cellDate = new Date(year, month - 1, day);
+        const diff = (cellDate - startOfToday) / (1000 * 60 * 60 * 24);
+        const overdue = open > 0 && diff < 0;
+        const upcoming = open > 0 && diff >= 0 && diff <= 3;
 
         const dotBox = document.createElement('div');
         dotBox.className = 'dot-box';
 
-        if (overdue.length > 0) {
+        if (overdue) {
             const redDot = document.createElement('div');
             redDot.className = 'dot red';
             dotBox.appendChild(redDot);
         }
-        if (upcoming.length > 0) {
+        if (upcoming) {
             const yellowDot = document.createElement('div');
             yellowDot.className = 'dot yellow';
             dotBox.appendChild(yellowDot);
@@ -82,37 +86,40 @@ export async function renderCalendar(token) {
             cell.appendChild(dotBox);
         }
 
-        cell.addEventListener('click', () => openCalendarModal(thisDateStr, overdue, upcoming));
+        cell.addEventListener('click', () => openCalendarModal(thisDateStr, counts));
         grid.appendChild(cell);
     }
 }
 
 // ==============================
 // 캘린더 모달
-function openCalendarModal(dateStr, overdue, upcoming) {
+function countOpen(byStatus) {
+    return Object.entries(byStatus || {})
+        .filter(([st]) => st !== 'COMPLETED')
+        .reduce((sum, [, n]) => sum + n, 0);
+}
+
+function renderStatusList(title, byStatus) {
+    const entries = Object.entries(byStatus || {});
+    if (entries.length === 0) return '';
+    let html = `<h4>${title}</h4><ul>`;
+    entries.forEach(([st, n]) => {
+        html += `<li>${st}: ${n}건</li>`;
+    });
+    return html + `</ul>`;
+}
+
+function openCalendarModal(dateStr, counts) {
     const modal = document.getElementById('calendar-modal');
     const modalContent = document.getElementById('calendar-modal-content');
 
     let html = `<h3>${dateStr} 업무 현황</h3>`;
 
-    if (overdue.length === 0 && upcoming.length === 0) {
+    if (countOpen(counts.tasks) + countOpen(counts.requests) === 0) {
         html += `<p>🎉 모든 업무를 완료하였습니다. 축하합니다! 🎉</p>`;
-    } else {
-        if (overdue.length > 0) {
-            html += `<h4>🔴 마감일 지남</h4><ul>`;
-            overdue.forEach(t => {
-                html += `<li>${t.name} (마감일: ${t.due_date})</li>`;
-            });
-            html += `</ul>`;
-        }
-        if (upcoming.length > 0) {
-            html += `<h4>🟡 마감 3일 이내</h4><ul>`;
-            upcoming.forEach(t => {
-                html += `<li>${t.name} (마감일: ${t.due_date})</li>`;
-            });
-            html += `</ul>`;
-        }
     }
+    html += renderStatusList('📋 업무(Task)', counts.tasks);
+    html += renderStatusList('📨 요청(Request)', counts.requests);
 
     modalContent.innerHTML = html;
     modal.style.display = 'block';
@@ -4,6 +4,7 @@
 import { initUserPanel, loadTeamMembers } from './user_panel.js';
 import { initTaskTemplatePanel, loadTaskTemplates } from './task_template_panel.js';
 import { initRequestTemplatePanel, loadRequestTemplates } from './request_template_panel.js';
+import { openEventStream } from './events.js';
 
 
 // API 엔드포인트와 공용 상수를 정의하고 내보냅니다.
@@ -136,8 +137,26 @@ window.addEventListener("DOMContentLoaded", async () => {
   initTaskTemplatePanel();
   initRequestTemplatePanel();
   // 워크플로우 템플릿 패널은 import 시 이벤트 구독 + 탭 진입 시 자동 초기화
+
+  openEventStream(getToken(), onServerEvent);
 });
 
+// ===== 서버 변경 이벤트 =====
+// 팀 revision이 바뀌면 (다른 사용자의 수정 포함) 이미 불러온 목록만 다시 받음 — ETag로 안 바뀐 목록은 304
+let reloadTimer = null;
+function onServerEvent(ev){
+  if (ev.entity !== 'team' && ev.entity !== 'resync') return;
+  clearTimeout(reloadTimer);
+  reloadTimer = setTimeout(reloadLoadedLists, 300);  // 연속 이벤트는 한 번에
+}
+
+async function reloadLoadedLists(){
+  if (State.editing) return;  // 편집 중인 폼을 덮어쓰지 않음
+  if (State.isLead && State.teamMembers.length > 0) await loadTeamMembers();
+  if (State.taskTemplates.length > 0) await loadTaskTemplates();
+  if (State.requestTemplates.length > 0) await loadRequestTemplates();
+}
+
 // ===== 초기화 함수들 =====
 function guardAuth(){
   const token = localStorage.getItem("token");
@@ -0,0 +1,23 @@
+// js/events.js
+// 서버 변경 이벤트(SSE) 구독: 목록을 주기적으로 다시 받는 대신 바뀐 것만 반영
+//   이벤트: { entity: "task"|"fulfillment"|"request"|"team"|"resync", id, status?, revision?, bulk? }
+//   - resync / bulk: 놓친 이벤트가 있거나 한꺼번에 많이 바뀜 → 목록을 다시 받을 것
+import { API_URL } from './config.js';
+
+export function openEventStream(token, onEvent) {
+  if (!token || typeof EventSource === 'undefined') return null;
+  // EventSource는 헤더를 붙일 수 없어 쿼리스트링으로 토큰 전달 (재접속 시 Last-Event-ID는 브라우저가 보냄)
+  const es = new EventSource(`${API_URL}/events/stream?jwt=${encodeURIComponent(token)}`);
+  es.onmessage = (e) => {
+    let data;
+    try { data = JSON.parse(e.data); } catch { return; }
+    onEvent(data);
+    document.dispatchEvent(new CustomEvent('server:event', { detail: data }));
+  };
+  es.onerror = () => {
+    // 토큰 만료 등으로 연결이 닫히면 재시도하지 않음 (열린 상태의 일시 오류는 브라우저가 재접속)
+    if (es.readyState === EventSource.CLOSED) console.warn('[events] 스트림 종료');
+  };
+  window.addEventListener('beforeunload', () => es.close());
+  return es;
+}
@@ -3,7 +3,7 @@
 import {
   State, esc, toast, authFetch,
   EP_ME, EP_TEAMS, EP_TEAM_MEMBERS, EP_TEAM_RESPONSIBILITIES, EP_ME_RESPONSIBILITIES,
-  FIXED_DOMAIN, EMAIL_KEY, POS_KEY, TEAM_KEY,
+  FIXED_DOMAIN, EMAIL_KEY, POS_KEY, TEAM_KEY, TOKEN_KEY,
   getLocalFromEmail, buildEmail, setKvEmailView, setKvEmailEdit,
   markActiveByTabKey, setText, 
 } from './db_management.js';
@@ -109,6 +109,8 @@ async function onToggleEditMe(){
       });
       const data = await res.json().catch(()=> ({}));
       if(!res.ok) throw new Error(data?.message || "저장 실패");
+      // 직위/팀이 바뀌면 서버가 새 권한 클레임이 담긴 토큰을 돌려줌
+      if (data.token) localStorage.setItem(TOKEN_KEY, data.token);
 
       await refreshMyInfo(); // 수정 후 내 정보 다시 로드
       toast("저장되었습니다.");
@@ -304,6 +306,8 @@ async function onAddResponsibility() {
     });
     const data = await res.json().catch(() => ({}));
     if (!res.ok) throw new Error(data.message || '추가 실패');
+    // 책임이 바뀌면 서버가 새 권한 클레임이 담긴 토큰을 돌려줌
+    if (data.token) localStorage.setItem(TOKEN_KEY, data.token);
 
     toast('담당 업무가 추가되었습니다.');
     await refreshMyInfo();
@@ -322,6 +326,8 @@ async function onRemoveResponsibility(responsibilityId) {
     const res = await authFetch(`${EP_ME_RESPONSIBILITIES}/${responsibilityId}`, { method: 'DELETE' });
     const data = await res.json().catch(() => ({}));
     if (!res.ok) throw new Error(data.message || '삭제 실패');
+    // 책임이 바뀌면 서버가 새 권한 클레임이 담긴 토큰을 돌려줌
+    if (data.token) localStorage.setItem(TOKEN_KEY, data.token);
 
     toast('담당 업무가 삭제되었습니다.');
     await refreshMyInfo();